@@ -0,0 +1,282 @@
+"""
+BENCHMARK DE PREPROCESADO
+------------------------------
+Genera datasets sintéticos de distintos tamaños y mide cada operación de
+'Dataset' (copia, descompresión, escaneo, normalización, integridad, duplicados,
+split y YAML): archivos/s, MB/s y memoria máxima. Falla si alguna operación empeora
+frente a la línea base guardada.
+
+Uso: python benchmarks/preprocessing.py [--sizes 1k 10k 100k 1m] [--save]
+"""
+
+import sys
+import json
+import shutil
+import argparse
+import tempfile
+import multiprocessing
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from core.constants import (  # noqa: E402
+    PREPROCESS_BENCH_MIN_WALL_S,
+    PREPROCESS_BENCH_RSS_SLACK_MB,
+    PREPROCESS_BENCH_SIZES,
+    PREPROCESS_BENCH_TOLERANCE,
+)
+
+BASELINE_PATH = ROOT_DIR / "benchmarks" / "baselines" / "preprocessing.json"
+ARCHIVES = {"unzipZIP": "zip", "unzipTAR": "tar", "unzipTAR.gz": "tar.gz"}
+
+
+def parseCount(value: str) -> int:
+    value = value.strip().lower()
+    multiplier = {"k": 1_000, "m": 1_000_000}.get(value[-1:], 1)
+    return int(float(value.rstrip("km")) * multiplier)
+
+
+def prepareSize(
+    files: int,
+    work_dir: str,
+    options: dict[str, float],
+) -> dict[str, int]:
+    from synthetic import generate, pack
+
+    source = Path(work_dir) / "source"
+    stats = generate(
+        source,
+        files,
+        orphan_ratio=options["orphans"],
+        duplicate_ratio=options["duplicates"],
+        junk_ratio=options["junk"],
+    )
+    for fmt in ARCHIVES.values():
+        pack(source, fmt)
+
+    return stats
+
+
+def runSize(
+    stats: dict[str, int],
+    work_dir: str,
+) -> dict[str, dict[str, float]]:
+    import os
+    import core  # noqa: F401
+    from core import Dataset
+    from ui import BashUI
+
+    work_path = Path(work_dir)
+    source = work_path / "source"
+    archives = {op: work_path / f"source.{fmt}" for op, fmt in ARCHIVES.items()}
+
+    ui = BashUI(progress="plain")
+    ui.console.file = open(os.devnull, "w")
+    dataset = Dataset(ui)
+    results: dict[str, dict[str, float]] = {}
+
+    def measure(op: str, call) -> bool:
+        try:
+            call()
+        except Exception as e:
+            results[op] = {"error": str(e)}
+            return False
+
+        record = [r for r in ui.profiler.records() if r["depth"] == 0][-1]
+        wall_s = max(record["wall_s"], 1e-6)
+        results[op] = {
+            "wall_s": record["wall_s"],
+            "files_per_s": round(stats["files"] / wall_s, 1),
+            "mb_per_s": round(stats["bytes"] / (1024 * 1024) / wall_s, 2),
+            "peak_rss_mb": record["peak_rss_mb"],
+        }
+        return True
+
+    for op, archive in archives.items():
+        # La extracción elimina el archivo comprimido; se trabaja sobre una copia.
+        archive_copy = work_path / f"input{''.join(archive.suffixes)}"
+        shutil.copy(archive, archive_copy)
+        extract_dir = work_path / "extract"
+        extract = dataset.unzipZIP if op == "unzipZIP" else dataset.unzipTAR
+        measure(op, lambda: extract(archive_copy, extract_dir))
+        shutil.rmtree(extract_dir, ignore_errors=True)
+        archive_copy.unlink(missing_ok=True)
+
+    dataset_path = work_path / "dataset"
+    images_dir = dataset_path / "images"
+    labels_dir = dataset_path / "labels"
+    state: dict[str, object] = {}
+
+    def normalize() -> None:
+        images_dir.mkdir(parents=True, exist_ok=True)
+        labels_dir.mkdir(parents=True, exist_ok=True)
+        dataset.normalize(dataset_path, images_dir, labels_dir)
+
+    def integrity() -> None:
+        state["pairs"], _ = dataset.integrity(dataset_path, images_dir, labels_dir)
+
+    def dedup() -> None:
+        # Se conservan los duplicados exactos (el generador reutiliza un pool
+        # de imágenes) para que el split mida el mismo número de pares.
+        state["pairs"], _ = dataset.dedup(
+            dataset_path, state["pairs"], images_dir, labels_dir, remove_exact=False
+        )
+
+    # Cada etapa opera sobre el resultado de la anterior, como en la Sección 2.
+    chain = [
+        ("copy", lambda: dataset.copy(source, dataset_path, True)),
+        ("scan", lambda: dataset.scan(dataset_path)),
+        ("normalize", normalize),
+        ("integrity", integrity),
+        ("dedup", dedup),
+        (
+            "split",
+            lambda: dataset.split(state["pairs"], dataset_path, images_dir, labels_dir),
+        ),
+        ("generateYAML", lambda: dataset.generateYAML(dataset_path, ["a", "b", "c"])),
+    ]
+    for op, call in chain:
+        if not measure(op, call):
+            break
+
+    return results
+
+
+def compare(
+    size: str,
+    results: dict[str, dict[str, float]],
+    baseline: dict[str, dict[str, float]],
+    tolerance: float,
+) -> list[str]:
+    regressions: list[str] = []
+
+    for op, result in results.items():
+        if "error" in result:
+            regressions.append(f"{size} {op}: error ({result['error']})")
+            continue
+
+        base = baseline.get(op)
+        if not base or "error" in base:
+            continue
+
+        # Las operaciones muy cortas son ruido; solo se compara su memoria.
+        min_rate = base["files_per_s"] * (1 - tolerance)
+        timed = result["wall_s"] >= PREPROCESS_BENCH_MIN_WALL_S
+        if timed and result["files_per_s"] < min_rate:
+            regressions.append(
+                f"{size} {op}: {result['files_per_s']:.0f} archivos/s"
+                + f" (línea base {base['files_per_s']:.0f})"
+            )
+
+        peak_limit = max(
+            base["peak_rss_mb"] * (1 + tolerance),
+            base["peak_rss_mb"] + PREPROCESS_BENCH_RSS_SLACK_MB,
+        )
+        if result["peak_rss_mb"] > peak_limit:
+            regressions.append(
+                f"{size} {op}: {result['peak_rss_mb']:.1f} MB de RSS máx."
+                + f" (línea base {base['peak_rss_mb']:.1f})"
+            )
+
+    return regressions
+
+
+def printResults(
+    size: str,
+    stats: dict[str, int],
+    results: dict[str, dict[str, float]],
+) -> None:
+    print(
+        f"\n{size}: {stats['files']} archivos, {stats['bytes'] / (1024 * 1024):.1f} MB"
+        + f" ({stats['pairs']} pares, {stats['orphans']} huérfanos,"
+        + f" {stats['duplicates']} duplicados, {stats['junk']} basura)"
+    )
+    print(
+        f"  {'Operación':<14}{'Real (s)':>10}{'Arch./s':>12}{'MB/s':>10}{'RSS MB':>10}"
+    )
+    for op, result in results.items():
+        if "error" in result:
+            print(f"  {op:<14}  ✘ {result['error']}")
+            continue
+        print(
+            f"  {op:<14}{result['wall_s']:>10.3f}{result['files_per_s']:>12.0f}"
+            + f"{result['mb_per_s']:>10.1f}{result['peak_rss_mb']:>10.1f}"
+        )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark de preprocesado")
+    parser.add_argument("--sizes", nargs="+", default=PREPROCESS_BENCH_SIZES)
+    parser.add_argument("--orphans", type=float, default=0.0)
+    parser.add_argument("--duplicates", type=float, default=0.0)
+    parser.add_argument("--junk", type=float, default=0.01)
+    parser.add_argument("--tolerance", type=float, default=PREPROCESS_BENCH_TOLERANCE)
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--workdir", type=Path, default=None)
+    parser.add_argument(
+        "--save",
+        action="store_true",
+        help="Guarda los resultados como nueva línea base.",
+    )
+    args = parser.parse_args()
+
+    options = {
+        "orphans": args.orphans,
+        "duplicates": args.duplicates,
+        "junk": args.junk,
+    }
+    baseline: dict[str, dict[str, dict[str, float]]] = {}
+    if args.baseline.exists():
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            data = json.load(f)
+
+        # Una línea base generada con otras proporciones no es comparable.
+        if data.get("options") == options:
+            baseline = data.get("sizes", {})
+        elif not args.save:
+            print("⚠ La línea base usa otras opciones de generación; no se compara.")
+
+    report: dict[str, dict[str, dict[str, float]]] = {}
+    regressions: list[str] = []
+    context = multiprocessing.get_context("spawn")
+
+    for size in args.sizes:
+        # La generación y cada tamaño se ejecutan en procesos nuevos para que
+        # su memoria no contamine la memoria máxima medida.
+        with tempfile.TemporaryDirectory(dir=args.workdir) as work_dir:
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                stats = pool.submit(
+                    prepareSize, parseCount(size), work_dir, options
+                ).result()
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                results = pool.submit(runSize, stats, work_dir).result()
+
+        printResults(size, stats, results)
+        report[size] = results
+        regressions += compare(size, results, baseline.get(size, {}), args.tolerance)
+
+    if args.save:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(
+                {"options": options, "sizes": {**baseline, **report}},
+                f,
+                indent=2,
+            )
+        print(f"\n✔ Línea base guardada en '{args.baseline}'")
+        return 0
+
+    if regressions:
+        print("\n✘ Regresiones frente a la línea base:")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+
+    print("\n✔ Preprocesado dentro de la línea base.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
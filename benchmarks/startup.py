@@ -0,0 +1,95 @@
+"""
+BENCHMARK DE ARRANQUE
+------------------------------
+Mide el tiempo de importación de 'main' con 'python -X importtime' y falla
+si supera el presupuesto o si alguna dependencia pesada se carga al inicio.
+
+Uso: python benchmarks/startup.py [--budget MS] [--runs N]
+"""
+
+import sys
+import argparse
+import statistics
+import subprocess
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from core.constants import STARTUP_BUDGET_MS, STARTUP_LAZY_MODULES  # noqa: E402
+
+
+def importTime() -> tuple[float, dict[str, int]]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=str(ROOT_DIR),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    modules: dict[str, int] = {}
+    total_us = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+
+        parts = line.split("|")
+        try:
+            self_us = int(parts[0].split(":")[1])
+            cumulative_us = int(parts[1])
+        except ValueError:
+            continue
+
+        name = parts[2].strip()
+        modules[name] = self_us
+        if name == "main":
+            total_us = cumulative_us
+
+    return total_us / 1000, modules
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark de arranque de main.py")
+    parser.add_argument("--budget", type=float, default=STARTUP_BUDGET_MS)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    timings: list[float] = []
+    modules: dict[str, int] = {}
+    for _ in range(max(1, args.runs)):
+        total_ms, modules = importTime()
+        timings.append(total_ms)
+
+    median_ms = statistics.median(timings)
+    heaviest = sorted(modules.items(), key=lambda item: item[1], reverse=True)[:10]
+
+    print(f"Importación de 'main': {median_ms:.1f} ms (mediana de {len(timings)})")
+    print(f"Presupuesto: {args.budget:.1f} ms\n")
+    print("Módulos más costosos (tiempo propio):")
+    for name, self_us in heaviest:
+        print(f"  {self_us / 1000:8.2f} ms  {name}")
+
+    failed = False
+
+    eager = sorted(
+        module
+        for module in STARTUP_LAZY_MODULES
+        if any(name == module or name.startswith(f"{module}.") for name in modules)
+    )
+    if eager:
+        print(f"\n✘ Dependencias pesadas importadas al inicio: {', '.join(eager)}")
+        failed = True
+
+    if median_ms > args.budget:
+        print(f"\n✘ Regresión: {median_ms:.1f} ms supera {args.budget:.1f} ms")
+        failed = True
+
+    if not failed:
+        print("\n✔ Arranque dentro del presupuesto.")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
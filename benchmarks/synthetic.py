@@ -0,0 +1,232 @@
+"""
+GENERADOR DE DATASETS SINTÉTICOS
+------------------------------
+Genera datasets YOLO sintéticos (imágenes JPEG y etiquetas) con anidamiento,
+huérfanos, nombres duplicados y archivos basura, como carpeta, ZIP, TAR o
+tar.gz.
+
+Uso: python benchmarks/synthetic.py DESTINO [--files N] [--format FORMATO]
+"""
+
+import io
+import sys
+import random
+import argparse
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from core.constants import (  # noqa: E402
+    SYNTHETIC_FILES_PER_DIR,
+    SYNTHETIC_FORMATS,
+    SYNTHETIC_JUNK_FILES,
+)
+
+
+def parseSize(value: str) -> tuple[int, int]:
+    width, _, height = value.lower().partition("x")
+    return int(width), int(height or width)
+
+
+def imagePool(
+    sizes: list[tuple[int, int]],
+    count: int,
+    rng: random.Random,
+) -> list[bytes]:
+    from PIL import Image, ImageDraw
+
+    # Imágenes simples (fondo y rectángulos) para que el JPEG ocupe poco y la
+    # generación de millones de archivos no dependa del codificador.
+    pool: list[bytes] = []
+    for i in range(count):
+        width, height = sizes[i % len(sizes)]
+        image = Image.new("RGB", (width, height), _color(rng))
+        draw = ImageDraw.Draw(image)
+        for _ in range(rng.randint(1, 4)):
+            x0, y0 = rng.randrange(width), rng.randrange(height)
+            x1, y1 = rng.randint(x0, width), rng.randint(y0, height)
+            draw.rectangle((x0, y0, x1, y1), fill=_color(rng))
+
+        buffer = io.BytesIO()
+        image.save(buffer, format="JPEG", quality=75)
+        pool.append(buffer.getvalue())
+
+    return pool
+
+
+def generate(
+    dest_folder: Path,
+    files: int,
+    image_sizes: list[tuple[int, int]] | None = None,
+    depth: int = 2,
+    orphan_ratio: float = 0.0,
+    duplicate_ratio: float = 0.0,
+    junk_ratio: float = 0.0,
+    classes: int = 3,
+    pool: int = 256,
+    seed: int = 0,
+) -> dict[str, int]:
+    rng = random.Random(seed)
+    images = imagePool(image_sizes or [(320, 240)], pool, rng)
+
+    junk = int(files * junk_ratio)
+    pairs = max(1, (files - junk) // 2)
+    orphans = int(pairs * orphan_ratio)
+    duplicates = int(pairs * duplicate_ratio)
+
+    # Los huérfanos se reparten entre imágenes sin etiqueta y etiquetas sin
+    # imagen. Los duplicados reutilizan el nombre de un par del bloque
+    # anterior; solo se eligen de bloques impares para que ese nombre nunca
+    # sea a su vez un duplicado.
+    orphan_ids = set(rng.sample(range(pairs), orphans))
+    candidates = [i for i in range(pairs) if (i // SYNTHETIC_FILES_PER_DIR) % 2 == 1]
+    duplicate_ids = set(rng.sample(candidates, min(duplicates, len(candidates))))
+
+    stats: dict[str, int] = {
+        "files": 0,
+        "bytes": 0,
+        "pairs": 0,
+        "orphans": 0,
+        "duplicates": 0,
+        "junk": 0,
+    }
+    created: set[Path] = set()
+
+    for i in range(pairs):
+        leaf = _leafDir(dest_folder, i // SYNTHETIC_FILES_PER_DIR, depth)
+        if leaf not in created:
+            (leaf / "images").mkdir(parents=True, exist_ok=True)
+            (leaf / "labels").mkdir(parents=True, exist_ok=True)
+            created.add(leaf)
+
+        stem_id = i - SYNTHETIC_FILES_PER_DIR if i in duplicate_ids else i
+        stem = f"img_{stem_id:07d}"
+
+        write_image = not (i in orphan_ids and i % 2 == 1)
+        write_label = not (i in orphan_ids and i % 2 == 0)
+
+        if write_image:
+            data = images[i % len(images)]
+            with open(leaf / "images" / f"{stem}.jpg", "wb") as f:
+                f.write(data)
+            stats["files"] += 1
+            stats["bytes"] += len(data)
+
+        if write_label:
+            data = _label(rng, classes).encode()
+            with open(leaf / "labels" / f"{stem}.txt", "wb") as f:
+                f.write(data)
+            stats["files"] += 1
+            stats["bytes"] += len(data)
+
+        stats["pairs"] += write_image and write_label
+        stats["orphans"] += not (write_image and write_label)
+        stats["duplicates"] += i in duplicate_ids
+
+    leaves = sorted(created)
+    for i in range(junk):
+        name = SYNTHETIC_JUNK_FILES[i % len(SYNTHETIC_JUNK_FILES)]
+        path = rng.choice(leaves) / f"{i:07d}_{name}"
+        data = b"\0" * rng.randint(16, 512)
+        with open(path, "wb") as f:
+            f.write(data)
+        stats["files"] += 1
+        stats["bytes"] += len(data)
+        stats["junk"] += 1
+
+    return stats
+
+
+def pack(folder: Path, fmt: str, dest_path: Path | None = None) -> Path:
+    if fmt not in SYNTHETIC_FORMATS:
+        raise Exception(
+            f"Formato '{fmt}' no soportado. Opciones: {', '.join(SYNTHETIC_FORMATS)}."
+        )
+    if fmt == "folder":
+        return folder
+
+    dest_path = dest_path or folder.with_name(f"{folder.name}.{fmt}")
+
+    if fmt == "zip":
+        import zipfile
+
+        with zipfile.ZipFile(dest_path, "w", zipfile.ZIP_STORED) as zip_ref:
+            for path in sorted(folder.rglob("*")):
+                if path.is_file():
+                    zip_ref.write(path, path.relative_to(folder))
+    else:
+        import tarfile
+
+        mode = "w:gz" if fmt == "tar.gz" else "w"
+        with tarfile.open(dest_path, mode) as tar_ref:
+            for path in sorted(folder.iterdir()):
+                tar_ref.add(path, arcname=path.name)
+
+    return dest_path
+
+
+def _leafDir(root: Path, index: int, depth: int) -> Path:
+    # Carpetas anidadas 'depth' niveles con un abanico fijo por nivel.
+    parts: list[str] = []
+    for level in range(depth):
+        parts.append(f"d{level}_{index % 16:02d}")
+        index //= 16
+    if index:
+        parts.insert(0, f"g{index:04d}")
+    return root.joinpath(*parts)
+
+
+def _label(rng: random.Random, classes: int) -> str:
+    lines: list[str] = []
+    for _ in range(rng.randint(1, 5)):
+        w, h = rng.uniform(0.05, 0.5), rng.uniform(0.05, 0.5)
+        x, y = rng.uniform(w / 2, 1 - w / 2), rng.uniform(h / 2, 1 - h / 2)
+        lines.append(f"{rng.randrange(classes)} {x:.6f} {y:.6f} {w:.6f} {h:.6f}")
+    return "\n".join(lines) + "\n"
+
+
+def _color(rng: random.Random) -> tuple[int, int, int]:
+    return rng.randrange(256), rng.randrange(256), rng.randrange(256)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Generador de datasets sintéticos")
+    parser.add_argument("dest", type=Path, help="Carpeta de destino.")
+    parser.add_argument("--files", type=int, default=1000)
+    parser.add_argument("--format", choices=SYNTHETIC_FORMATS, default="folder")
+    parser.add_argument("--image-size", nargs="+", type=parseSize, default=None)
+    parser.add_argument("--depth", type=int, default=2)
+    parser.add_argument("--orphans", type=float, default=0.0)
+    parser.add_argument("--duplicates", type=float, default=0.0)
+    parser.add_argument("--junk", type=float, default=0.0)
+    parser.add_argument("--classes", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.dest.exists():
+        print(f"✘ El destino '{args.dest}' ya existe.")
+        return 1
+
+    stats = generate(
+        args.dest,
+        args.files,
+        image_sizes=args.image_size,
+        depth=args.depth,
+        orphan_ratio=args.orphans,
+        duplicate_ratio=args.duplicates,
+        junk_ratio=args.junk,
+        classes=args.classes,
+        seed=args.seed,
+    )
+    path = pack(args.dest, args.format)
+
+    print(f"✔ Dataset generado en '{path}'")
+    for key, value in stats.items():
+        print(f"  {key}: {value}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,248 @@
+import os
+import shutil
+from pathlib import Path
+
+from core.constants import APPEND_DIRNAME, DATASETS_DIR, DECODED_CACHE_DIR
+from core.dataset import Dataset
+from core.downloader import Downloader
+from core.journal import Journal
+from core.labels import unifyClasses
+from core.validator import Validator
+from ui import BashUI
+
+
+class Append:
+    def __init__(
+        self,
+        ui: BashUI,
+        validator: Validator,
+        dataset: Dataset,
+        downloader: Downloader,
+    ) -> None:
+        self._ui: BashUI = ui
+        self._validator: Validator = validator
+        self._dataset: Dataset = dataset
+        self._downloader: Downloader = downloader
+
+    @staticmethod
+    def locate(dataset: Path | str) -> Path:
+        # Ruta del dataset o solo su nombre dentro de 'datasets/'.
+        dataset_path = Path(dataset).expanduser()
+        if not dataset_path.exists():
+            dataset_path = DATASETS_DIR / dataset_path.name
+
+        journal = Journal(dataset_path)
+        if not journal.isDone("split") or not (dataset_path / "data.yaml").exists():
+            raise Exception(
+                f"'{dataset_path}' no es un dataset procesado (sin split o sin data.yaml)."
+            )
+        return dataset_path.resolve()
+
+    def run(
+        self,
+        dataset_path: Path,
+        source: Path | str,
+        classes: list[str] | None = None,
+    ) -> dict[str, object]:
+        try:
+            staging_path = dataset_path / APPEND_DIRNAME
+            raw_path = staging_path / "raw"
+            data_path = staging_path / "data"
+            shutil.rmtree(staging_path, ignore_errors=True)
+            data_path.mkdir(parents=True)
+
+            # Solo los pares nuevos o modificados llegan a 'data'; el resto
+            # de la entrega no se copia ni se procesa.
+            source_path, move = self._fetch(source, raw_path)
+            stats = self._dataset.diff(dataset_path, source_path, data_path, move=move)
+            shutil.rmtree(raw_path, ignore_errors=True)
+
+            self._ui.stepSuccess(
+                f"{stats['files']} archivos comparados con el manifiesto:"
+                + f" {stats['new']} pares nuevos, {stats['changed']} modificados"
+                + f" y {stats['unchanged']} sin cambios."
+            )
+            if stats["incomplete"]:
+                self._ui.stepWarning(
+                    f"{stats['incomplete']} archivos sin su imagen o etiqueta"
+                    + " se incorporarán cuando llegue el par completo."
+                )
+
+            if not stats["new"] and not stats["changed"]:
+                journal_path = Journal(dataset_path).path
+                os.replace(journal_path / "files.next.tsv", journal_path / "files.tsv")
+                shutil.rmtree(staging_path, ignore_errors=True)
+                return {**stats, "train": 0, "val": 0}
+
+            images_dir, labels_dir = data_path / "images", data_path / "labels"
+            self._dataset.normalize(data_path, images_dir, labels_dir)
+            pairs, _ = self._dataset.integrity(data_path, images_dir, labels_dir)
+
+            new_classes = self._prepare(dataset_path, data_path, pairs, classes)
+
+            journal = Journal(dataset_path)
+            if journal.isDone("tile"):
+                pairs, _ = self._dataset.tile(
+                    data_path,
+                    pairs,
+                    images_dir,
+                    labels_dir,
+                    journal.result("tile")["tile_size"],
+                )
+
+            valid = self._checkCaches(dataset_path)
+            result, appended = self._dataset.append(dataset_path, data_path, pairs)
+            shutil.rmtree(staging_path, ignore_errors=True)
+            self._ui.stepSuccess(
+                f"{result['new']} pares nuevos ({result['train']} a train y"
+                + f" {result['val']} a val) y {result['changed']} reemplazados"
+                + " en su split."
+            )
+
+            if new_classes:
+                self._ui.stepSuccess(
+                    f"data.yaml actualizado con {len(new_classes)} clases:"
+                    + f" {', '.join(new_classes)}."
+                )
+
+            self._updateCaches(dataset_path, appended, valid)
+            return {**stats, **result}
+
+        except Exception:
+            raise
+
+    def _fetch(self, source: Path | str, raw_path: Path) -> tuple[Path, bool]:
+        # Carpeta local: se compara en su sitio. Archivos comprimidos y
+        # enlaces de Drive: se extraen en 'raw' y sus pares se mueven.
+        if isinstance(source, str) and source.startswith("http"):
+            if not self._validator.validateGDURL(source):
+                raise Exception("La URL no pertenece a Google Drive.")
+            raw_path.mkdir(parents=True, exist_ok=True)
+            path = self._downloader.runGD(source, raw_path)
+            if path is None:
+                raise Exception("No se pudo descargar el contenido de Google Drive.")
+            if self._validator.source(path) == (True, "unzip"):
+                self._unzip(path, raw_path)
+            return raw_path, True
+
+        path = Path(source).expanduser()
+        is_valid, type_detected = self._validator.source(path)
+        if is_valid and type_detected == "folder":
+            return path, False
+        if is_valid and type_detected == "unzip":
+            raw_path.mkdir(parents=True, exist_ok=True)
+            copy_path = raw_path / path.name
+            if not self._dataset.copy(path, copy_path, False):
+                raise Exception("No se pudo copiar el archivo.")
+            self._unzip(copy_path, raw_path)
+            return raw_path, True
+
+        raise Exception(
+            f"'{path}' no es una carpeta ni un archivo comprimido compatible."
+        )
+
+    def _unzip(self, path: Path, dest_folder: Path) -> None:
+        unzip_type = self._validator.unzipType(path)
+        extract = {
+            "zip": self._dataset.unzipZIP,
+            "rar": self._dataset.unzipRAR,
+            "tar": self._dataset.unzipTAR,
+        }.get(unzip_type)
+        if extract is None or not extract(path, dest_folder):
+            raise Exception(f"No se pudo descomprimir '{path.name}'.")
+
+    def _prepare(
+        self,
+        dataset_path: Path,
+        data_path: Path,
+        pairs,
+        classes: list[str] | None,
+    ) -> list[str]:
+        # Lleva las etiquetas nuevas al espacio de clases del dataset: ids de
+        # la entrega -> clases de origen -> reglas de 'relabel' registradas.
+        # Devuelve las clases finales si cambian.
+        journal = Journal(dataset_path)
+        relabel = journal.result("relabel")
+        current = list(journal.result("yaml").get("classes") or [])
+        base = list(
+            relabel.get("source_classes")
+            or journal.result("ingest").get("classes")
+            or current
+        )
+
+        unified = base
+        if classes:
+            unified, luts = unifyClasses([base, classes])
+            if luts[1] != list(range(len(classes))):
+                self._dataset.remap(data_path, luts[1])
+
+        final = unified
+        if relabel and "merge" in relabel:
+            result = self._dataset.relabel(
+                data_path,
+                pairs,
+                data_path / "labels",
+                unified,
+                merge=relabel["merge"],
+                drop=relabel["drop"],
+                min_size=relabel["min_size"],
+            )
+            final = result["classes"]
+        elif relabel:
+            self._ui.stepWarning(
+                "El dataset no registra sus reglas de transformación de etiquetas;"
+                + " los pares nuevos se incorporan sin transformar."
+            )
+            final = current + [name for name in unified if name not in current]
+
+        if final == current:
+            return []
+
+        # Clases nuevas: se registran en el diario y se regenera el data.yaml.
+        for stage, names in (("ingest", unified), ("relabel", final)):
+            if journal.isDone(stage):
+                result = journal.result(stage)
+                if stage == "relabel":
+                    result = {**result, "source_classes": unified}
+                journal.complete(stage, **{**result, "classes": names})
+        self._dataset.generateYAML(dataset_path, final)
+        return final
+
+    def _checkCaches(self, dataset_path: Path) -> set[str]:
+        # Solo se comprueban (con Ultralytics) si existe alguna caché.
+        if not any(
+            (dataset_path / split / "labels.cache").exists()
+            for split in ("train", "val")
+        ):
+            return set()
+
+        from core.trainer import Trainer
+
+        return Trainer.checkCaches(str(dataset_path / "data.yaml"))
+
+    def _updateCaches(self, dataset_path: Path, appended, valid: set[str]) -> None:
+        files: dict[str, list[str]] = {"train": [], "val": []}
+        for split, path in appended:
+            files[split].append(path)
+        appended.close()
+
+        # 'labels.cache' de Ultralytics: solo se verifican los pares nuevos,
+        # y solo en las cachés que eran completas antes de incorporarlos.
+        if valid:
+            from core.trainer import Trainer
+
+            updated = Trainer.updateCaches(
+                str(dataset_path / "data.yaml"), files, valid
+            )
+            self._ui.stepSuccess(f"{updated} cachés de etiquetas actualizadas.")
+
+        # Caché de imágenes decodificadas: las reemplazadas dejan de leerse de
+        # ella.
+        replaced = {os.path.abspath(path) for paths in files.values() for path in paths}
+        if DECODED_CACHE_DIR.exists() and replaced:
+            from core.loaders import DecodedCache
+
+            for cache_path in DECODED_CACHE_DIR.glob(f"{dataset_path.name}_*"):
+                cache = DecodedCache(cache_path)
+                if cache.valid:
+                    cache.forget(replaced)
@@ -0,0 +1,213 @@
+import json
+import time
+import shutil
+from pathlib import Path
+
+from core.constants import (
+    BENCHMARK_BATCH_SIZES,
+    BENCHMARK_FILENAME,
+    BENCHMARK_MAX_IMAGES,
+    BENCHMARK_WARMUP_BATCHES,
+    EXPORT_FORMATS,
+    IMAGE_EXTENSIONS,
+)
+from core.profiler import timed
+from ui import BashUI
+
+
+class Benchmark:
+    def __init__(
+        self,
+        ui: BashUI,
+        max_images: int = BENCHMARK_MAX_IMAGES,
+        warmup_batches: int = BENCHMARK_WARMUP_BATCHES,
+    ) -> None:
+        self._ui: BashUI = ui
+        self._max_images: int = max_images
+        self._warmup_batches: int = warmup_batches
+
+    @timed("Exportación y benchmark")
+    def run(
+        self,
+        best_model_path: Path,
+        data_yaml: Path,
+        imgsz: int,
+        run_dir: Path,
+        formats: list[str] = EXPORT_FORMATS,
+        batch_sizes: list[int] = BENCHMARK_BATCH_SIZES,
+    ) -> dict[str, object]:
+        try:
+            images = Benchmark.loadValImages(data_yaml, imgsz, self._max_images)
+            if len(images) == 0:
+                raise Exception("No hay imágenes de validación para el benchmark.")
+
+            self._ui.stepInfo("Evaluando modelo PyTorch de referencia")
+            reference_map = self._evaluate(best_model_path, data_yaml, imgsz, 16)
+
+            results: list[dict[str, object]] = []
+            for batch in batch_sizes:
+                results.append(
+                    {
+                        "format": "pytorch",
+                        "batch": batch,
+                        "path": str(best_model_path),
+                        **self._measure(best_model_path, images, batch),
+                        "map50_95": reference_map,
+                        "map_drift": 0.0,
+                    }
+                )
+
+            for fmt in formats:
+                map50_95: float | None = None
+
+                for batch in batch_sizes:
+                    self._ui.stepInfo(f"Exportando a {fmt} (batch {batch})")
+                    try:
+                        exported = self._export(best_model_path, fmt, imgsz, batch)
+                    except Exception as e:
+                        self._ui.stepWarning(
+                            f"Advertencia: No se pudo exportar a '{fmt}'.\n  {e}"
+                        )
+                        break
+
+                    if map50_95 is None:
+                        map50_95 = self._evaluate(exported, data_yaml, imgsz, batch)
+
+                    results.append(
+                        {
+                            "format": fmt,
+                            "batch": batch,
+                            "path": str(exported),
+                            **self._measure(exported, images, batch),
+                            "map50_95": map50_95,
+                            "map_drift": round(map50_95 - reference_map, 4),
+                        }
+                    )
+
+            fastest = max(results, key=lambda r: r["images_per_s"])
+            report = {
+                "imgsz": imgsz,
+                "images": len(images),
+                "device": "cpu",
+                "results": results,
+                "fastest": fastest,
+            }
+
+            with open(run_dir / BENCHMARK_FILENAME, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+
+            return report
+
+        except Exception:
+            raise
+
+    def _export(self, model_path: Path, fmt: str, imgsz: int, batch: int) -> Path:
+        from ultralytics import YOLO
+
+        exported = Path(
+            YOLO(str(model_path)).export(
+                format=fmt,
+                imgsz=imgsz,
+                batch=batch,
+                device="cpu",
+                verbose=False,
+            )
+        )
+
+        # Ultralytics sobrescribe el mismo nombre en cada exportación; se
+        # renombra conservando el sufijo que identifica el formato.
+        if exported.is_dir():
+            target = exported.with_name(exported.name.replace("best", f"best_b{batch}"))
+        else:
+            target = exported.with_name(f"{exported.stem}_b{batch}{exported.suffix}")
+
+        if target.exists():
+            if target.is_dir():
+                shutil.rmtree(str(target))
+            else:
+                target.unlink()
+        exported.rename(target)
+
+        return target
+
+    def _evaluate(
+        self, model_path: Path, data_yaml: Path, imgsz: int, batch: int
+    ) -> float:
+        from ultralytics import YOLO
+
+        metrics = YOLO(str(model_path)).val(
+            data=str(data_yaml),
+            imgsz=imgsz,
+            batch=batch,
+            device="cpu",
+            plots=False,
+            verbose=False,
+        )
+        return round(float(metrics.box.map), 4)
+
+    def _measure(self, model_path: Path, images, batch: int) -> dict[str, float]:
+        import numpy as np
+        import torch
+        from ultralytics.nn.autobackend import AutoBackend
+
+        backend = AutoBackend(
+            str(model_path), device=torch.device("cpu"), verbose=False
+        )
+
+        batches = [
+            images[i : i + batch] for i in range(0, len(images) - batch + 1, batch)
+        ] or [np.resize(images, (batch, *images.shape[1:]))]
+
+        latencies: list[float] = []
+        with torch.inference_mode():
+            for i, chunk in enumerate(batches[: self._warmup_batches] + batches):
+                tensor = torch.from_numpy(np.ascontiguousarray(chunk)).float() / 255.0
+                start = time.perf_counter()
+                backend(tensor)
+                elapsed = time.perf_counter() - start
+                if i >= self._warmup_batches:
+                    latencies.append(elapsed)
+
+        total = sum(latencies)
+        return {
+            "p50_ms": round(float(np.percentile(latencies, 50)) * 1000, 2),
+            "p95_ms": round(float(np.percentile(latencies, 95)) * 1000, 2),
+            "images_per_s": round(len(latencies) * batch / total, 2) if total else 0.0,
+        }
+
+    @staticmethod
+    def loadValImages(
+        data_yaml: Path,
+        imgsz: int,
+        limit: int,
+        seed: int | None = None,
+    ):
+        import cv2
+        import random
+        import numpy as np
+        import yaml
+        from ultralytics.data.augment import LetterBox
+
+        with open(data_yaml, "r", encoding="utf-8") as f:
+            data = yaml.safe_load(f)
+
+        val_dir = Path(data["path"]) / data["val"]
+        paths = sorted(
+            p for p in val_dir.iterdir() if p.suffix.lower() in IMAGE_EXTENSIONS
+        )
+        if seed is not None:
+            random.Random(seed).shuffle(paths)
+
+        letterbox = LetterBox((imgsz, imgsz), auto=False)
+        images: list = []
+        for path in paths[:limit]:
+            image = cv2.imread(str(path))
+            if image is None:
+                continue
+            image = letterbox(image=image)
+            images.append(image[..., ::-1].transpose(2, 0, 1))
+
+        if not images:
+            return np.zeros((0, 3, imgsz, imgsz), dtype=np.uint8)
+
+        return np.ascontiguousarray(np.stack(images))
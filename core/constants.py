@@ -7,6 +7,7 @@ APP_SUBTITLE = "Pipeline Automatizado de Entrenamiento"
 SECTION_ONE_TITLE = "1. ORIGEN DEL DATASET"
 SECTION_TWO_TITLE = " 2. PROCESAMIENTO DE DATOS"
 SECTION_THREE_TITLE = "3. HIPERPARÁMETROS DE ENTRENAMIENTO "
+SECTION_FOUR_TITLE = "4. EXPORTACIÓN Y BENCHMARK"
 
 # Rutas Base
 BASE_DIR = Path.cwd()
@@ -14,11 +15,13 @@ DATASETS_DIR = BASE_DIR / "datasets"
 MODELS_DIR = BASE_DIR / "models"
 MODELS_BASE_DIR = MODELS_DIR / "base"
 MODELS_TRAINED_DIR = MODELS_DIR / "trained"
+CACHE_DIR = BASE_DIR / "cache"
 
-# Asegurar que existan las carpetas base al importar
-DATASETS_DIR.mkdir(parents=True, exist_ok=True)
-MODELS_BASE_DIR.mkdir(parents=True, exist_ok=True)
-MODELS_TRAINED_DIR.mkdir(parents=True, exist_ok=True)
+# Las carpetas base se crean en su primer uso (no al importar) para que el
+# arranque no dependa del sistema de archivos.
+
+# Split por defecto (porcentaje de pares para entrenamiento)
+TRAIN_SPLIT_PERCENT = 80
 
 # Extensiones de archivos
 IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".bmp", ".webp"}
@@ -33,3 +36,134 @@ YOLO_MODEL_VERSIONS = {
     "x": "yolo11x.pt",
 }
 YOLO_MODEL_URL = "https://github.com/ultralytics/assets/releases/download/v8.3.0/"
+
+# Auto-ajuste de rendimiento
+AUTOTUNE_FILENAME = "autotune.json"
+AUTOTUNE_WARMUP_BATCHES = 2
+AUTOTUNE_TRIAL_BATCHES = 10
+
+# Barrido de hiperparámetros
+SWEEP_SPACE_KEYS = {"model", "imgsz", "lr0", "epochs", "batch"}
+SWEEP_MIN_EPOCHS = 5
+SWEEP_ETA = 3
+
+# Reanudación de entrenamientos
+CONTEXT_FILENAME = "context.json"
+CHECKPOINT_LAST = Path("weights") / "last.pt"
+
+# Telemetría de entrenamiento
+TELEMETRY_FILENAME = "telemetry.jsonl"
+TELEMETRY_REFRESH_S = 0.5
+TELEMETRY_IO_BOUND_RATIO = 0.3
+
+# Exportación y benchmark de inferencia
+EXPORT_FORMATS = ["onnx", "openvino", "torchscript"]
+BENCHMARK_BATCH_SIZES = [1, 8, 32]
+BENCHMARK_MAX_IMAGES = 256
+BENCHMARK_WARMUP_BATCHES = 2
+BENCHMARK_FILENAME = "benchmark.json"
+
+# Cuantización INT8
+QUANT_CALIBRATION_IMAGES = 200
+QUANT_BENCHMARK_RUNS = 50
+QUANT_FILENAME = "quantization.json"
+
+# Presupuesto de arranque (python -X importtime -c "import main")
+STARTUP_BUDGET_MS = 150
+STARTUP_LAZY_MODULES = ["gdown", "requests", "rarfile", "yaml", "torch", "ultralytics"]
+
+# Progreso (actualizaciones por segundo según backend)
+PROGRESS_MODES = ["auto", "rich", "plain", "json"]
+PROGRESS_RICH_REFRESH = 10.0
+PROGRESS_PLAIN_REFRESH = 0.2
+PROGRESS_JSON_REFRESH = 1.0
+
+# Perfilado por etapas
+PROFILE_TOOLS = ["cprofile", "pyinstrument"]
+PROFILE_RSS_INTERVAL_S = 0.1
+PROFILE_FILENAME = "profile.json"
+PROFILE_DIRNAME = "profile"
+
+# Datasets sintéticos y benchmark de preprocesado
+SYNTHETIC_FORMATS = ["folder", "zip", "tar", "tar.gz"]
+SYNTHETIC_FILES_PER_DIR = 1000
+SYNTHETIC_JUNK_FILES = [
+    ".DS_Store",
+    "Thumbs.db",
+    "desktop.ini",
+    "notes.md",
+    "meta.json",
+]
+PREPROCESS_BENCH_SIZES = ["1k", "10k"]
+PREPROCESS_BENCH_TOLERANCE = 0.25
+PREPROCESS_BENCH_MIN_WALL_S = 0.05
+PREPROCESS_BENCH_RSS_SLACK_MB = 16
+
+# Preprocesado en streaming (presupuesto de memoria para ordenar y unir stems)
+STREAM_MEMORY_BUDGET_MB = 256
+STREAM_BYTES_PER_ROW = 256
+
+# Journal de preprocesado (etapas completadas y movimientos planificados)
+JOURNAL_DIRNAME = ".journal"
+JOURNAL_FILENAME = "journal.json"
+
+# Detección de duplicados (hash de contenido y perceptual aHash/dHash de 64 bits)
+DEDUP_HAMMING_THRESHOLD = 3
+DEDUP_CHUNK_SIZE = 256
+DEDUP_DIRNAME = "duplicates"
+
+# Redimensionado y recodificación para el entrenamiento (lado largo = imgsz x múltiplo)
+RESIZE_FORMATS = {"jpeg": ".jpg", "webp": ".webp"}
+RESIZE_QUALITY = 90
+RESIZE_IMGSZ_MULTIPLE = 1
+RESIZE_CHUNK_SIZE = 32
+RESIZE_SAMPLE_IMAGES = 32
+RESIZE_CACHE_DIR = CACHE_DIR / "resize"
+
+# Caché de imágenes decodificadas (mmap compartido entre entrenamientos)
+DECODED_CACHE_DIR = CACHE_DIR / "decoded"
+DECODED_CACHE_BUDGET_MB = 32 * 1024
+DECODED_CACHE_CHUNK_SIZE = 16
+
+# Shards de train/val (lectura secuencial en almacenamiento lento)
+SHARDS_DIRNAME = "shards"
+SHARD_TARGET_MB = 256
+SHARD_SHUFFLE_BUFFER = 1024
+
+# Teselado de imágenes grandes
+TILE_SIZE = 640
+TILE_OVERLAP = 0.2
+TILE_MIN_VISIBILITY = 0.3
+TILE_EMPTY_KEEP = 0.1
+TILE_CHUNK_SIZE = 2
+
+# Reescritura de etiquetas
+LABEL_CHUNK_SIZE = 512
+LABEL_MIN_BOX_PERMILLE = 0
+
+# Conversión de anotaciones COCO / Pascal VOC
+COCO_ANNOTATIONS_PATTERN = "instances_*.json"
+JSON_STREAM_CHUNK = 1024 * 1024
+VOC_CHUNK_SIZE = 256
+
+# Subconjunto estratificado para pruebas rápidas (smoke test)
+SUBSET_DIRNAME = "subset"
+SUBSET_PERCENT = 3
+SUBSET_EPOCHS = 3
+SUBSET_IMGSZ = 320
+
+# Actualización incremental de un dataset procesado
+APPEND_DIRNAME = "append.tmp"
+# Hash de contenido de cada archivo en el manifiesto de la integridad (opcional:
+# lee todo el dataset). Sin él, un archivo con otra fecha cuenta como modificado.
+APPEND_FINGERPRINT = False
+
+# Modo vigilancia: lotes de pares nuevos y ajuste fino continuo
+WATCH_DIRNAME = "watch.tmp"
+WATCH_STATE_FILE = "watch.json"
+WATCH_BATCH_PAIRS = 50
+WATCH_BATCH_SECONDS = 600
+WATCH_POLL_SECONDS = 2.0
+WATCH_EPOCHS = 10
+WATCH_LR0 = 0.002
+WATCH_PATIENCE = 5
@@ -0,0 +1,256 @@
+import os
+import json
+import codecs
+from array import array
+from typing import Callable, Iterator
+
+from core.constants import JSON_STREAM_CHUNK
+
+
+class JSONStream:
+    def __init__(
+        self,
+        path: str,
+        advance: Callable[[int], None] | None = None,
+    ) -> None:
+        # Lector incremental: solo vive en memoria el fragmento pendiente de
+        # decodificar, no el archivo completo.
+        self._file = open(path, "rb")
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._json = json.JSONDecoder()
+        self._advance = advance
+        self._buffer: str = ""
+        self._pos: int = 0
+        self._eof: bool = False
+
+    def arrays(self, keys: set[str]) -> Iterator[tuple[str, object]]:
+        # Elementos (clave, objeto) de los arrays de primer nivel en 'keys';
+        # el resto de valores se decodifica y se descarta.
+        self._expect("{")
+        while True:
+            char = self._peek()
+            if char == "}" or not char:
+                return
+            if char == ",":
+                self._pos += 1
+                continue
+
+            key = self._value()
+            self._expect(":")
+            if key in keys and self._peek() == "[":
+                self._pos += 1
+                while True:
+                    char = self._peek()
+                    if char == "]":
+                        self._pos += 1
+                        break
+                    if char == ",":
+                        self._pos += 1
+                        continue
+                    yield key, self._value()
+            else:
+                self._value()
+
+    def close(self) -> None:
+        self._file.close()
+
+    def _fill(self) -> None:
+        chunk = self._file.read(JSON_STREAM_CHUNK)
+        if self._advance:
+            self._advance(len(chunk))
+        if not chunk:
+            self._eof = True
+        self._buffer = self._buffer[self._pos :] + self._decoder.decode(
+            chunk, final=not chunk
+        )
+        self._pos = 0
+
+    def _peek(self) -> str:
+        while True:
+            while (
+                self._pos < len(self._buffer) and self._buffer[self._pos] in " \t\r\n"
+            ):
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if self._eof:
+                return ""
+            self._fill()
+
+    def _expect(self, char: str) -> None:
+        if self._peek() != char:
+            raise Exception(f"JSON no válido: se esperaba '{char}'.")
+        self._pos += 1
+
+    def _value(self) -> object:
+        self._peek()
+        while True:
+            try:
+                value, end = self._json.raw_decode(self._buffer, self._pos)
+                # Un número al final del fragmento puede seguir en el próximo.
+                if end < len(self._buffer) or self._eof:
+                    self._pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+            self._fill()
+
+
+class COCOReader:
+    def __init__(self) -> None:
+        # Imágenes y anotaciones en arrays compactos: los archivos de
+        # anotaciones de millones de cajas no se materializan como objetos.
+        self.files: list[str] = []
+        self.widths = array("d")
+        self.heights = array("d")
+        self.categories: dict[int, str] = {}
+
+        self._index: dict[int, int] = {}
+        self._ann_image = array("q")
+        self._ann_category = array("q")
+        self._ann_boxes = array("d")
+        self._pending: list[tuple[int, int, list[float]]] = []
+        self.crowd: int = 0
+        self.unmatched: int = 0
+
+    def read(self, path: str, advance: Callable[[int], None] | None = None) -> None:
+        # Los ids de imagen se reinician en cada archivo (train y val empiezan
+        # en 1): el índice solo resuelve anotaciones del archivo en curso.
+        self._index = {}
+        stream = JSONStream(path, advance)
+        try:
+            for key, item in stream.arrays({"images", "annotations", "categories"}):
+                if key == "images":
+                    self._index[int(item["id"])] = len(self.files)
+                    self.files.append(os.path.basename(item["file_name"]))
+                    self.widths.append(float(item.get("width") or 0))
+                    self.heights.append(float(item.get("height") or 0))
+                elif key == "categories":
+                    self.categories[int(item["id"])] = str(item["name"])
+                elif item.get("iscrowd"):
+                    self.crowd += 1
+                else:
+                    # Las anotaciones pueden preceder a sus imágenes en el
+                    # archivo; se resuelven al terminar.
+                    self._pending.append(
+                        (int(item["image_id"]), int(item["category_id"]), item["bbox"])
+                    )
+                    if len(self._pending) >= 65536:
+                        self._flush()
+            self._flush()
+            # Anotaciones de imágenes que no aparecen en su archivo: se
+            # descartan y se informan.
+            self.unmatched += len(self._pending)
+            self._pending = []
+        finally:
+            stream.close()
+
+    def annotations(self):
+        import numpy as np
+
+        boxes = np.frombuffer(self._ann_boxes, dtype=np.float64).reshape(-1, 4)
+        return (
+            np.frombuffer(self._ann_image, dtype=np.int64),
+            np.frombuffer(self._ann_category, dtype=np.int64),
+            boxes,
+        )
+
+    def _flush(self) -> None:
+        still: list[tuple[int, int, list[float]]] = []
+        for image_id, category_id, bbox in self._pending:
+            index = self._index.get(image_id)
+            if index is None:
+                still.append((image_id, category_id, bbox))
+                continue
+            self._ann_image.append(index)
+            self._ann_category.append(category_id)
+            self._ann_boxes.extend(float(v) for v in bbox[:4])
+        self._pending = still
+
+
+def parseVOCChunk(
+    paths: list[str],
+) -> list[tuple[str, str, float, float, list[tuple[str, float, float, float, float]]]]:
+    # Por XML: ruta, nombre de la imagen, ancho, alto y objetos (nombre y
+    # caja xyxy en píxeles).
+    import xml.etree.ElementTree as ET
+
+    records = []
+    for path in paths:
+        root = ET.parse(path).getroot()
+        if root.tag != "annotation":
+            continue
+
+        size = root.find("size")
+        width = float(size.findtext("width") or 0) if size is not None else 0.0
+        height = float(size.findtext("height") or 0) if size is not None else 0.0
+
+        objects = []
+        for obj in root.iter("object"):
+            box = obj.find("bndbox")
+            if box is None:
+                continue
+            objects.append(
+                (
+                    (obj.findtext("name") or "").strip(),
+                    float(box.findtext("xmin") or 0),
+                    float(box.findtext("ymin") or 0),
+                    float(box.findtext("xmax") or 0),
+                    float(box.findtext("ymax") or 0),
+                )
+            )
+
+        filename = (root.findtext("filename") or "").strip()
+        records.append((path, filename, width, height, objects))
+
+    return records
+
+
+def normalizeBoxes(boxes, widths, heights, xyxy: bool = False):
+    # Cajas en píxeles (xywh de COCO o xyxy de VOC) a YOLO normalizado y
+    # recortado a la imagen, en una sola operación para todas las cajas.
+    import numpy as np
+
+    if xyxy:
+        x0, y0, x1, y1 = boxes[:, 0], boxes[:, 1], boxes[:, 2], boxes[:, 3]
+    else:
+        x0, y0 = boxes[:, 0], boxes[:, 1]
+        x1, y1 = x0 + boxes[:, 2], y0 + boxes[:, 3]
+
+    x0, x1 = np.clip(x0 / widths, 0, 1), np.clip(x1 / widths, 0, 1)
+    y0, y1 = np.clip(y0 / heights, 0, 1), np.clip(y1 / heights, 0, 1)
+    return np.stack([(x0 + x1) / 2, (y0 + y1) / 2, x1 - x0, y1 - y0], axis=1)
+
+
+def writeLabels(
+    targets: list[str | None],
+    image_index,
+    classes,
+    boxes,
+) -> int:
+    # Un archivo por imagen encontrada (vacío si no tiene cajas); las cajas
+    # se agrupan por imagen con una ordenación estable.
+    import numpy as np
+
+    valid = (boxes[:, 2] > 0) & (boxes[:, 3] > 0)
+    image_index, classes, boxes = image_index[valid], classes[valid], boxes[valid]
+
+    order = np.argsort(image_index, kind="stable")
+    image_index, classes, boxes = image_index[order], classes[order], boxes[order]
+    starts = np.searchsorted(image_index, np.arange(len(targets)), side="left")
+    ends = np.searchsorted(image_index, np.arange(len(targets)), side="right")
+
+    written = 0
+    for i, target in enumerate(targets):
+        if target is None:
+            continue
+        start, end = int(starts[i]), int(ends[i])
+        with open(target, "w", encoding="utf-8") as f:
+            for cls, (x, y, w, h) in zip(
+                classes[start:end].tolist(), boxes[start:end].tolist()
+            ):
+                f.write(f"{cls} {x:.6f} {y:.6f} {w:.6f} {h:.6f}\n")
+        written += 1
+
+    return written
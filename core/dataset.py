@@ -1,31 +1,64 @@
 import os
-import time
-import yaml
+import re
 import random
+import time
 import shutil
+import fnmatch
+import itertools
 from pathlib import Path
-
-from rich.progress import (
-    BarColumn,
-    FileSizeColumn,
-    MofNCompleteColumn,
-    Progress,
-    SpinnerColumn,
-    TaskID,
-    TextColumn,
-    TimeElapsedColumn,
-    TimeRemainingColumn,
-    TransferSpeedColumn,
+from collections import deque
+from typing import Iterator
+from core.constants import (
+    COCO_ANNOTATIONS_PATTERN,
+    DECODED_CACHE_BUDGET_MB,
+    DECODED_CACHE_CHUNK_SIZE,
+    DEDUP_CHUNK_SIZE,
+    DEDUP_DIRNAME,
+    IMAGE_EXTENSIONS,
+    JOURNAL_DIRNAME,
+    LABEL_CHUNK_SIZE,
+    LABEL_EXTENSIONS,
+    LABEL_MIN_BOX_PERMILLE,
+    RESIZE_CACHE_DIR,
+    RESIZE_CHUNK_SIZE,
+    RESIZE_IMGSZ_MULTIPLE,
+    RESIZE_QUALITY,
+    RESIZE_SAMPLE_IMAGES,
+    SHARD_TARGET_MB,
+    SHARDS_DIRNAME,
+    STREAM_MEMORY_BUDGET_MB,
+    SUBSET_DIRNAME,
+    SUBSET_PERCENT,
+    TILE_CHUNK_SIZE,
+    TILE_EMPTY_KEEP,
+    TILE_MIN_VISIBILITY,
+    TILE_OVERLAP,
+    TRAIN_SPLIT_PERCENT,
+    VOC_CHUNK_SIZE,
+)
+from core.journal import Journal
+from core.profiler import timed
+from core.stream import (
+    ExternalSorter,
+    SpillList,
+    digest,
+    digestChunk,
+    groupBy,
+    poolMap,
+    rows,
+    walk,
 )
-
-from core.constants import IMAGE_EXTENSIONS, LABEL_EXTENSIONS
 from ui import BashUI
 
 
 class Dataset:
-    def __init__(self, ui: BashUI) -> None:
+    def __init__(
+        self, ui: BashUI, memory_budget_mb: int = STREAM_MEMORY_BUDGET_MB
+    ) -> None:
         self._ui: BashUI = ui
+        self._memory_budget_mb: int = memory_budget_mb
 
+    @timed("Copia", profile=True)
     def copy(self, source_path: Path, dest_folder: Path, is_folder: bool) -> bool:
         try:
             total: int = self._getTotalSize(source_path)
@@ -34,21 +67,7 @@ class Dataset:
                 "📂 Copiando carpeta" if is_folder else "📄 Copiando archivo"
             )
 
-            with Progress(
-                SpinnerColumn(style="bar.pulse"),
-                TextColumn("[bold white]{task.description}"),
-                BarColumn(bar_width=None, style="white", finished_style="white"),
-                TextColumn("{task.percentage:>3.0f}%"),
-                TextColumn("•"),
-                FileSizeColumn(),
-                TextColumn("•"),
-                TransferSpeedColumn(),
-                TextColumn("•"),
-                TimeRemainingColumn(),
-                console=self._ui.console,
-                transient=False,
-            ) as progress:
-                task: TaskID = progress.add_task(action_title, total=total)
+            with self._ui.progress(action_title, total=total, unit="bytes") as task:
 
                 if is_folder:
                     for root, _, files in os.walk(source_path):
@@ -61,7 +80,7 @@ class Dataset:
                             dest_file = dest_path / file
 
                             shutil.copy2(src_file, dest_file)
-                            progress.update(task, advance=src_file.stat().st_size)
+                            task.advance(src_file.stat().st_size)
                 else:
                     with (
                         open(source_path, "rb") as fsrc,
@@ -73,11 +92,12 @@ class Dataset:
                             if not buf:
                                 break
                             fdst.write(buf)
-                            progress.update(task, advance=len(buf))
+                            task.advance(len(buf))
             return True
         except Exception:
             raise
 
+    @timed("Extracción ZIP", profile=True)
     def unzipZIP(self, zip_path: Path, dest_folder: Path) -> bool:
         try:
             import zipfile
@@ -89,25 +109,18 @@ class Dataset:
                 members: list[zipfile.ZipInfo] = zip_ref.infolist()
                 total: int = sum(member.file_size for member in members)
 
-                with Progress(
-                    SpinnerColumn(style="bar.pulse"),
-                    TextColumn("[bold white]{task.description}"),
-                    BarColumn(bar_width=None, style="white", finished_style="white"),
-                    TextColumn("{task.percentage:>3.0f}%"),
-                    TextColumn("•"),
-                    FileSizeColumn(),
-                    TextColumn("•"),
-                    TransferSpeedColumn(),
-                    TextColumn("•"),
-                    TimeRemainingColumn(),
-                    console=self._ui.console,
-                    transient=False,
-                ) as progress:
-                    task: TaskID = progress.add_task("🗃️  Descomprimiendo", total=total)
+                with self._ui.progress(
+                    "🗃️  Descomprimiendo", total=total, unit="bytes"
+                ) as task:
 
                     for member in members:
-                        zip_ref.extract(member, path=dest_folder)
-                        progress.update(task, advance=member.file_size)
+                        target = zip_ref.extract(member, path=dest_folder)
+                        # Se conserva la fecha de cada archivo: las
+                        # actualizaciones incrementales comparan tamaño y fecha.
+                        if not member.is_dir():
+                            mtime = time.mktime(member.date_time + (0, 0, -1))
+                            os.utime(target, (mtime, mtime))
+                        task.advance(member.file_size)
 
             os.remove(zip_path)
             return True
@@ -115,6 +128,7 @@ class Dataset:
         except Exception:
             raise
 
+    @timed("Extracción RAR", profile=True)
     def unzipRAR(self, rar_path: Path, dest_folder: Path) -> bool:
         try:
             import rarfile
@@ -126,27 +140,13 @@ class Dataset:
                 members: list[rarfile.RarInfo] = rar_ref.infolist()
                 total: int = sum(member.file_size for member in members)
 
-                with Progress(
-                    SpinnerColumn(style="bar.pulse"),
-                    TextColumn("[bold white]{task.description}"),
-                    BarColumn(bar_width=None, style="white", finished_style="white"),
-                    TextColumn("{task.percentage:>3.0f}%"),
-                    TextColumn("•"),
-                    FileSizeColumn(),
-                    TextColumn("•"),
-                    TransferSpeedColumn(),
-                    TextColumn("•"),
-                    TimeRemainingColumn(),
-                    console=self._ui.console,
-                    transient=False,
-                ) as progress:
-                    task: TaskID = progress.add_task(
-                        "🗃️  Descomprimiendo RAR", total=total
-                    )
+                with self._ui.progress(
+                    "🗃️  Descomprimiendo RAR", total=total, unit="bytes"
+                ) as task:
 
                     for member in members:
                         rar_ref.extract(member, path=dest_folder)
-                        progress.update(task, advance=member.file_size)
+                        task.advance(member.file_size)
 
             os.remove(rar_path)
             return True
@@ -154,6 +154,7 @@ class Dataset:
         except Exception:
             raise
 
+    @timed("Extracción TAR", profile=True)
     def unzipTAR(self, tar_path: Path, dest_folder: Path) -> bool:
         try:
             import tarfile
@@ -165,27 +166,13 @@ class Dataset:
                 members: list[tarfile.TarInfo] = tar_ref.getmembers()
                 total: int = sum(member.size for member in members)
 
-                with Progress(
-                    SpinnerColumn(style="bar.pulse"),
-                    TextColumn("[bold white]{task.description}"),
-                    BarColumn(bar_width=None, style="white", finished_style="white"),
-                    TextColumn("{task.percentage:>3.0f}%"),
-                    TextColumn("•"),
-                    FileSizeColumn(),
-                    TextColumn("•"),
-                    TransferSpeedColumn(),
-                    TextColumn("•"),
-                    TimeRemainingColumn(),
-                    console=self._ui.console,
-                    transient=False,
-                ) as progress:
-                    task: TaskID = progress.add_task(
-                        "🗃️  Descomprimiendo TAR", total=total
-                    )
+                with self._ui.progress(
+                    "🗃️  Descomprimiendo TAR", total=total, unit="bytes"
+                ) as task:
 
                     for member in members:
                         tar_ref.extract(member, path=dest_folder)
-                        progress.update(task, advance=member.size)
+                        task.advance(member.size)
 
             os.remove(tar_path)
             return True
@@ -193,36 +180,87 @@ class Dataset:
         except Exception:
             raise
 
+    @timed("Reasignación de clases", profile=True)
+    def remap(self, source_path: Path, lut: list[int]) -> dict[str, int]:
+        from core.labels import remapChunk
+
+        try:
+            label_paths = SpillList(source_path.parent)
+            for record in walk(source_path):
+                if record.suffix in LABEL_EXTENSIONS:
+                    label_paths.append(record.path)
+
+            stats = {"labels": 0, "skipped": 0}
+            with self._ui.progress(
+                f"🔢 Reasignando clases de '{source_path.name}'",
+                total=len(label_paths),
+            ) as task:
+                for rewritten, skipped in poolMap(
+                    remapChunk,
+                    (row[0] for row in label_paths),
+                    LABEL_CHUNK_SIZE,
+                    None,
+                    lut,
+                ):
+                    stats["labels"] += rewritten
+                    stats["skipped"] += skipped
+                    task.advance(rewritten + skipped)
+
+            label_paths.close()
+            return stats
+
+        except Exception:
+            raise
+
+    @timed("Conversión de anotaciones", profile=True)
+    def convert(self, dataset_path: Path) -> dict[str, object] | None:
+        try:
+            coco_paths: list[str] = []
+            xml_paths = SpillList(dataset_path.parent)
+            images: dict[str, str] = {}
+            stems: dict[str, str] = {}
+
+            skip = (dataset_path / JOURNAL_DIRNAME,)
+            for record in walk(dataset_path, skip=skip):
+                suffix = record.suffix
+                if suffix in IMAGE_EXTENSIONS:
+                    images[record.name] = record.path
+                    stems.setdefault(record.stem, record.path)
+                elif fnmatch.fnmatch(record.name, COCO_ANNOTATIONS_PATTERN):
+                    coco_paths.append(record.path)
+                elif suffix == ".xml":
+                    xml_paths.append(record.path)
+
+            # Las etiquetas se escriben junto a cada imagen: la normalización
+            # las empareja (y renombra si colisionan) igual que las '.txt'.
+            if coco_paths:
+                result = self._convertCOCO(coco_paths, images)
+            elif len(xml_paths):
+                result = self._convertVOC(xml_paths, images, stems)
+            else:
+                result = None
+
+            xml_paths.close()
+            return result
+
+        except Exception:
+            raise
+
+    @timed("Escaneo", profile=True)
     def scan(self, dataset_path: Path) -> dict[str, int]:
         try:
             stats: dict[str, int] = {"images": 0, "labels": 0}
 
-            all_files: list[Path] = [f for f in dataset_path.rglob("*") if f.is_file()]
-
-            with Progress(
-                SpinnerColumn(style="bar.pulse"),
-                TextColumn("[bold white]{task.description}"),
-                BarColumn(bar_width=None, style="white", finished_style="white"),
-                TextColumn("{task.percentage:>3.0f}%"),
-                TextColumn("•"),
-                MofNCompleteColumn(),
-                TextColumn("•"),
-                TimeElapsedColumn(),
-                console=self._ui.console,
-                transient=False,
-            ) as progress:
-                task: TaskID = progress.add_task(
-                    "🔍 Escaneando contenido",
-                    total=len(all_files),
-                )
+            with self._ui.progress("🔍 Escaneando contenido") as task:
 
-                for file in all_files:
-                    progress.update(task, advance=1)
-                    time.sleep(0.0001)
+                skip = (dataset_path / JOURNAL_DIRNAME,)
+                for record in walk(dataset_path, skip=skip):
+                    task.advance()
 
-                    if file.suffix.lower() in IMAGE_EXTENSIONS:
+                    suffix = record.suffix
+                    if suffix in IMAGE_EXTENSIONS:
                         stats["images"] += 1
-                    elif file.suffix.lower() in LABEL_EXTENSIONS:
+                    elif suffix in LABEL_EXTENSIONS:
                         stats["labels"] += 1
 
             return stats
@@ -230,140 +268,513 @@ class Dataset:
         except Exception:
             raise
 
+    @timed("Normalización", profile=True)
     def normalize(
         self,
         dataset_path: Path,
         images_dir: Path,
         labels_dir: Path,
-    ) -> tuple[bool, list[tuple[Path, Path]]]:
+    ) -> tuple[bool, int, int]:
         try:
-            all_files: list[Path] = [f for f in dataset_path.rglob("*") if f.is_file()]
-
-            to_move: list[tuple[Path, Path]] = []
-            for file in all_files:
-                if file.parent == images_dir or file.parent == labels_dir:
-                    continue
-
-                if file.suffix.lower() in IMAGE_EXTENSIONS:
-                    dest = images_dir / file.name
-                elif file.suffix.lower() in LABEL_EXTENSIONS:
-                    dest = labels_dir / file.name
+            journal = Journal(dataset_path)
+            resumed = self._resume(journal, "normalize", "🧮 Normalizando dataset")
+            if resumed is not None:
+                return True, int(resumed["moved"]), int(resumed.get("renamed", 0))
+
+            images_dir.mkdir(parents=True, exist_ok=True)
+            labels_dir.mkdir(parents=True, exist_ok=True)
+
+            tmp_dir = dataset_path.parent
+            dest_dirs = {"images": images_dir, "labels": labels_dir}
+            sorter = ExternalSorter(tmp_dir, self._memory_budget_mb)
+            junk = SpillList(tmp_dir)
+            prefixes: dict[str, str] = {}
+
+            # Los archivos ya normalizados entran sin origen ni prefijo para
+            # detectar colisiones con ellos.
+            for stem, name in rows(images_dir, IMAGE_EXTENSIONS):
+                sorter.add(stem, "images", "", name, "")
+            for stem, name in rows(labels_dir, LABEL_EXTENSIONS):
+                sorter.add(stem, "labels", "", name, "")
+
+            for record in walk(
+                dataset_path, skip=(images_dir, labels_dir, journal.path)
+            ):
+                suffix = record.suffix
+                if suffix in IMAGE_EXTENSIONS:
+                    kind = "images"
+                elif suffix in LABEL_EXTENSIONS:
+                    kind = "labels"
                 else:
+                    junk.append(record.path)
                     continue
 
-                if dest.exists():
-                    raise Exception(f"El archivo {dest.name} ya existe (duplicado).")
-
-                to_move.append((file, dest))
-
-            with Progress(
-                SpinnerColumn(style="bar.pulse"),
-                TextColumn("[bold white]{task.description}"),
-                BarColumn(bar_width=None, style="white", finished_style="white"),
-                TextColumn("{task.percentage:>3.0f}%"),
-                TextColumn("•"),
-                MofNCompleteColumn(),
-                console=self._ui.console,
-                transient=False,
-            ) as progress:
-                task: TaskID = progress.add_task(
-                    "🧮 Normalizando dataset",
-                    total=len(to_move),
-                )
-
-                for src, dst in to_move:
-                    shutil.move(str(src), str(dst))
-                    progress.update(task, advance=1)
-                    time.sleep(0.0001)
-
-            if not to_move:
-                self._cleanFiles(dataset_path, images_dir, labels_dir)
-                self._cleanFolders(dataset_path, images_dir, labels_dir)
-                return True, []
+                prefix = prefixes.get(record.parent)
+                if prefix is None:
+                    prefix = self._pathPrefix(
+                        dataset_path, record.parent, (images_dir.name, labels_dir.name)
+                    )
+                    prefixes[record.parent] = prefix
+                sorter.add(record.stem, kind, prefix, record.name, record.path)
+
+            # Ordenado por stem, todos los archivos de un stem quedan
+            # contiguos. Si un mismo tipo llega desde varias carpetas (p. ej.
+            # 'cam1/0001.jpg' y 'cam2/0001.jpg'), todos los archivos del stem
+            # se renombran con el prefijo de su ruta relativa, así la imagen
+            # y su etiqueta reciben el mismo nombre nuevo.
+            renamed: set[str] = set()
+            for stem, group in groupBy(sorter):
+                for _, _, _, name in self._renames(group):
+                    new_stem = os.path.splitext(name)[0]
+                    if new_stem != stem:
+                        renamed.add(new_stem)
+
+            # Segunda pasada: un stem sin colisión que coincida con uno
+            # renombrado sigue siendo un duplicado real.
+            # Cada archivo registra su stem y prefijo de origen: las entregas
+            # posteriores se comparan con el dataset por ellos, no por el
+            # nombre ya renombrado.
+            plan = journal.plan("normalize")
+            origins = journal.manifest("origins", reset=True)
+            renamed_count = 0
+            for stem, group in groupBy(sorter):
+                targets = self._renames(group)
+                for _, _, old_name, name in targets:
+                    if stem in renamed and name == old_name:
+                        journal.discard("normalize")
+                        raise Exception(f"El archivo {name} ya existe (duplicado).")
+
+                for row, (kind, src, old_name, name) in zip(group, targets):
+                    if not src:
+                        continue
+                    plan.append(src, str(dest_dirs[kind] / name))
+                    origins.append(os.path.splitext(name)[0], kind, stem, row[2])
+                    renamed_count += name != old_name
+            moved = len(plan)
+            origins.sync()
+            origins.close()
+
+            for (path,) in junk:
+                plan.append(path, "")
+
+            keep = {images_dir.name, labels_dir.name, journal.path.name}
+            with os.scandir(dataset_path) as entries:
+                remove = [
+                    Path(entry.path)
+                    for entry in entries
+                    if entry.is_dir(follow_symlinks=False) and entry.name not in keep
+                ]
+
+            journal.commit(
+                "normalize",
+                plan,
+                {"moved": moved, "renamed": renamed_count},
+                remove=remove,
+            )
+            sorter.close()
+            junk.close()
 
-            self._cleanFiles(dataset_path, images_dir, labels_dir)
-            self._cleanFolders(dataset_path, images_dir, labels_dir)
-            return True, to_move
+            self._apply(journal, "normalize", "🧮 Normalizando dataset")
+            return True, moved, renamed_count
 
         except Exception:
             raise
 
+    @timed("Integridad", profile=True)
     def integrity(
         self,
         dataset_path: Path,
         images_dir: Path,
         labels_dir: Path,
-    ) -> tuple[list[str], list[str]]:
+        fingerprint: bool = False,
+    ) -> tuple[SpillList, SpillList]:
         try:
-            image_files: dict[str, Path] = {
-                f.stem: f
-                for f in images_dir.glob("*")
-                if f.suffix.lower() in IMAGE_EXTENSIONS
+            journal = Journal(dataset_path)
+            resumed = self._resume(journal, "integrity", "🧹 Moviendo huérfanos")
+            if resumed is not None:
+                return journal.manifest("pairs"), journal.manifest("orphans")
+
+            tmp_dir = dataset_path.parent
+            files = ExternalSorter(tmp_dir, self._memory_budget_mb)
+            for stem, name in rows(images_dir, IMAGE_EXTENSIONS):
+                files.add(stem, "images", name)
+            for stem, name in rows(labels_dir, LABEL_EXTENSIONS):
+                files.add(stem, "labels", name)
+            origins = journal.manifest("origins")
+            for stem, kind, source_stem, prefix in origins:
+                files.add(stem, "origin", kind, source_stem, prefix)
+            origins.close()
+
+            valid_pairs = journal.manifest("pairs", reset=True)
+            orphans = journal.manifest("orphans", reset=True)
+            # Sin huellas de contenido el manifiesto solo guarda tamaño y
+            # fecha; el hash se calcula al incorporar y solo si no coinciden.
+            delivered = (
+                SpillList(tmp_dir)
+                if fingerprint
+                else journal.manifest("files", reset=True)
+            )
+            plan = journal.plan("integrity")
+            source_dirs = {"images": images_dir, "labels": labels_dir}
+            orphans_dirs = {
+                "images": dataset_path / "orphans" / "images",
+                "labels": dataset_path / "orphans" / "labels",
             }
-            label_files: dict[str, Path] = {
-                f.stem: f
-                for f in labels_dir.glob("*")
-                if f.suffix.lower() in LABEL_EXTENSIONS
+            used: set[str] = set()
+
+            with self._ui.progress(
+                "⛓️‍💥 Verificando integridad",
+                total=len(files),
+            ) as task:
+
+                # Unión por stem sobre las filas ordenadas: cada stem con una
+                # imagen y una etiqueta es un par; el resto son huérfanos.
+                for stem, group in groupBy(files):
+                    images = [row[2] for row in group if row[1] == "images"]
+                    labels = [row[2] for row in group if row[1] == "labels"]
+                    origin = {row[2]: row[3:] for row in group if row[1] == "origin"}
+
+                    if images and labels:
+                        valid_pairs.append(stem, images[0], labels[0])
+                        for kind, name in (
+                            ("images", images[0]),
+                            ("labels", labels[0]),
+                        ):
+                            source_stem, prefix = origin.get(kind, (stem, ""))
+                            path = str(source_dirs[kind] / name)
+                            if fingerprint:
+                                delivered.append(source_stem, kind, prefix, stem, path)
+                                continue
+                            stat = os.stat(path)
+                            delivered.append(
+                                source_stem,
+                                kind,
+                                prefix,
+                                str(stat.st_size),
+                                str(stat.st_mtime_ns),
+                                "",
+                                stem,
+                            )
+                        extra = [("images", n) for n in images[1:]] + [
+                            ("labels", n) for n in labels[1:]
+                        ]
+                    else:
+                        orphans.append(stem)
+                        extra = [
+                            (row[1], row[2]) for row in group if row[1] != "origin"
+                        ]
+
+                    for kind, name in extra:
+                        plan.append(
+                            str(source_dirs[kind] / name),
+                            str(orphans_dirs[kind] / name),
+                        )
+                        used.add(kind)
+
+                    task.advance(len(group))
+
+            valid_pairs.sync()
+            orphans.sync()
+            if fingerprint:
+                self._fingerprint(journal, delivered)
+            else:
+                delivered.sync()
+            delivered.close()
+            journal.commit(
+                "integrity",
+                plan,
+                {"pairs": len(valid_pairs), "orphans": len(orphans)},
+                dirs=[orphans_dirs[kind] for kind in sorted(used)],
+            )
+            files.close()
+
+            self._apply(journal, "integrity", "🧹 Moviendo huérfanos")
+            return valid_pairs, orphans
+
+        except Exception:
+            raise
+
+    @timed("Etiquetas", profile=True)
+    def relabel(
+        self,
+        dataset_path: Path,
+        pairs: SpillList,
+        labels_dir: Path,
+        classes: list[str],
+        merge: dict[str, str] | None = None,
+        drop: list[str] | None = None,
+        min_size: float = LABEL_MIN_BOX_PERMILLE / 1000,
+    ) -> dict[str, object]:
+        import numpy as np
+        from core.labels import applyRules, loadChunk, writeChunk
+
+        try:
+            journal = Journal(dataset_path)
+            resumed = self._resume(journal, "relabel", "🏷️ Reemplazando etiquetas")
+            if resumed is not None:
+                return resumed
+
+            # Todas las etiquetas en una única tabla (archivo, línea, clase,
+            # caja): las reglas se aplican como operaciones de arrays.
+            parts = []
+            with self._ui.progress("🏷️ Leyendo etiquetas", total=len(pairs)) as task:
+                for count, part in poolMap(
+                    loadChunk,
+                    ((i, str(labels_dir / row[2])) for i, row in enumerate(pairs)),
+                    LABEL_CHUNK_SIZE,
+                ):
+                    parts.append(part)
+                    task.advance(count)
+            table = np.concatenate(parts)
+            del parts
+
+            keep, changed, new_classes, stats = applyRules(
+                table, classes, merge or {}, set(drop or []), min_size
+            )
+
+            # Solo se reescriben los archivos con alguna fila distinta; sus
+            # filas son contiguas en la tabla (se leyó en orden).
+            files = np.unique(table["file"][changed])
+            starts = np.searchsorted(table["file"], files, side="left")
+            ends = np.searchsorted(table["file"], files, side="right")
+
+            tmp_path = dataset_path / "labels.tmp"
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            tmp_path.mkdir(parents=True)
+
+            def items():
+                j = 0
+                for i, row in enumerate(pairs):
+                    if j < len(files) and files[j] == i:
+                        start, end = starts[j], ends[j]
+                        yield (
+                            str(labels_dir / row[2]),
+                            str(tmp_path / row[2]),
+                            table[start:end],
+                            keep[start:end],
+                        )
+                        j += 1
+
+            plan = journal.plan("relabel")
+            with self._ui.progress(
+                "🏷️ Escribiendo etiquetas", total=len(files)
+            ) as task:
+                for written in poolMap(writeChunk, items(), LABEL_CHUNK_SIZE):
+                    for tmp, dst in written:
+                        plan.append(tmp, dst)
+                    task.advance(len(written))
+
+            # Las reglas se guardan para aplicarlas igual a los pares que se
+            # incorporen más adelante.
+            result = {
+                **stats,
+                "files": len(pairs),
+                "files_changed": len(files),
+                "classes": new_classes,
+                "source_classes": list(classes),
+                "merge": merge or {},
+                "drop": sorted(drop or []),
+                "min_size": min_size,
             }
+            journal.commit("relabel", plan, result, remove=[tmp_path])
 
-            all_stems: list[str] = list(image_files.keys() | label_files.keys())
-            valid_pairs: list[str] = []
-            orphans: list[str] = []
-
-            with Progress(
-                SpinnerColumn(style="bar.pulse"),
-                TextColumn("[bold white]{task.description}"),
-                BarColumn(bar_width=None, style="white", finished_style="white"),
-                TextColumn("{task.percentage:>3.0f}%"),
-                TextColumn("•"),
-                MofNCompleteColumn(),
-                console=self._ui.console,
-                transient=False,
-            ) as progress:
-                task: TaskID = progress.add_task(
-                    "⛓️‍💥 Verificando integridad",
-                    total=len(all_stems),
-                )
+            self._apply(journal, "relabel", "🏷️ Reemplazando etiquetas")
+            return result
 
-                for stem in all_stems:
-                    has_image = stem in image_files
-                    has_label = stem in label_files
+        except Exception:
+            raise
 
-                    if has_image and has_label:
-                        valid_pairs.append(stem)
-                    else:
-                        orphans.append(stem)
+    @timed("Duplicados", profile=True)
+    def dedup(
+        self,
+        dataset_path: Path,
+        pairs: SpillList,
+        images_dir: Path,
+        labels_dir: Path,
+        remove_exact: bool = True,
+    ) -> tuple[SpillList, dict[str, int]]:
+        import numpy as np
+        from core.dedup import group, hashAll
 
-                    progress.update(task, advance=1)
-                    time.sleep(0.0001)
-
-            if len(orphans) > 0:
-                orphans_images_dir = dataset_path / "orphans" / "images"
-                orphans_labels_dir = dataset_path / "orphans" / "labels"
-                orphans_images_dir.mkdir(parents=True, exist_ok=True)
-                orphans_labels_dir.mkdir(parents=True, exist_ok=True)
-                for orphan in orphans:
-                    shutil.move(
-                        str(images_dir / f"{orphan}.*"),
-                        str(orphans_images_dir / f"{orphan}.*"),
+        try:
+            journal = Journal(dataset_path)
+            resumed = self._resume(journal, "dedup", "🧬 Apartando duplicados")
+            if resumed is not None:
+                return journal.manifest("dedup"), resumed
+
+            count = len(pairs)
+            with self._ui.progress("🧬 Calculando hashes", total=count) as task:
+                hashes = hashAll(
+                    (os.path.join(images_dir, image) for _, image, _ in pairs),
+                    count,
+                    advance=task.advance,
+                )
+            exact, roots = group(hashes)
+            removed = (exact != np.arange(count)) if remove_exact else None
+
+            # Las filas se ordenan por grupo para que el split reciba juntos
+            # todos los pares de un mismo grupo de duplicados.
+            sorter = ExternalSorter(dataset_path.parent, self._memory_budget_mb)
+            plan = journal.plan("dedup")
+            duplicates_dirs = {
+                "images": dataset_path / DEDUP_DIRNAME / "images",
+                "labels": dataset_path / DEDUP_DIRNAME / "labels",
+            }
+            for i, (stem, image, label) in enumerate(pairs):
+                if removed is not None and removed[i]:
+                    plan.append(
+                        str(images_dir / image), str(duplicates_dirs["images"] / image)
                     )
-                    shutil.move(
-                        str(labels_dir / f"{orphan}.*"),
-                        str(orphans_labels_dir / f"{orphan}.*"),
+                    plan.append(
+                        str(labels_dir / label), str(duplicates_dirs["labels"] / label)
                     )
+                else:
+                    sorter.add(f"{roots[i]:012d}", stem, image, label)
+
+            deduped = journal.manifest("dedup", reset=True)
+            for cluster, stem, image, label in sorter:
+                deduped.append(stem, image, label, cluster)
+            deduped.sync()
+            sorter.close()
+
+            kept = roots if removed is None else roots[~removed]
+            sizes = np.bincount(kept, minlength=count)
+            stats = {
+                "pairs": len(deduped),
+                "exact": int((exact != np.arange(count)).sum()),
+                "removed": 0 if removed is None else int(removed.sum()),
+                "clusters": int((sizes > 1).sum()),
+                "clustered": int(sizes[sizes > 1].sum()),
+            }
+            journal.commit(
+                "dedup",
+                plan,
+                stats,
+                dirs=list(duplicates_dirs.values()) if stats["removed"] else None,
+            )
+
+            self._apply(journal, "dedup", "🧬 Apartando duplicados")
+            return deduped, stats
+
+        except Exception:
+            raise
+
+    @timed("Teselado", profile=True)
+    def tile(
+        self,
+        dataset_path: Path,
+        pairs: SpillList,
+        images_dir: Path,
+        labels_dir: Path,
+        tile_size: int,
+        overlap: float = TILE_OVERLAP,
+        min_visibility: float = TILE_MIN_VISIBILITY,
+        empty_keep: float = TILE_EMPTY_KEEP,
+    ) -> tuple[SpillList, dict[str, int]]:
+        from core.tiling import tileChunk
+
+        try:
+            journal = Journal(dataset_path)
+            resumed = self._resume(journal, "tile", "🧩 Reemplazando imágenes")
+            if resumed is not None:
+                return journal.manifest("tiles"), resumed
+
+            tmp_path = dataset_path / "tiles.tmp"
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            (tmp_path / "images").mkdir(parents=True)
+            (tmp_path / "labels").mkdir(parents=True)
+
+            # Un stem con forma de tesela ('a_0_0') puede coincidir con una
+            # tesela de otra imagen ('a'): se detecta antes de mover nada.
+            reserved = {row[0] for row in pairs if re.fullmatch(r".+_\d+_\d+", row[0])}
+
+            tiled = journal.manifest("tiles", reset=True)
+            plan = journal.plan("tile")
+            stats = {
+                "tile_size": tile_size,
+                "images": 0,
+                "tiles": 0,
+                "empty_dropped": 0,
+                "boxes_dropped": 0,
+            }
+
+            with self._ui.progress(
+                "🧩 Dividiendo en teselas", total=len(pairs)
+            ) as task:
+                for results in poolMap(
+                    tileChunk,
+                    iter(pairs),
+                    TILE_CHUNK_SIZE,
+                    None,
+                    str(images_dir),
+                    str(labels_dir),
+                    str(tmp_path),
+                    tile_size,
+                    overlap,
+                    min_visibility,
+                    empty_keep,
+                ):
+                    for row, tiles, empty_dropped, boxes_dropped in results:
+                        stem, image, label = row[:3]
+                        if tiles is None:
+                            tiled.append(*row)
+                            continue
+
+                        # Las teselas heredan el grupo de su imagen (4º campo)
+                        # y quedan contiguas: el split nunca las separa.
+                        cluster = row[3] if len(row) > 3 else stem
+                        for tile_stem, tile_image, tile_label in tiles:
+                            if tile_stem in reserved:
+                                shutil.rmtree(tmp_path, ignore_errors=True)
+                                raise Exception(
+                                    f"La tesela {tile_stem} de '{image}' coincide"
+                                    + f" con el par {tile_stem} del dataset.\n"
+                                    + "  Renombre uno de los dos antes de teselar."
+                                )
+                            plan.append(
+                                str(tmp_path / "images" / tile_image),
+                                str(images_dir / tile_image),
+                            )
+                            plan.append(
+                                str(tmp_path / "labels" / tile_label),
+                                str(labels_dir / tile_label),
+                            )
+                            tiled.append(tile_stem, tile_image, tile_label, cluster)
+                        plan.append(str(images_dir / image), "")
+                        plan.append(str(labels_dir / label), "")
+
+                        stats["images"] += 1
+                        stats["tiles"] += len(tiles)
+                        stats["empty_dropped"] += empty_dropped
+                        stats["boxes_dropped"] += boxes_dropped
+
+                    task.advance(len(results))
+
+            tiled.sync()
+            stats["pairs"] = len(tiled)
+            journal.commit("tile", plan, stats, remove=[tmp_path])
+
+            self._apply(journal, "tile", "🧩 Reemplazando imágenes")
+            return tiled, stats
 
-            return valid_pairs, orphans
         except Exception:
             raise
 
+    @timed("Split", profile=True)
     def split(
         self,
-        stems: list[str],
+        pairs: SpillList | list[tuple[str, ...]],
         dataset_path: Path,
         images_dir: Path,
         labels_dir: Path,
-    ) -> tuple[list[str], list[str]]:
+        train_ratio: float = TRAIN_SPLIT_PERCENT / 100,
+    ) -> tuple[SpillList, SpillList]:
         try:
+            journal = Journal(dataset_path)
+            resumed = self._resume(journal, "split", "🔍 Moviendo pares de datos")
+            if resumed is not None:
+                return journal.manifest("train"), journal.manifest("val")
+
             dirs = {
                 "images_train": dataset_path / "train" / "images",
                 "labels_train": dataset_path / "train" / "labels",
@@ -371,55 +782,713 @@ class Dataset:
                 "labels_val": dataset_path / "val" / "labels",
             }
 
-            for d in dirs.values():
-                d.mkdir(parents=True, exist_ok=True)
-
-            random.shuffle(stems)
-            split_idx = int(len(stems) * 0.8)
-            train_stems = stems[:split_idx]
-            val_stems = stems[split_idx:]
-
-            with Progress(
-                SpinnerColumn(style="bar.pulse"),
-                TextColumn("[bold white]{task.description}"),
-                BarColumn(bar_width=None, style="white", finished_style="white"),
-                TextColumn("{task.percentage:>3.0f}%"),
-                TextColumn("•"),
-                MofNCompleteColumn(),
-                console=self._ui.console,
-                transient=False,
-            ) as progress:
-                task: TaskID = progress.add_task(
-                    "🔍 Moviendo pares de datos",
-                    total=len(stems),
+            train_stems = journal.manifest("train", reset=True)
+            val_stems = journal.manifest("val", reset=True)
+            plan = journal.plan("split")
+
+            total = len(pairs)
+            remaining_train = int(total * train_ratio)
+            remaining = total
+
+            # Muestreo secuencial (selección de Knuth): cada grupo va a train
+            # con probabilidad plazas_restantes / pares_restantes, lo que da un
+            # split aleatorio sin barajar la lista en memoria. Un par suelto es
+            # su propio grupo (split exacto); los pares de un mismo grupo de
+            # duplicados (4º campo, filas contiguas) van siempre juntos.
+            for _, group in itertools.groupby(
+                pairs, key=lambda row: row[3] if len(row) > 3 else row[0]
+            ):
+                group = list(group)
+                if random.random() * remaining < remaining_train:
+                    remaining_train -= len(group)
+                    split, stems = "train", train_stems
+                else:
+                    split, stems = "val", val_stems
+                remaining -= len(group)
+
+                for stem, image, label, *_ in group:
+                    plan.append(
+                        str(images_dir / image), str(dirs[f"images_{split}"] / image)
+                    )
+                    plan.append(
+                        str(labels_dir / label), str(dirs[f"labels_{split}"] / label)
+                    )
+                    stems.append(stem)
+
+            train_stems.sync()
+            val_stems.sync()
+            journal.commit(
+                "split",
+                plan,
+                {"train": len(train_stems), "val": len(val_stems)},
+                dirs=list(dirs.values()),
+                remove=[images_dir, labels_dir],
+            )
+
+            self._apply(journal, "split", "🔍 Moviendo pares de datos")
+            return train_stems, val_stems
+
+        except Exception:
+            raise
+
+    @timed("Redimensionado", profile=True)
+    def resize(
+        self,
+        dataset_path: Path,
+        imgsz: int,
+        fmt: str = "jpeg",
+        quality: int = RESIZE_QUALITY,
+        multiple: int = RESIZE_IMGSZ_MULTIPLE,
+    ) -> dict[str, object]:
+        from core.transcode import decodeTime, transcodeChunk
+
+        try:
+            journal = Journal(dataset_path)
+            resumed = self._resume(journal, "resize", "🖼️ Reemplazando imágenes")
+            if resumed is not None:
+                return resumed
+
+            long_side = imgsz * multiple
+
+            def items():
+                for path in self._splitImages(dataset_path):
+                    yield path, os.path.splitext(path)[0]
+
+            count = sum(1 for _ in items())
+            sample = [src for src, _ in itertools.islice(items(), RESIZE_SAMPLE_IMAGES)]
+            sample_set = set(sample)
+            sample_after: list[str] = []
+            decode_before = decodeTime(sample, imgsz)
+
+            plan = journal.plan("resize")
+            stats = {"transcoded": 0, "cached": 0, "bytes_before": 0, "bytes_after": 0}
+
+            with self._ui.progress(
+                "🖼️ Redimensionando imágenes",
+                total=count,
+            ) as task:
+                for results in poolMap(
+                    transcodeChunk,
+                    items(),
+                    RESIZE_CHUNK_SIZE,
+                    None,
+                    long_side,
+                    fmt,
+                    quality,
+                    str(RESIZE_CACHE_DIR),
+                ):
+                    for status, src, part, dst, size_in, size_out in results:
+                        stats["bytes_before"] += size_in
+                        stats["bytes_after"] += size_out
+                        if src in sample_set:
+                            sample_after.append(part or src)
+
+                        if status != "skip":
+                            stats["transcoded"] += 1
+                            stats["cached"] += status == "cached"
+                            # El resultado reemplaza al destino antes de borrar
+                            # el origen: reproducir el plan nunca borra la
+                            # imagen nueva aunque tenga el mismo nombre.
+                            plan.append(part, dst)
+                            if src != dst:
+                                plan.append(src, "")
+
+                    task.advance(len(results))
+
+            # Tiempo de decodificación por época (un proceso) antes y después,
+            # estimado con una muestra de imágenes.
+            decode_after = decodeTime(sample_after, imgsz)
+            result = {
+                "imgsz": imgsz,
+                "format": fmt,
+                "long_side": long_side,
+                "images": count,
+                **stats,
+                "epoch_decode_before_s": round(decode_before * count, 2),
+                "epoch_decode_after_s": round(decode_after * count, 2),
+            }
+            journal.commit("resize", plan, result)
+
+            self._apply(journal, "resize", "🖼️ Reemplazando imágenes")
+            return result
+
+        except Exception:
+            raise
+
+    @timed("Shards", profile=True)
+    def pack(
+        self,
+        dataset_path: Path,
+        target_mb: int = SHARD_TARGET_MB,
+    ) -> dict[str, object]:
+        from core.shards import ShardWriter
+
+        try:
+            journal = Journal(dataset_path)
+            resumed = self._resume(journal, "shards", "📦 Reemplazando train")
+            if resumed is not None:
+                self._useShards(dataset_path)
+                return resumed
+
+            # Solo se empaqueta train (se lee entero en cada época); val sigue
+            # como archivos para la validación, el benchmark y la calibración.
+            # Los shards se escriben aparte y sustituyen a train una vez
+            # completos.
+            shards_path = dataset_path / SHARDS_DIRNAME
+            tmp_path = dataset_path / f"{SHARDS_DIRNAME}.tmp"
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            shutil.rmtree(shards_path, ignore_errors=True)
+
+            images_dir = dataset_path / "train" / "images"
+            labels_dir = dataset_path / "train" / "labels"
+            count = sum(1 for _ in rows(images_dir, IMAGE_EXTENSIONS))
+
+            writer = ShardWriter(tmp_path / "train", target_mb)
+            with self._ui.progress("📦 Empaquetando train", total=count) as task:
+                for stem, name in rows(images_dir, IMAGE_EXTENSIONS):
+                    writer.add(
+                        name,
+                        str(images_dir / name),
+                        str(labels_dir / f"{stem}.txt"),
+                    )
+                    task.advance()
+            writer.close()
+
+            result = {
+                "images": writer.count,
+                "shards": writer.shards,
+                "target_mb": target_mb,
+                "bytes": self._getTotalSize(tmp_path),
+            }
+
+            plan = journal.plan("shards")
+            plan.append(str(tmp_path), str(shards_path))
+            journal.commit("shards", plan, result, remove=[dataset_path / "train"])
+
+            self._apply(journal, "shards", "📦 Reemplazando train")
+            self._useShards(dataset_path)
+            return result
+
+        except Exception:
+            raise
+
+    @timed("Comparación", profile=True)
+    def diff(
+        self,
+        dataset_path: Path,
+        source_path: Path,
+        staging_path: Path,
+        move: bool = False,
+    ) -> dict[str, int]:
+        try:
+            journal = Journal(dataset_path)
+            # Una incorporación confirmada e interrumpida se termina antes de
+            # comparar: el manifiesto debe reflejarla.
+            if journal.isCommitted("append"):
+                self._applyAppend(journal)
+
+            # Manifiesto (stem de origen, tipo, prefijo, tamaño, fecha, hash,
+            # stem en el dataset) y archivos de la entrega ordenados juntos
+            # por su stem de origen. El prefijo de carpeta se calcula como en
+            # 'normalize', así 'cam1/0001' y 'cam2/0001' no se confunden.
+            known = journal.manifest("files")
+            files = ExternalSorter(dataset_path.parent, self._memory_budget_mb)
+            for row in known:
+                files.add(row[0], "0", *row[1:])
+            known.close()
+            prefixes: dict[str, str] = {}
+            for record in walk(source_path):
+                if record.suffix in IMAGE_EXTENSIONS:
+                    kind = "images"
+                elif record.suffix in LABEL_EXTENSIONS:
+                    kind = "labels"
+                else:
+                    continue
+                prefix = prefixes.get(record.parent)
+                if prefix is None:
+                    prefix = self._pathPrefix(
+                        source_path, record.parent, ("images", "labels")
+                    )
+                    prefixes[record.parent] = prefix
+                files.add(record.stem, "1", kind, prefix, record.path)
+
+            merged = journal.manifest("files.next", reset=True)
+            stats = {
+                "files": 0,
+                "unchanged": 0,
+                "new": 0,
+                "changed": 0,
+                "incomplete": 0,
+            }
+
+            with self._ui.progress(
+                "🔎 Comparando con el manifiesto",
+                total=len(files),
+            ) as task:
+                for source_stem, group in groupBy(files):
+                    task.advance(len(group))
+                    previous = {
+                        (row[2], row[3]): tuple(row[4:])
+                        for row in group
+                        if row[1] == "0"
+                    }
+                    incoming: dict[str, list[tuple[str, str]]] = {}
+                    for row in group:
+                        if row[1] == "1":
+                            incoming.setdefault(row[3], []).append((row[2], row[4]))
+                    stats["files"] += sum(len(paths) for paths in incoming.values())
+
+                    # Como en 'normalize': un stem que llega de varias
+                    # carpetas recibe el prefijo de la suya.
+                    sources: dict[str, set[str]] = {}
+                    for kind, prefix in list(previous) + [
+                        (kind, prefix)
+                        for prefix, paths in incoming.items()
+                        for kind, _ in paths
+                    ]:
+                        sources.setdefault(kind, set()).add(prefix)
+                    colliding = any(len(found) > 1 for found in sources.values())
+                    used = {values[3] for values in previous.values()}
+
+                    fingerprints = dict(previous)
+                    for prefix, paths in sorted(incoming.items()):
+                        stem = next(
+                            (
+                                values[3]
+                                for (_, other), values in previous.items()
+                                if other == prefix
+                            ),
+                            None,
+                        )
+
+                        # Tamaño y fecha iguales bastan; si cambian, decide
+                        # el hash de contenido registrado. Sin hash (manifiesto
+                        # sin huellas) el archivo cuenta como modificado.
+                        changed = False
+                        current: dict[str, tuple[str, ...]] = {}
+                        for kind, path in paths:
+                            stat = os.stat(path)
+                            size, mtime = str(stat.st_size), str(stat.st_mtime_ns)
+                            old = previous.get((kind, prefix))
+                            if old and old[:2] == (size, mtime):
+                                continue
+                            content = digest(path)
+                            changed = changed or not old or old[2] != content
+                            current[kind] = (size, mtime, content)
+
+                        kinds = {kind for kind, _ in paths}
+                        if not changed:
+                            stats["unchanged"] += 1
+                        elif not kinds >= {"images", "labels"}:
+                            # Sin su pareja no se incorpora ni se registra: se
+                            # volverá a considerar cuando llegue completo.
+                            stats["incomplete"] += 1
+                            continue
+                        else:
+                            stats["changed" if stem else "new"] += 1
+                            if stem is None:
+                                stem = (
+                                    f"{prefix}_{source_stem}"
+                                    if colliding and prefix
+                                    else source_stem
+                                )
+                                if stem in used:
+                                    raise Exception(
+                                        f"El archivo {stem} ya existe (duplicado)."
+                                    )
+                                used.add(stem)
+
+                            # Se preparan con su nombre en el dataset: los
+                            # modificados reemplazan a su par.
+                            for kind, path in paths:
+                                target = staging_path / (
+                                    stem + os.path.splitext(path)[1]
+                                )
+                                if move:
+                                    os.replace(path, target)
+                                else:
+                                    shutil.copy2(path, target)
+
+                        for kind, values in current.items():
+                            fingerprints[(kind, prefix)] = (*values, stem)
+
+                    for (kind, prefix), values in sorted(fingerprints.items()):
+                        merged.append(source_stem, kind, prefix, *values)
+
+            merged.sync()
+            merged.close()
+            files.close()
+            return stats
+
+        except Exception:
+            raise
+
+    @timed("Incorporación", profile=True)
+    def append(
+        self,
+        dataset_path: Path,
+        staging_path: Path,
+        pairs: SpillList | list[tuple[str, ...]],
+    ) -> tuple[dict[str, object], SpillList]:
+        import numpy as np
+        from core.shards import ShardReader, ShardWriter
+        from core.transcode import transcodeChunk
+
+        try:
+            journal = Journal(dataset_path)
+            images_dir = staging_path / "images"
+            labels_dir = staging_path / "labels"
+
+            # Las imágenes nuevas se preparan igual que las del dataset.
+            renamed: dict[str, str] = {}
+            resize = journal.result("resize")
+            if resize:
+                with self._ui.progress(
+                    "🖼️ Redimensionando imágenes nuevas",
+                    total=len(pairs),
+                ) as task:
+                    for results in poolMap(
+                        transcodeChunk,
+                        (
+                            (str(images_dir / row[1]), str(images_dir / row[0]))
+                            for row in pairs
+                        ),
+                        RESIZE_CHUNK_SIZE,
+                        None,
+                        resize["long_side"],
+                        resize["format"],
+                        RESIZE_QUALITY,
+                        str(RESIZE_CACHE_DIR),
+                    ):
+                        for status, src, part, dst, *_ in results:
+                            if status != "skip":
+                                os.replace(part, dst)
+                                if src != dst:
+                                    os.remove(src)
+                                renamed[os.path.basename(src)] = os.path.basename(dst)
+                        task.advance(len(results))
+
+            # Ubicación actual de cada stem (split y archivos, o posición en
+            # los shards de train) ordenada junto a los pares nuevos.
+            shard_path = dataset_path / SHARDS_DIRNAME / "train"
+            reader = (
+                ShardReader(shard_path) if ShardReader.isShardDir(shard_path) else None
+            )
+            located = ExternalSorter(dataset_path.parent, self._memory_budget_mb)
+            for split in ("train", "val"):
+                for kind, extensions in (
+                    ("images", IMAGE_EXTENSIONS),
+                    ("labels", LABEL_EXTENSIONS),
+                ):
+                    folder = dataset_path / split / kind
+                    if folder.exists():
+                        for stem, name in rows(folder, extensions):
+                            located.add(stem, "0", split, kind, name)
+            if reader is not None:
+                for i, name in enumerate(reader.names()):
+                    located.add(
+                        os.path.splitext(name)[0], "0", "train", "shard", str(i)
+                    )
+            for row in pairs:
+                stem, image, label = row[:3]
+                cluster = row[3] if len(row) > 3 else stem
+                located.add(stem, "1", renamed.get(image, image), label, cluster)
+
+            split_result = journal.result("split")
+            ratio = split_result.get("train", 0) / max(
+                split_result.get("train", 0) + split_result.get("val", 0), 1
+            )
+            dirs = {
+                f"{kind}_{split}": dataset_path / split / kind
+                for split in ("train", "val")
+                for kind in ("images", "labels")
+                if not (reader is not None and split == "train")
+            }
+
+            plan = journal.plan("append")
+            appended = journal.manifest("appended", reset=True)
+            counts = {"new": 0, "changed": 0, "train": 0, "val": 0}
+            dropped: list[int] = []
+            packed: list[tuple[str, str]] = []
+
+            with self._ui.progress("➕ Asignando pares", total=len(located)) as task:
+                for stem, group in groupBy(located):
+                    task.advance(len(group))
+                    current = [row for row in group if row[1] == "0"]
+                    incoming = [row for row in group if row[1] == "1"]
+                    if not incoming:
+                        continue
+                    _, _, image, label, cluster = incoming[0]
+
+                    # Un par modificado conserva su split; uno nuevo se
+                    # asigna con la proporción del dataset y una semilla por
+                    # grupo (las teselas de una imagen van juntas).
+                    if current:
+                        split = current[0][2]
+                        counts["changed"] += 1
+                        for _, _, old_split, kind, name in current:
+                            if kind == "shard":
+                                dropped.append(int(name))
+                            elif kind == "images" and name != image:
+                                plan.append(
+                                    str(dataset_path / old_split / "images" / name), ""
+                                )
+                    else:
+                        split = (
+                            "train"
+                            if random.Random(cluster).random() < ratio
+                            else "val"
+                        )
+                        counts["new"] += 1
+                        counts[split] += 1
+
+                    if reader is not None and split == "train":
+                        packed.append((image, label))
+                        continue
+                    plan.append(
+                        str(images_dir / image), str(dirs[f"images_{split}"] / image)
+                    )
+                    plan.append(
+                        str(labels_dir / label), str(dirs[f"labels_{split}"] / label)
+                    )
+                    appended.append(split, str(dirs[f"images_{split}"] / image))
+            located.close()
+
+            # Con train en shards, las entradas reemplazadas salen del índice
+            # y los pares de train se añaden en shards nuevos; los shards
+            # existentes no se reescriben.
+            remove = [staging_path]
+            if reader is not None and (packed or dropped):
+                tmp_path = dataset_path / f"{SHARDS_DIRNAME}.tmp" / "train"
+                shutil.rmtree(tmp_path.parent, ignore_errors=True)
+                keep = np.setdiff1d(
+                    np.arange(len(reader)), np.array(dropped, dtype=np.int64)
                 )
+                reader.subset(keep, tmp_path)
 
-                self._moveBatch(
-                    train_stems,
-                    images_dir,
-                    labels_dir,
-                    dirs["images_train"],
-                    dirs["labels_train"],
+                first = max(
+                    (int(p.stem) for p in shard_path.glob("*.shard")), default=-1
                 )
-                self._moveBatch(
-                    val_stems,
-                    images_dir,
-                    labels_dir,
-                    dirs["images_val"],
-                    dirs["labels_val"],
+                writer = ShardWriter(
+                    tmp_path,
+                    journal.result("shards").get("target_mb", SHARD_TARGET_MB),
+                    first_shard=first + 1,
                 )
-                shutil.rmtree(str(images_dir))
-                shutil.rmtree(str(labels_dir))
-                progress.update(task, completed=len(stems))
-                time.sleep(0.0001)
+                with self._ui.progress(
+                    "📦 Empaquetando train", total=len(packed)
+                ) as task:
+                    for image, label in packed:
+                        writer.add(
+                            image, str(images_dir / image), str(labels_dir / label)
+                        )
+                        task.advance()
+                writer.close()
+
+                with os.scandir(tmp_path) as entries:
+                    for entry in entries:
+                        if not entry.is_symlink():
+                            plan.append(entry.path, str(shard_path / entry.name))
+                remove.append(tmp_path.parent)
+
+            # El manifiesto actualizado por 'diff' sustituye al anterior con
+            # el resto de movimientos.
+            next_manifest = journal.path / "files.next.tsv"
+            if next_manifest.exists():
+                plan.append(str(next_manifest), str(journal.path / "files.tsv"))
+
+            appended.sync()
+            result = {**counts, "shards": reader is not None}
+            journal.commit(
+                "append", plan, result, dirs=list(dirs.values()), remove=remove
+            )
 
-            return train_stems, val_stems
+            self._applyAppend(journal)
+            return result, appended
+
+        except Exception:
+            raise
+
+    @timed("Subconjunto", profile=True)
+    def subset(
+        self,
+        dataset_path: Path,
+        percent: float = SUBSET_PERCENT,
+        seed: int = 0,
+    ) -> dict[str, object]:
+        import numpy as np
+        import yaml
+        from core.labels import loadChunk
+        from core.shards import ShardReader
+        from core.subset import coverage, strata, stratify
+
+        try:
+            # Se regenera en cada uso: enlaces duros a los pares elegidos (o
+            # un índice de shards con enlaces a los originales), nunca copias
+            # salvo entre sistemas de archivos distintos.
+            subset_path = dataset_path / SUBSET_DIRNAME
+            shutil.rmtree(subset_path, ignore_errors=True)
+            subset_path.mkdir(parents=True)
+
+            with open(dataset_path / "data.yaml", "r") as f:
+                yaml_data = yaml.safe_load(f)
+
+            result: dict[str, object] = {"percent": percent}
+            for split in ("train", "val"):
+                shard_path = dataset_path / SHARDS_DIRNAME / split
+                if ShardReader.isShardDir(shard_path):
+                    reader = ShardReader(shard_path)
+                    count = len(reader)
+                    files = np.repeat(np.arange(count), reader.index["label_count"])
+                    classes = np.zeros(0, dtype=np.int64)
+                    if len(files):
+                        classes = (
+                            np.memmap(
+                                shard_path / "labels.f32", dtype=np.float32, mode="r"
+                            )
+                            .reshape(-1, 5)[:, 0]
+                            .astype(np.int64)
+                        )
+                else:
+                    images_dir = dataset_path / split / "images"
+                    labels_dir = dataset_path / split / "labels"
+                    images = [name for _, name in rows(images_dir, IMAGE_EXTENSIONS)]
+                    count = len(images)
+
+                    files = [np.zeros(0, dtype=np.int64)]
+                    classes = [np.zeros(0, dtype=np.int64)]
+                    with self._ui.progress(
+                        f"🧪 Leyendo etiquetas de {split}", total=count
+                    ) as task:
+                        for advance, part in poolMap(
+                            loadChunk,
+                            (
+                                (
+                                    i,
+                                    str(
+                                        labels_dir / f"{os.path.splitext(name)[0]}.txt"
+                                    ),
+                                )
+                                for i, name in enumerate(images)
+                            ),
+                            LABEL_CHUNK_SIZE,
+                        ):
+                            files.append(part["file"].astype(np.int64))
+                            classes.append(part["cls"].astype(np.int64))
+                            task.advance(advance)
+                    files, classes = np.concatenate(files), np.concatenate(classes)
+
+                if not count:
+                    raise Exception(
+                        f"No hay imágenes en '{split}' para el subconjunto."
+                    )
+
+                # Una imagen por estrato como mínimo: con porcentajes pequeños
+                # las clases raras siguen representadas.
+                groups = strata(files, classes, count)
+                selected = stratify(groups, percent, seed)
+                total_classes, covered = coverage(files, classes, selected)
+
+                if ShardReader.isShardDir(shard_path):
+                    reader.subset(selected, subset_path / split)
+                    yaml_data[split] = f"{SUBSET_DIRNAME}/{split}"
+                else:
+                    # Árbol propio de imágenes y etiquetas: Ultralytics guarda
+                    # el 'labels.cache' del subconjunto junto a él, sin tocar
+                    # las cachés del dataset completo.
+                    dest_images = subset_path / split / "images"
+                    dest_labels = subset_path / split / "labels"
+                    dest_images.mkdir(parents=True)
+                    dest_labels.mkdir(parents=True)
+                    for i in selected.tolist():
+                        label = f"{os.path.splitext(images[i])[0]}.txt"
+                        for src, dst in (
+                            (images_dir / images[i], dest_images / images[i]),
+                            (labels_dir / label, dest_labels / label),
+                        ):
+                            try:
+                                os.link(src, dst)
+                            except FileNotFoundError:
+                                pass
+                            except OSError:
+                                shutil.copy2(src, dst)
+                    yaml_data[split] = f"{SUBSET_DIRNAME}/{split}/images"
+
+                result[split] = len(selected)
+                result[f"{split}_total"] = count
+                result[f"{split}_classes"] = f"{covered}/{total_classes}"
+
+            yaml_path = subset_path / "data.yaml"
+            yaml_data["path"] = str(dataset_path)
+            with open(yaml_path, "w") as f:
+                yaml.dump(yaml_data, f, sort_keys=False)
+
+            result["yaml_path"] = yaml_path
+            return result
 
         except Exception:
             raise
 
-    def generateYAML(self, dataset_path: Path, classes: list[str]) -> tuple[bool, Path]:
+    @timed("Caché decodificada", profile=True)
+    def decode(
+        self,
+        dataset_path: Path,
+        imgsz: int,
+        budget_mb: int = DECODED_CACHE_BUDGET_MB,
+    ) -> dict[str, object]:
+        from core.loaders import DecodedCache, decodeChunk
+
+        try:
+            # Una caché ya construida para el mismo dataset e 'imgsz' se
+            # comparte entre entrenamientos y pruebas del barrido.
+            cache = DecodedCache(DecodedCache.location(dataset_path, imgsz))
+            if cache.valid:
+                cache.touch()
+                return {**cache.meta, "path": cache.path, "reused": True}
+
+            count = sum(1 for _ in self._splitImages(dataset_path))
+            limit = DecodedCache.evict(
+                count * imgsz * imgsz * 3, budget_mb, keep=cache.path
+            )
+
+            with self._ui.progress(
+                "🧊 Decodificando imágenes",
+                total=count,
+            ) as task:
+                meta = cache.write(
+                    poolMap(
+                        decodeChunk,
+                        self._splitImages(dataset_path),
+                        DECODED_CACHE_CHUNK_SIZE,
+                        None,
+                        imgsz,
+                    ),
+                    imgsz,
+                    count,
+                    limit,
+                    task.advance,
+                )
+
+            return {**meta, "path": cache.path, "reused": False}
+
+        except Exception:
+            raise
+
+    @timed("YAML", profile=True)
+    def generateYAML(
+        self,
+        dataset_path: Path,
+        classes: list[str] | None = None,
+    ) -> tuple[bool, Path]:
+        import yaml
+
         try:
+            # Sin clases explícitas se usan las que dejó la transformación de
+            # etiquetas o la combinación de fuentes.
+            if classes is None:
+                classes = self.classes(dataset_path)
+            if not classes:
+                raise Exception("No hay clases definidas para el data.yaml.")
+
             yaml_data = {
                 "path": str(dataset_path),
                 "train": "train/images",
@@ -428,67 +1497,295 @@ class Dataset:
                 "names": {i: name for i, name in enumerate(classes)},
             }
 
+            if (dataset_path / SHARDS_DIRNAME / "train").exists():
+                yaml_data["train"] = f"{SHARDS_DIRNAME}/train"
+
             yaml_path = dataset_path / "data.yaml"
             with open(yaml_path, "w") as f:
                 yaml.dump(yaml_data, f, sort_keys=False)
 
+            Journal(dataset_path).complete("yaml", classes=classes)
             return True, yaml_path
 
         except Exception:
             raise
 
+    def _convertCOCO(
+        self,
+        paths: list[str],
+        images: dict[str, str],
+    ) -> dict[str, object]:
+        import numpy as np
+        from core.convert import COCOReader, normalizeBoxes, writeLabels
+        from core.labels import sanitizeClassName
+
+        reader = COCOReader()
+        total = sum(os.path.getsize(path) for path in paths)
+        with self._ui.progress(
+            "📑 Leyendo anotaciones COCO", total=total, unit="bytes"
+        ) as task:
+            for path in paths:
+                reader.read(path, task.advance)
+
+        # Ids de categoría (dispersos en COCO) a ids YOLO consecutivos por
+        # orden de id.
+        category_ids = np.array(sorted(reader.categories), dtype=np.int64)
+        classes = [
+            sanitizeClassName(reader.categories[i]) for i in category_ids.tolist()
+        ]
+
+        image_index, categories, boxes = reader.annotations()
+        position = np.searchsorted(category_ids, categories)
+        position = np.clip(position, 0, max(len(category_ids) - 1, 0))
+        known = (
+            category_ids[position] == categories
+            if len(category_ids)
+            else np.zeros(len(categories), dtype=bool)
+        )
+
+        targets = [
+            (os.path.splitext(images[name])[0] + ".txt" if name in images else None)
+            for name in reader.files
+        ]
+        widths, heights = self._imageSizes(
+            reader.files, images, np.array(reader.widths), np.array(reader.heights)
+        )
+
+        image_index, position, boxes = image_index[known], position[known], boxes[known]
+        normalized = normalizeBoxes(boxes, widths[image_index], heights[image_index])
+
+        with self._ui.progress("📝 Escribiendo etiquetas YOLO", total=None):
+            written = writeLabels(targets, image_index, position, normalized)
+
+        return {
+            "format": "coco",
+            "images": written,
+            "missing": sum(target is None for target in targets),
+            "boxes": int(known.sum()),
+            "crowd": reader.crowd,
+            "unmatched": reader.unmatched,
+            "classes": classes,
+        }
+
+    def _convertVOC(
+        self,
+        paths: SpillList,
+        images: dict[str, str],
+        stems: dict[str, str],
+    ) -> dict[str, object]:
+        import numpy as np
+        from core.convert import normalizeBoxes, parseVOCChunk, writeLabels
+        from core.labels import sanitizeClassName
+
+        files: list[str] = []
+        targets: list[str | None] = []
+        widths: list[float] = []
+        heights: list[float] = []
+        names: list[str] = []
+        image_index: list[int] = []
+        coords: list[tuple[float, float, float, float]] = []
+
+        with self._ui.progress("📑 Leyendo anotaciones VOC", total=len(paths)) as task:
+            for records in poolMap(
+                parseVOCChunk, (row[0] for row in paths), VOC_CHUNK_SIZE
+            ):
+                for xml_path, filename, width, height, objects in records:
+                    stem = os.path.splitext(os.path.basename(xml_path))[0]
+                    image = images.get(filename) or stems.get(stem)
+                    files.append(os.path.basename(image) if image else filename)
+                    targets.append(
+                        os.path.splitext(image)[0] + ".txt" if image else None
+                    )
+                    widths.append(width)
+                    heights.append(height)
+                    for name, *box in objects:
+                        names.append(sanitizeClassName(name))
+                        image_index.append(len(targets) - 1)
+                        coords.append(tuple(box))
+                task.advance(len(records))
+
+        classes = sorted(set(names))
+        lut = {name: i for i, name in enumerate(classes)}
+        widths_array, heights_array = self._imageSizes(
+            files, images, np.array(widths), np.array(heights)
+        )
+        index = np.array(image_index, dtype=np.int64)
+        boxes = np.array(coords, dtype=np.float64).reshape(-1, 4)
+        normalized = normalizeBoxes(
+            boxes, widths_array[index], heights_array[index], xyxy=True
+        )
+        class_ids = np.array([lut[name] for name in names], dtype=np.int64)
+
+        with self._ui.progress("📝 Escribiendo etiquetas YOLO", total=None):
+            written = writeLabels(targets, index, class_ids, normalized)
+
+        return {
+            "format": "voc",
+            "images": written,
+            "missing": sum(target is None for target in targets),
+            "boxes": len(names),
+            "classes": classes,
+        }
+
+    def _imageSizes(self, files: list[str], images: dict[str, str], widths, heights):
+        # Tamaños que faltan en las anotaciones: se leen de la cabecera de la
+        # imagen (ya orientada, como la cargará el entrenamiento).
+        import numpy as np
+        from PIL import Image
+
+        widths, heights = widths.astype(np.float64), heights.astype(np.float64)
+        for i in np.flatnonzero((widths <= 0) | (heights <= 0)).tolist():
+            path = images.get(files[i])
+            if path is None:
+                widths[i] = heights[i] = 1.0
+                continue
+            with Image.open(path) as image:
+                width, height = image.size
+                if image.getexif().get(0x0112) in (5, 6, 7, 8):
+                    width, height = height, width
+            widths[i], heights[i] = float(width), float(height)
+        return widths, heights
+
+    def classes(self, dataset_path: Path) -> list[str]:
+        journal = Journal(dataset_path)
+        for stage in ("relabel", "ingest"):
+            classes = journal.result(stage).get("classes")
+            if classes:
+                return list(classes)
+        return []
+
     def _getTotalSize(self, path: Path) -> int:
         if path.is_file():
             return path.stat().st_size
 
-        total = 0
-        for p in path.rglob("*"):
-            if p.is_file():
-                total += p.stat().st_size
-        return total
-
-    def _cleanFiles(
-        self,
-        dataset_path: Path,
-        images_dir: Path,
-        labels_dir: Path,
-    ) -> None:
-        for p in dataset_path.rglob("*"):
-            if (
-                p.is_file()
-                and p.parent not in [images_dir, labels_dir]
-                and (
-                    p.suffix.lower() not in IMAGE_EXTENSIONS
-                    and p.suffix.lower() not in LABEL_EXTENSIONS
-                )
-            ):
-                p.unlink()
+        return sum(record.size for record in walk(path, sizes=True))
+
+    def _splitImages(self, dataset_path: Path):
+        for split in ("train", "val"):
+            image_dir = dataset_path / split / "images"
+            if image_dir.exists():
+                for stem, name in rows(image_dir, IMAGE_EXTENSIONS):
+                    yield str(image_dir / name)
+
+    def _useShards(self, dataset_path: Path) -> None:
+        import yaml
+
+        yaml_path = dataset_path / "data.yaml"
+        if not yaml_path.exists():
+            return
+
+        with open(yaml_path, "r") as f:
+            yaml_data = yaml.safe_load(f)
+        yaml_data["train"] = f"{SHARDS_DIRNAME}/train"
+        with open(yaml_path, "w") as f:
+            yaml.dump(yaml_data, f, sort_keys=False)
+
+    def _fingerprint(self, journal: Journal, delivered: SpillList) -> None:
+        # Manifiesto de los archivos entregados: stem y prefijo de origen,
+        # tamaño, fecha, hash de contenido y stem en el dataset. Las
+        # actualizaciones incrementales comparan primero tamaño y fecha y,
+        # si no coinciden, el hash, así una copia sin fechas no cuenta como
+        # modificada.
+        fingerprints = journal.manifest("files", reset=True)
+        with self._ui.progress(
+            "🔏 Calculando huellas de contenido",
+            total=len(delivered),
+        ) as task:
+            # Las filas esperan en orden a su hash; solo hay en memoria las
+            # de los bloques en vuelo.
+            queued: deque = deque()
+
+            def paths() -> Iterator[str]:
+                for row in delivered:
+                    queued.append(row)
+                    yield row[4]
+
+            for hashes in poolMap(digestChunk, paths(), DEDUP_CHUNK_SIZE):
+                for content in hashes:
+                    source_stem, kind, prefix, stem, path = queued.popleft()
+                    stat = os.stat(path)
+                    fingerprints.append(
+                        source_stem,
+                        kind,
+                        prefix,
+                        str(stat.st_size),
+                        str(stat.st_mtime_ns),
+                        content,
+                        stem,
+                    )
+                task.advance(len(hashes))
+        fingerprints.sync()
+        fingerprints.close()
 
-    def _cleanFolders(
+    def _pathPrefix(
         self,
         dataset_path: Path,
-        images_dir: Path,
-        labels_dir: Path,
-    ) -> None:
-        for p in dataset_path.rglob("*"):
-            if p.is_dir() and p not in [images_dir, labels_dir]:
-                shutil.rmtree(str(p))
-
-    def _moveBatch(
+        parent: str,
+        layout_dirs: tuple[str, ...],
+    ) -> str:
+        # 'cam1/images/noche' -> 'cam1_noche': la ruta relativa sin las
+        # carpetas de imágenes y etiquetas, para que ambas den el mismo prefijo.
+        parts = [
+            part
+            for part in Path(os.path.relpath(parent, dataset_path)).parts
+            if part != "." and part.lower() not in layout_dirs
+        ]
+        return re.sub(r"\W+", "_", "_".join(parts)).strip("_")
+
+    def _renames(self, group: list[tuple[str, ...]]) -> list[tuple[str, str, str, str]]:
+        # (tipo, origen, nombre, nombre de destino) para los archivos de un
+        # stem; los nombres solo cambian si el stem colisiona.
+        sources: dict[str, set[str]] = {}
+        for _, kind, prefix, _, _ in group:
+            sources.setdefault(kind, set()).add(prefix)
+        colliding = any(len(prefix_set) > 1 for prefix_set in sources.values())
+
+        targets: list[tuple[str, str, str, str]] = []
+        seen: set[tuple[str, str]] = set()
+        for _, kind, prefix, name, src in group:
+            new_name = f"{prefix}_{name}" if colliding and prefix else name
+            if (kind, new_name) in seen:
+                raise Exception(f"El archivo {name} ya existe (duplicado).")
+            seen.add((kind, new_name))
+            targets.append((kind, src, name, new_name))
+
+        return targets
+
+    def _resume(
         self,
-        stems: list[str],
-        source_images: Path,
-        source_labels: Path,
-        dest_images: Path,
-        dest_labels: Path,
-    ) -> None:
-        for stem in stems:
-            images = list(source_images.glob(f"{stem}.*"))
-            labels = list(source_labels.glob(f"{stem}.*"))
-
-            if len(images) != 1 or len(labels) != 1:
-                file_type = "imagen" if len(images) == 1 else "etiqueta"
-                raise Exception(f"No se encontró la {file_type} para el stem: {stem}")
-
-            shutil.move(str(images[0]), str(dest_images / images[0].name))
-            shutil.move(str(labels[0]), str(dest_labels / labels[0].name))
+        journal: Journal,
+        stage: str,
+        title: str,
+    ) -> dict[str, object] | None:
+        if journal.isDone(stage):
+            return journal.result(stage)
+
+        # Un plan confirmado se reproduce hasta el final; si no encaja con
+        # los archivos en disco se deshace y la etapa se repite completa.
+        if journal.isCommitted(stage):
+            try:
+                return self._apply(journal, stage, title)
+            except Exception as e:
+                self._ui.stepWarning(
+                    f"No se pudo reanudar la etapa '{stage}': {e}\n"
+                    + "  Se deshacen los movimientos y se repite la etapa."
+                )
+                journal.rollback(stage)
+
+        # Un plan sin confirmar no llegó a mover ningún archivo.
+        journal.discard(stage)
+        return None
+
+    def _applyAppend(self, journal: Journal) -> dict[str, object]:
+        result = self._apply(journal, "append", "➕ Incorporando pares")
+        split = journal.result("split")
+        journal.complete(
+            "split",
+            train=split.get("train", 0) + result["train"],
+            val=split.get("val", 0) + result["val"],
+        )
+        return result
+
+    def _apply(self, journal: Journal, stage: str, title: str) -> dict[str, object]:
+        with self._ui.progress(title, total=journal.pending(stage)) as task:
+            return journal.apply(stage, task.advance)
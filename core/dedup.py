@@ -0,0 +1,192 @@
+import hashlib
+from typing import Callable, Iterable
+
+import numpy as np
+
+from core.constants import DEDUP_CHUNK_SIZE, DEDUP_HAMMING_THRESHOLD
+from core.stream import poolMap
+
+
+def hashChunk(paths: list[str]) -> np.ndarray:
+    # Por imagen: tamaño, hash de contenido y aHash/dHash de 64 bits. Una
+    # imagen que no se puede decodificar queda con tamaño -1 (sin hashes).
+    from PIL import Image
+
+    hashes = np.zeros((len(paths), 4), dtype=np.uint64)
+    ahash_bits = np.zeros((len(paths), 64), dtype=bool)
+    dhash_bits = np.zeros((len(paths), 64), dtype=bool)
+    valid = np.zeros(len(paths), dtype=bool)
+
+    for i, path in enumerate(paths):
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            digest = hashlib.blake2b(data, digest_size=8).digest()
+            hashes[i, 0] = len(data)
+            hashes[i, 1] = int.from_bytes(digest, "big")
+
+            with Image.open(path) as image:
+                # 'draft' deja que el decodificador JPEG reduzca la imagen al
+                # leerla; los hashes solo necesitan unos pocos píxeles.
+                image.draft("L", (64, 64))
+                gray = image.convert("L")
+                small = np.asarray(gray.resize((9, 8), Image.BILINEAR), np.int16)
+                tiny = np.asarray(gray.resize((8, 8), Image.BILINEAR), np.int16)
+
+            ahash_bits[i] = (tiny > tiny.mean()).ravel()
+            dhash_bits[i] = (small[:, 1:] > small[:, :-1]).ravel()
+            valid[i] = True
+        except Exception:
+            hashes[i, 0] = np.iinfo(np.uint64).max
+
+    hashes[:, 2] = _pack(ahash_bits)
+    hashes[:, 3] = _pack(dhash_bits)
+    hashes[~valid, 2:] = 0
+    return hashes
+
+
+def hashAll(
+    paths: Iterable[str],
+    count: int,
+    workers: int | None = None,
+    advance: Callable[[int], None] | None = None,
+) -> np.ndarray:
+    hashes = np.zeros((count, 4), dtype=np.uint64)
+    offset = 0
+    for result in poolMap(hashChunk, paths, DEDUP_CHUNK_SIZE, workers):
+        hashes[offset : offset + len(result)] = result
+        offset += len(result)
+        if advance:
+            advance(len(result))
+
+    return hashes
+
+
+def popcount(values: np.ndarray) -> np.ndarray:
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(values)
+
+    # Suma de bits por palabra (SWAR) para NumPy < 2.0.
+    v = values - ((values >> np.uint64(1)) & np.uint64(0x5555555555555555))
+    v = (v & np.uint64(0x3333333333333333)) + (
+        (v >> np.uint64(2)) & np.uint64(0x3333333333333333)
+    )
+    v = (v + (v >> np.uint64(4))) & np.uint64(0x0F0F0F0F0F0F0F0F)
+    return (v * np.uint64(0x0101010101010101)) >> np.uint64(56)
+
+
+def exactGroups(hashes: np.ndarray) -> np.ndarray:
+    # Representante (menor índice) de cada grupo con igual tamaño y hash de
+    # contenido; las imágenes ilegibles son su propio representante.
+    count = len(hashes)
+    parent = np.arange(count, dtype=np.int64)
+    if count == 0:
+        return parent
+
+    order = np.lexsort((np.arange(count), hashes[:, 1], hashes[:, 0]))
+    size, digest = hashes[order, 0], hashes[order, 1]
+    new_group = np.ones(count, dtype=bool)
+    new_group[1:] = (size[1:] != size[:-1]) | (digest[1:] != digest[:-1])
+    new_group |= size == np.iinfo(np.uint64).max
+
+    starts = np.flatnonzero(new_group)
+    lengths = np.diff(np.append(starts, count))
+    parent[order] = order[np.repeat(starts, lengths)]
+    return parent
+
+
+def nearPairs(
+    ahash: np.ndarray,
+    dhash: np.ndarray,
+    threshold: int = DEDUP_HAMMING_THRESHOLD,
+) -> np.ndarray:
+    # Pares (i, j) con distancia de Hamming <= umbral en dHash y aHash.
+    # Se divide el dHash en 'umbral + 1' bandas: por el principio del
+    # palomar, dos hashes a esa distancia coinciden al menos en una banda,
+    # así que solo se comparan hashes del mismo cubo de alguna banda.
+    count = len(dhash)
+    bands = threshold + 1
+    width = 64 // bands
+    found: list[np.ndarray] = []
+
+    for band in range(bands):
+        shift = np.uint64(band * width)
+        bits = 64 - band * width if band == bands - 1 else width
+        mask = np.uint64((1 << bits) - 1)
+        keys = (dhash >> shift) & mask
+
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+        starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+        lengths = np.diff(np.append(starts, count))
+        run_length = np.repeat(lengths, lengths)
+        position = np.arange(count) - np.repeat(starts, lengths)
+
+        # Comparación vectorizada de cada elemento con el que está 'k'
+        # posiciones más adelante en su cubo, para k = 1 .. tamaño del cubo.
+        active = np.flatnonzero(position + 1 < run_length)
+        k = 1
+        while len(active):
+            left, right = order[active], order[active + k]
+            close = (popcount(dhash[left] ^ dhash[right]) <= threshold) & (
+                popcount(ahash[left] ^ ahash[right]) <= threshold
+            )
+            if close.any():
+                found.append(np.stack((left[close], right[close]), axis=1))
+
+            k += 1
+            active = active[position[active] + k < run_length[active]]
+
+    if not found:
+        return np.empty((0, 2), dtype=np.int64)
+    return np.unique(np.concatenate(found), axis=0)
+
+
+def group(
+    hashes: np.ndarray,
+    threshold: int = DEDUP_HAMMING_THRESHOLD,
+) -> tuple[np.ndarray, np.ndarray]:
+    # Devuelve el representante de cada duplicado exacto y la raíz del grupo
+    # (exactos y casi duplicados) de cada imagen.
+    exact = exactGroups(hashes)
+    valid = hashes[:, 0] != np.iinfo(np.uint64).max
+    reps = np.flatnonzero((exact == np.arange(len(hashes))) & valid)
+
+    # Los hashes perceptuales idénticos se unen directamente; la búsqueda por
+    # bandas solo recorre hashes distintos, así que miles de copias de una
+    # misma imagen no degeneran en cubos enormes.
+    unique, first, inverse = np.unique(
+        hashes[reps, 2:], axis=0, return_index=True, return_inverse=True
+    )
+    parent = exact.copy()
+    parent[reps] = reps[first][inverse.ravel()]
+
+    near = nearPairs(unique[:, 0], unique[:, 1], threshold)
+    return exact, clusters(parent, reps[first][near])
+
+
+def clusters(parent: np.ndarray, pairs: np.ndarray) -> np.ndarray:
+    # Union-find sobre los pares cercanos; devuelve la raíz (menor índice)
+    # del grupo de cada imagen.
+    parent = parent.copy()
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i, j in pairs.tolist():
+        root_i, root_j = find(i), find(j)
+        if root_i != root_j:
+            parent[max(root_i, root_j)] = min(root_i, root_j)
+
+    while True:
+        compressed = parent[parent]
+        if np.array_equal(compressed, parent):
+            return parent
+        parent = compressed
+
+
+def _pack(bits: np.ndarray) -> np.ndarray:
+    return np.packbits(bits, axis=1).view(">u8").ravel().astype(np.uint64)
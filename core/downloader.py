@@ -1,19 +1,7 @@
-import gdown
-import shutil
-import requests
+import os
 from pathlib import Path
 
-from rich.progress import (
-    BarColumn,
-    FileSizeColumn,
-    Progress,
-    SpinnerColumn,
-    TextColumn,
-    TimeElapsedColumn,
-    TimeRemainingColumn,
-    TransferSpeedColumn,
-)
-
+from core.profiler import timed
 from ui import BashUI
 
 
@@ -21,23 +9,19 @@ class Downloader:
     def __init__(self, ui: BashUI) -> None:
         self._ui: BashUI = ui
 
+    @timed("Descarga Drive")
     def runGD(self, url: str, dest_folder: Path) -> Path | None:
+        import gdown
+
         dest_folder.mkdir(parents=True, exist_ok=True)
         action_title = "carpeta" if self._isGDFolder(url) else "archivo"
 
         try:
-            with Progress(
-                SpinnerColumn(style="bar.pulse"),
-                TextColumn("[bold white]{task.description}"),
-                TextColumn("•"),
-                TimeElapsedColumn(),
-                console=self._ui.console,
-                transient=False,
-            ) as progress:
-                progress.add_task(
-                    f"📥 Descargando {action_title}... (Esto puede tardar unos minutos)",
-                    total=None,
-                )
+            with self._ui.progress(
+                f"📥 Descargando {action_title}... (Esto puede tardar unos minutos)",
+                total=None,
+                unit=None,
+            ):
 
                 if self._isGDFolder(url):
                     files = gdown.download_folder(
@@ -50,44 +34,37 @@ class Downloader:
                     return dest_folder if files else None
 
                 else:
-                    output_file = gdown.download(url, quiet=True, fuzzy=True)
-
-                    if output_file:
-                        source = Path(output_file)
-                        final_path = dest_folder / source.name
-                        shutil.move(str(source), str(final_path))
-                        return final_path
+                    # Se descarga directamente en el destino: varias descargas
+                    # simultáneas no comparten el directorio de trabajo.
+                    output_file = gdown.download(
+                        url,
+                        output=str(dest_folder) + os.sep,
+                        quiet=True,
+                        fuzzy=True,
+                    )
 
-                    return None
+                    return Path(output_file) if output_file else None
 
         except Exception:
             raise
 
+    @timed("Descarga YOLO")
     def runYOLO(self, url: str, dest_path: Path) -> bool:
+        import requests
+
         try:
+            dest_path.parent.mkdir(parents=True, exist_ok=True)
             response = requests.get(url, stream=True)
             total = int(response.headers.get("content-length", 0))
 
-            with Progress(
-                SpinnerColumn(style="bar.pulse"),
-                TextColumn("[bold white]{task.description}"),
-                BarColumn(bar_width=None, style="white", finished_style="white"),
-                TextColumn("{task.percentage:>3.0f}%"),
-                TextColumn("•"),
-                FileSizeColumn(),
-                TextColumn("•"),
-                TransferSpeedColumn(),
-                TextColumn("•"),
-                TimeRemainingColumn(),
-                console=self._ui.console,
-                transient=False,
-            ) as progress:
-                task = progress.add_task("📥 Descargando modelo", total=total)
+            with self._ui.progress(
+                "📥 Descargando modelo", total=total, unit="bytes"
+            ) as task:
 
                 with open(dest_path, "wb") as f:
                     for chunk in response.iter_content(chunk_size=8192):
                         f.write(chunk)
-                        progress.update(task, advance=len(chunk))
+                        task.advance(len(chunk))
 
             return True
 
@@ -0,0 +1,169 @@
+from pathlib import Path
+
+from core.constants import YOLO_MODEL_VERSIONS
+
+JOB_KEYS = {
+    "source",
+    "classes",
+    "split",
+    "dedup",
+    "relabel",
+    "tile",
+    "resize",
+    "shards",
+    "model",
+    "epochs",
+    "batch",
+    "imgsz",
+    "device",
+    "autotune",
+    "smoke_test",
+    "export",
+    "quantize",
+}
+
+
+class Job:
+    @staticmethod
+    def load(
+        job_path: Path | None,
+        overrides: dict[str, object] | None = None,
+    ) -> dict[str, object]:
+        spec: dict[str, object] = {}
+
+        if job_path:
+            if not job_path.exists():
+                raise Exception(f"El archivo '{job_path}' no existe.")
+
+            if job_path.suffix.lower() == ".toml":
+                import tomllib
+
+                with open(job_path, "rb") as f:
+                    spec = tomllib.load(f)
+            else:
+                import yaml
+
+                with open(job_path, "r", encoding="utf-8") as f:
+                    spec = yaml.safe_load(f) or {}
+
+            if not isinstance(spec, dict):
+                raise Exception("El trabajo debe ser un mapa de claves y valores.")
+
+        for key, value in (overrides or {}).items():
+            if value is not None:
+                spec[key] = value
+
+        unknown = set(spec) - JOB_KEYS
+        if unknown:
+            raise Exception(f"Claves no soportadas: {', '.join(sorted(unknown))}.")
+
+        # Con varias fuentes cada una trae sus clases y 'classes' no se usa.
+        required = ["source"]
+        if not isinstance(spec.get("source"), list):
+            required.append("classes")
+        for key in required:
+            if not spec.get(key):
+                raise Exception(f"Falta la clave obligatoria '{key}'.")
+
+        return spec
+
+    @staticmethod
+    def answers(spec: dict[str, object]) -> dict[str, object]:
+        answers: dict[str, object] = {
+            "classes_more": False,
+            "start_training": True,
+            "autotune": bool(spec.get("autotune", False)),
+            "autotune_reuse": True,
+            "export": bool(spec.get("export", False)),
+            "quantize": bool(spec.get("quantize", False)),
+            "dedup_exact": bool(spec.get("dedup", True)),
+            "shards": bool(spec.get("shards", False)),
+        }
+
+        # 'resize: true' o directamente el formato ('jpeg' o 'webp').
+        resize = spec.get("resize", False)
+        answers["resize"] = bool(resize)
+        if isinstance(resize, str):
+            answers["resize_format"] = resize
+
+        # 'relabel: {merge: {origen: destino}, drop: [clases], min_size: ‰}'.
+        relabel = spec.get("relabel", False)
+        answers["relabel"] = bool(relabel)
+        if isinstance(relabel, dict):
+            merge = relabel.get("merge") or {}
+            drop = relabel.get("drop") or []
+            answers["relabel_merge"] = (
+                ",".join(f"{old}={new}" for old, new in merge.items()) or "no"
+            )
+            answers["relabel_drop"] = ",".join(map(str, drop)) or "no"
+            if "min_size" in relabel:
+                answers["relabel_min_size"] = int(relabel["min_size"])
+
+        # 'tile: true' o directamente el tamaño de tesela en píxeles.
+        tile = spec.get("tile", False)
+        answers["tile"] = bool(tile)
+        if isinstance(tile, int) and not isinstance(tile, bool):
+            answers["tile_size"] = tile
+
+        # 'smoke_test: true' o directamente el porcentaje del subconjunto.
+        smoke_test = spec.get("smoke_test", False)
+        answers["smoke_test"] = bool(smoke_test)
+        if isinstance(smoke_test, (int, float)) and not isinstance(smoke_test, bool):
+            answers["smoke_percent"] = int(smoke_test)
+
+        # Varias fuentes: lista de {source, classes} con las clases de cada
+        # entrega en el orden de sus ids.
+        source = spec["source"]
+        if isinstance(source, list):
+            answers["source"] = "varias"
+            answers["source_count"] = len(source)
+            for i, item in enumerate(source, 1):
+                if not isinstance(item, dict) or not item.get("classes"):
+                    raise Exception(f"La fuente {i} necesita 'source' y 'classes'.")
+                classes = item["classes"]
+                answers[f"source_{i}"] = str(item.get("source", ""))
+                answers[f"source_{i}_classes"] = (
+                    ",".join(map(str, classes))
+                    if isinstance(classes, list)
+                    else classes
+                )
+        elif str(source).startswith("http"):
+            answers["source"] = "drive"
+            answers["source_url"] = str(source)
+        else:
+            answers["source"] = "local"
+            answers["source_path"] = str(source)
+
+        if "classes" in spec:
+            classes = spec["classes"]
+            answers["classes"] = (
+                ",".join(map(str, classes)) if isinstance(classes, list) else classes
+            )
+
+        if "split" in spec:
+            split = float(spec["split"])
+            answers["split"] = int(round(split * 100 if split <= 1 else split))
+
+        model = str(spec.get("model", "n"))
+        if model in YOLO_MODEL_VERSIONS:
+            answers["model_source"] = "yolo"
+            answers["model_version"] = model
+        elif model.startswith("http"):
+            answers["model_source"] = "drive"
+            answers["model_url"] = model
+        else:
+            answers["model_source"] = "local"
+            answers["model_path"] = model
+
+        for key in ("epochs", "batch", "imgsz"):
+            if key in spec:
+                answers[key] = int(spec[key])
+
+        device = str(spec.get("device", "auto")).strip().lower()
+        if device.replace(",", "").replace(" ", "").isdigit():
+            answers["device"] = "cuda"
+            answers["gpu_ids"] = device
+        else:
+            answers["device"] = device
+
+        return answers
@@ -0,0 +1,191 @@
+import os
+import json
+import shutil
+from pathlib import Path
+from typing import Callable
+
+from core.constants import DATASETS_DIR, JOURNAL_DIRNAME, JOURNAL_FILENAME
+from core.stream import SpillList
+
+
+class Journal:
+    def __init__(self, dataset_path: Path) -> None:
+        self.path: Path = dataset_path / JOURNAL_DIRNAME
+        self._state: dict[str, object] = self._load()
+
+    @staticmethod
+    def signature(source: Path | str) -> str:
+        # Un origen local se identifica por ruta, tamaño y fecha de
+        # modificación; un enlace, por la propia URL.
+        if isinstance(source, Path):
+            stat = source.stat()
+            return f"{source.resolve()}|{stat.st_size}|{stat.st_mtime_ns}"
+        return str(source)
+
+    @staticmethod
+    def find(signature: str) -> Path | None:
+        if not DATASETS_DIR.exists():
+            return None
+
+        for dataset_path in sorted(DATASETS_DIR.iterdir(), reverse=True):
+            journal = Journal(dataset_path)
+            if journal.resumable and journal._state.get("source") == signature:
+                return dataset_path
+
+        return None
+
+    @staticmethod
+    def isResumable(dataset_path: Path | None) -> bool:
+        if not dataset_path or not isinstance(dataset_path, Path):
+            return False
+        return Journal(dataset_path).resumable
+
+    @property
+    def resumable(self) -> bool:
+        return self.isDone("ingest") and self._state.get("status") != "completed"
+
+    def start(self, signature: str) -> None:
+        self._state = {"source": signature, "status": "processing", "stages": {}}
+        self._save()
+
+    def finish(self) -> None:
+        if self._state.get("stages"):
+            self._state["status"] = "completed"
+            self._save()
+
+    def stages(self) -> list[str]:
+        return list(self._state.get("stages", {}).keys())
+
+    def isDone(self, stage: str) -> bool:
+        return stage in self._state.get("stages", {})
+
+    def result(self, stage: str) -> dict[str, object]:
+        return self._state.get("stages", {}).get(stage, {})
+
+    def complete(self, stage: str, **result: object) -> None:
+        self._state.setdefault("stages", {})[stage] = result
+        self._save()
+
+    def manifest(self, name: str, reset: bool = False) -> SpillList:
+        self.path.mkdir(parents=True, exist_ok=True)
+        path = self.path / f"{name}.tsv"
+        if reset:
+            path.unlink(missing_ok=True)
+        return SpillList(path=path)
+
+    def plan(self, stage: str) -> SpillList:
+        # Movimientos planificados (origen, destino; destino vacío = borrar).
+        # Se escriben completos antes de tocar ningún archivo.
+        self.discard(stage)
+        self.path.mkdir(parents=True, exist_ok=True)
+        return SpillList(path=self.path / f"{stage}.plan")
+
+    def commit(
+        self,
+        stage: str,
+        plan: SpillList,
+        result: dict[str, object],
+        dirs: list[Path] | None = None,
+        remove: list[Path] | None = None,
+    ) -> None:
+        plan.sync()
+        plan.close()
+        commit = {
+            "result": result,
+            "dirs": [str(d) for d in dirs or []],
+            "remove": [str(d) for d in remove or []],
+        }
+
+        # El plan solo es válido (y reproducible) una vez existe su 'commit'.
+        path = self.path / f"{stage}.commit"
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(commit, f)
+            f.flush()
+            os.fsync(f.fileno())
+        tmp_path.replace(path)
+
+    def isCommitted(self, stage: str) -> bool:
+        return (self.path / f"{stage}.commit").exists()
+
+    def pending(self, stage: str) -> int:
+        plan = SpillList(path=self.path / f"{stage}.plan")
+        count = len(plan)
+        plan.close()
+        return count
+
+    def apply(
+        self,
+        stage: str,
+        advance: Callable[[], None] | None = None,
+    ) -> dict[str, object]:
+        with open(self.path / f"{stage}.commit", "r", encoding="utf-8") as f:
+            commit: dict[str, object] = json.load(f)
+
+        for d in commit["dirs"]:
+            Path(d).mkdir(parents=True, exist_ok=True)
+
+        # Reproducir el plan es idempotente: un movimiento ya aplicado se
+        # reconoce porque falta el origen y existe el destino.
+        plan = SpillList(path=self.path / f"{stage}.plan")
+        for src, dst in plan:
+            if not dst:
+                try:
+                    os.remove(src)
+                except FileNotFoundError:
+                    pass
+            else:
+                try:
+                    os.replace(src, dst)
+                except FileNotFoundError:
+                    if not os.path.exists(dst):
+                        raise Exception(
+                            f"No se encontró '{Path(src).name}' al aplicar '{stage}'."
+                        )
+            if advance:
+                advance()
+        plan.close()
+
+        for d in commit["remove"]:
+            shutil.rmtree(d, ignore_errors=True)
+
+        self.complete(stage, **commit["result"])
+        self.discard(stage)
+        return commit["result"]
+
+    def rollback(self, stage: str) -> None:
+        # Deshace los movimientos aplicados (los borrados no se recuperan) y
+        # descarta el plan para que la etapa vuelva a ejecutarse completa.
+        plan = SpillList(path=self.path / f"{stage}.plan")
+        for src, dst in plan:
+            if dst and os.path.exists(dst) and not os.path.exists(src):
+                os.makedirs(os.path.dirname(src), exist_ok=True)
+                os.replace(dst, src)
+        plan.close()
+        self.discard(stage)
+
+    def discard(self, stage: str) -> None:
+        (self.path / f"{stage}.plan").unlink(missing_ok=True)
+        (self.path / f"{stage}.commit").unlink(missing_ok=True)
+
+    def _load(self) -> dict[str, object]:
+        path = self.path / JOURNAL_FILENAME
+        if not path.exists():
+            return {"stages": {}}
+
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"stages": {}}
+
+    def _save(self) -> None:
+        self.path.mkdir(parents=True, exist_ok=True)
+
+        path = self.path / JOURNAL_FILENAME
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._state, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        tmp_path.replace(path)
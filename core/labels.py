@@ -0,0 +1,214 @@
+import os
+import re
+
+
+def sanitizeClassName(raw_name: str) -> str:
+    text = raw_name.strip().lower()
+    text = re.sub(r"\s+", "_", text)
+    text = re.sub(r"[^\w]", "", text)
+    text = re.sub(r"_+", "_", text)
+    text = text.strip("_")
+
+    return text
+
+
+def unifyClasses(class_lists: list[list[str]]) -> tuple[list[str], list[list[int]]]:
+    # Espacio de ids común (por orden de aparición) y, por fuente, la tabla
+    # id_original -> id_unificado.
+    classes: list[str] = []
+    luts: list[list[int]] = []
+    for names in class_lists:
+        lut: list[int] = []
+        for name in names:
+            if name not in classes:
+                classes.append(name)
+            lut.append(classes.index(name))
+        luts.append(lut)
+    return classes, luts
+
+
+def remapChunk(paths: list[str], lut: list[int]) -> tuple[int, int]:
+    # Los ids de clase de todas las etiquetas del bloque se traducen con una
+    # sola indexación de NumPy; cada archivo se reemplaza de forma atómica.
+    # Los '.txt' que no son etiquetas (README, classes.txt...) se ignoran.
+    import numpy as np
+
+    files: list[tuple[str, list[str]]] = []
+    ids: list[int] = []
+    skipped = 0
+
+    for path in paths:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            lines = [line.split(maxsplit=1) for line in f if line.strip()]
+        try:
+            file_ids = [int(parts[0]) for parts in lines]
+        except ValueError:
+            skipped += 1
+            continue
+        files.append((path, [parts[1] if len(parts) > 1 else "" for parts in lines]))
+        ids.extend(file_ids)
+
+    ids_array = np.array(ids, dtype=np.int64)
+    invalid = (ids_array < 0) | (ids_array >= len(lut))
+    if invalid.any():
+        bad = int(ids_array[invalid][0])
+        raise Exception(
+            f"La clase {bad} no existe en la lista de clases de su fuente"
+            + f" ({len(lut)} clases)."
+        )
+    new_ids = np.asarray(lut, dtype=np.int64)[ids_array].tolist()
+
+    position = 0
+    for path, rests in files:
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for new_id, rest in zip(new_ids[position : position + len(rests)], rests):
+                f.write(f"{new_id} {rest}".rstrip() + "\n")
+        os.replace(tmp_path, path)
+        position += len(rests)
+
+    return len(files), skipped
+
+
+# Tabla de etiquetas: una fila por caja con el id del archivo (posición en la
+# lista de pares), su línea dentro del archivo, la clase y la caja YOLO.
+TABLE_DTYPE = [
+    ("file", "<i8"),
+    ("line", "<i4"),
+    ("cls", "<i4"),
+    ("x", "<f4"),
+    ("y", "<f4"),
+    ("w", "<f4"),
+    ("h", "<f4"),
+]
+
+
+def loadChunk(items: list[tuple[int, str]]) -> tuple[int, object]:
+    # Filas de la tabla para un bloque de (id, ruta). Los polígonos de
+    # segmentación se representan por su caja envolvente.
+    import numpy as np
+
+    rows: list[tuple[int, int, int, float, float, float, float]] = []
+    for file_id, path in items:
+        with open(path, "r", encoding="utf-8") as f:
+            lines = [line.split() for line in f if line.strip()]
+        for line_id, values in enumerate(lines):
+            try:
+                cls = int(float(values[0]))
+                numbers = [float(v) for v in values[1:]]
+            except ValueError:
+                raise Exception(f"Línea {line_id + 1} no válida en '{path}'.")
+            if len(numbers) > 4:
+                xs, ys = numbers[0::2], numbers[1::2]
+                x0, x1, y0, y1 = min(xs), max(xs), min(ys), max(ys)
+                numbers = [(x0 + x1) / 2, (y0 + y1) / 2, x1 - x0, y1 - y0]
+            elif len(numbers) < 4:
+                numbers = [0.0, 0.0, 0.0, 0.0]
+            rows.append((file_id, line_id, cls, *numbers))
+
+    return len(items), np.array(rows, dtype=TABLE_DTYPE)
+
+
+def applyRules(
+    table,
+    classes: list[str],
+    merge: dict[str, str],
+    drop: set[str],
+    min_size: float,
+) -> tuple[object, object, list[str], dict[str, int]]:
+    # Reglas sobre la tabla completa como operaciones de arrays: fusión o
+    # renombrado y descarte de clases (tabla id_antiguo -> id_nuevo),
+    # recorte de cajas a la imagen, tamaño mínimo y cajas repetidas.
+    # Devuelve las máscaras de filas que se conservan y de filas que cambian
+    # (la tabla se actualiza en su sitio), las clases resultantes y las
+    # cuentas de cada regla.
+    import numpy as np
+
+    names = [merge.get(name, name) for name in classes]
+    new_classes: list[str] = []
+    for name in names:
+        if name not in drop and name not in new_classes:
+            new_classes.append(name)
+
+    lut = np.array(
+        [new_classes.index(name) if name in new_classes else -1 for name in names]
+        + [-2],
+        dtype=np.int32,
+    )
+    cls = table["cls"].copy()
+    valid = (cls >= 0) & (cls < len(classes))
+    new_cls = lut[np.where(valid, cls, len(classes))]
+
+    x0 = np.clip(table["x"] - table["w"] / 2, 0, 1)
+    y0 = np.clip(table["y"] - table["h"] / 2, 0, 1)
+    x1 = np.clip(table["x"] + table["w"] / 2, 0, 1)
+    y1 = np.clip(table["y"] + table["h"] / 2, 0, 1)
+    w, h = x1 - x0, y1 - y0
+    clipped = (np.abs(w - table["w"]) > 1e-6) | (np.abs(h - table["h"]) > 1e-6)
+
+    table["cls"] = new_cls
+    table["x"], table["y"] = (x0 + x1) / 2, (y0 + y1) / 2
+    table["w"], table["h"] = w, h
+
+    keep_class = new_cls >= 0
+    keep_size = (w > 0) & (h > 0) & (w >= min_size) & (h >= min_size)
+    keep = keep_class & keep_size
+
+    # Cajas repetidas (misma clase y coordenadas a 6 decimales) en un mismo
+    # archivo: se conserva la primera aparición.
+    kept = np.flatnonzero(keep)
+    key = np.stack(
+        [
+            table["file"][kept].astype(np.float64),
+            new_cls[kept].astype(np.float64),
+            *(np.round(table[c][kept].astype(np.float64), 6) for c in "xywh"),
+        ],
+        axis=1,
+    )
+    _, first = np.unique(key, axis=0, return_index=True)
+    unique = np.zeros(len(table), dtype=bool)
+    unique[kept[first]] = True
+    duplicates = keep & ~unique
+    keep &= unique
+    changed = ~keep | (new_cls != cls) | clipped
+
+    stats = {
+        "boxes": len(table),
+        "invalid": int((new_cls == -2).sum()),
+        "dropped_class": int((new_cls == -1).sum()),
+        "dropped_small": int((keep_class & ~keep_size).sum()),
+        "duplicates": int(duplicates.sum()),
+        "clipped": int((clipped & keep).sum()),
+        "kept": int(keep.sum()),
+    }
+    return keep, changed, new_classes, stats
+
+
+def writeChunk(
+    items: list[tuple[str, str, object, object]],
+) -> list[tuple[str, str]]:
+    # Por archivo (origen, destino temporal, filas de la tabla y máscara):
+    # las cajas se escriben desde la tabla y los polígonos conservan sus
+    # puntos (recortados a la imagen) con la clase nueva. Devuelve los pares
+    # (temporal, origen) que reemplazan a cada etiqueta.
+    written: list[tuple[str, str]] = []
+    for src, dst, rows, keep in items:
+        with open(src, "r", encoding="utf-8") as f:
+            lines = [line.split() for line in f if line.strip()]
+
+        with open(dst, "w", encoding="utf-8") as f:
+            for row, kept in zip(rows.tolist(), keep.tolist()):
+                if not kept:
+                    continue
+                _, line_id, cls, x, y, w, h = row
+                values = lines[line_id]
+                if len(values) > 5:
+                    points = " ".join(
+                        f"{min(max(float(v), 0.0), 1.0):.6f}" for v in values[1:]
+                    )
+                    f.write(f"{cls} {points}\n")
+                else:
+                    f.write(f"{cls} {x:.6f} {y:.6f} {w:.6f} {h:.6f}\n")
+        written.append((dst, src))
+
+    return written
@@ -0,0 +1,267 @@
+import os
+import json
+import math
+import time
+import shutil
+from pathlib import Path
+
+import numpy as np
+
+from core.constants import DECODED_CACHE_BUDGET_MB, DECODED_CACHE_DIR
+
+INDEX_DTYPE = np.dtype(
+    [("offset", "<i8"), ("h", "<i4"), ("w", "<i4"), ("h0", "<i4"), ("w0", "<i4")]
+)
+
+
+def decodeChunk(paths: list[str], imgsz: int) -> list[tuple[str, np.ndarray, int, int]]:
+    # Igual que 'load_image' de Ultralytics en modo rectangular: lado largo a
+    # 'imgsz' conservando la proporción, orientación EXIF aplicada y BGR.
+    from PIL import Image, ImageOps
+
+    decoded: list[tuple[str, np.ndarray, int, int]] = []
+    for path in paths:
+        try:
+            with Image.open(path) as image:
+                # Tamaño original ya orientado, antes de que 'draft' reduzca
+                # la imagen al decodificarla.
+                w0, h0 = image.size
+                if image.getexif().get(0x0112) in (5, 6, 7, 8):
+                    w0, h0 = h0, w0
+
+                image.draft("RGB", (imgsz, imgsz))
+                image = ImageOps.exif_transpose(image).convert("RGB")
+                ratio = imgsz / max(w0, h0)
+                if ratio != 1:
+                    size = (
+                        min(math.ceil(w0 * ratio), imgsz),
+                        min(math.ceil(h0 * ratio), imgsz),
+                    )
+                    image = image.resize(size, Image.BILINEAR)
+                array = np.ascontiguousarray(np.asarray(image)[:, :, ::-1])
+        except Exception:
+            array, w0, h0 = np.empty((0, 0, 3), np.uint8), 0, 0
+
+        decoded.append((path, array, h0, w0))
+
+    return decoded
+
+
+class DecodedCache:
+    def __init__(self, path: Path) -> None:
+        self.path: Path = path
+        self.meta: dict[str, object] = self._loadMeta()
+
+        self._data: np.memmap | None = None
+        self._index: np.ndarray | None = None
+
+    @staticmethod
+    def location(dataset_path: Path, imgsz: int) -> Path:
+        return DECODED_CACHE_DIR / f"{dataset_path.name}_{imgsz}"
+
+    @staticmethod
+    def evict(
+        required: int,
+        budget_mb: int = DECODED_CACHE_BUDGET_MB,
+        keep: Path | None = None,
+    ) -> int:
+        # Borra las cachés usadas hace más tiempo hasta que 'required' bytes
+        # caben en el presupuesto; devuelve los bytes que quedan libres.
+        budget = budget_mb * 1024 * 1024
+        caches = [
+            DecodedCache(path)
+            for path in (
+                DECODED_CACHE_DIR.iterdir() if DECODED_CACHE_DIR.exists() else []
+            )
+            if path.is_dir() and path != keep and not path.name.endswith(".tmp")
+        ]
+        caches.sort(key=lambda cache: cache.meta.get("last_used", 0))
+
+        used = sum(int(cache.meta.get("bytes", 0)) for cache in caches)
+        for cache in caches:
+            if used + required <= budget:
+                break
+            used -= int(cache.meta.get("bytes", 0))
+            shutil.rmtree(cache.path, ignore_errors=True)
+
+        return max(0, budget - used)
+
+    @property
+    def valid(self) -> bool:
+        return bool(self.meta) and (self.path / "images.bin").exists()
+
+    @property
+    def imgsz(self) -> int:
+        return int(self.meta.get("imgsz", 0))
+
+    def touch(self) -> None:
+        self.meta["last_used"] = time.time()
+        self._saveMeta(self.path)
+
+    def write(
+        self,
+        decoded,
+        imgsz: int,
+        count: int,
+        limit: int,
+        advance=None,
+    ) -> dict[str, object]:
+        # Escribe las imágenes decodificadas una tras otra en 'images.bin'
+        # (sin relleno) con un índice de desplazamientos; al llegar al límite
+        # de bytes el resto de imágenes se decodifica durante el entrenamiento.
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        tmp_path.mkdir(parents=True)
+
+        index = np.zeros(count, dtype=INDEX_DTYPE)
+        offset, cached, full = 0, 0, False
+        with open(tmp_path / "images.bin", "wb") as data, open(
+            tmp_path / "files.txt", "w", encoding="utf-8"
+        ) as files:
+            for chunk in decoded:
+                for path, array, h0, w0 in chunk:
+                    if array.size == 0:
+                        continue
+                    if offset + array.nbytes > limit:
+                        full = True
+                        break
+                    data.write(array.tobytes())
+                    files.write(os.path.abspath(path) + "\n")
+                    index[cached] = (offset, array.shape[0], array.shape[1], h0, w0)
+                    offset += array.nbytes
+                    cached += 1
+                if advance:
+                    advance(len(chunk))
+                if full:
+                    break
+
+        # Cerrar el generador detiene el pool de decodificación.
+        if hasattr(decoded, "close"):
+            decoded.close()
+
+        np.save(tmp_path / "index.npy", index[:cached])
+        self.meta = {
+            "imgsz": imgsz,
+            "images": cached,
+            "total": count,
+            "bytes": offset,
+            "last_used": time.time(),
+        }
+        self._saveMeta(tmp_path)
+
+        shutil.rmtree(self.path, ignore_errors=True)
+        tmp_path.replace(self.path)
+        return self.meta
+
+    def rows(self, files: list[str]) -> np.ndarray:
+        with open(self.path / "files.txt", "r", encoding="utf-8") as f:
+            lookup = {line.rstrip("\n"): row for row, line in enumerate(f)}
+        return np.array(
+            [lookup.get(os.path.abspath(path), -1) for path in files], dtype=np.int64
+        )
+
+    def forget(self, files: set[str]) -> int:
+        # Las imágenes reemplazadas dejan de encontrarse en la caché (se
+        # decodifican de disco); el resto de la caché sigue siendo válido.
+        path = self.path / "files.txt"
+        forgotten = 0
+        with open(path, "r", encoding="utf-8") as f:
+            lines = [line.rstrip("\n") for line in f]
+        for i, line in enumerate(lines):
+            if line in files:
+                lines[i] = ""
+                forgotten += 1
+
+        if forgotten:
+            tmp_path = path.with_suffix(".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.writelines(line + "\n" for line in lines)
+            tmp_path.replace(path)
+        return forgotten
+
+    def image(self, row: int) -> tuple[np.ndarray, tuple[int, int], tuple[int, int]]:
+        if self._data is None:
+            # Copia en escritura: las páginas se comparten entre procesos y
+            # solo se copian si una transformación modifica la imagen.
+            self._data = np.memmap(self.path / "images.bin", dtype=np.uint8, mode="c")
+            self._index = np.load(self.path / "index.npy")
+
+        offset, h, w, h0, w0 = self._index[row].tolist()
+        array = self._data[offset : offset + h * w * 3].reshape(h, w, 3)
+        return array, (h0, w0), (h, w)
+
+    def register(self, trainer) -> None:
+        trainer.addCallback("on_pretrain_routine_start", self._onPretrainRoutineStart)
+
+    def _onPretrainRoutineStart(self, trainer) -> None:
+        # Los datasets se envuelven al construirse, antes de que el dataloader
+        # lance sus procesos, para que cada worker herede el acceso al mmap.
+        self.touch()
+        build = trainer.build_dataset
+
+        def buildDataset(img_path, mode="train", batch=None):
+            dataset = build(img_path, mode, batch)
+            if getattr(dataset, "imgsz", None) == self.imgsz:
+                dataset.load_image = CachedImageLoader(
+                    dataset, self, self.rows(dataset.im_files)
+                )
+            return dataset
+
+        trainer.build_dataset = buildDataset
+
+    def __getstate__(self) -> dict[str, object]:
+        # El mmap se reabre en cada proceso del dataloader.
+        state = self.__dict__.copy()
+        state["_data"] = None
+        state["_index"] = None
+        return state
+
+    def _loadMeta(self) -> dict[str, object]:
+        try:
+            with open(self.path / "meta.json", "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _saveMeta(self, path: Path) -> None:
+        tmp_meta = path / "meta.json.tmp"
+        with open(tmp_meta, "w", encoding="utf-8") as f:
+            json.dump(self.meta, f, indent=2)
+        tmp_meta.replace(path / "meta.json")
+
+
+def bufferImage(
+    dataset, i: int, im: np.ndarray, hw0: tuple[int, int]
+) -> tuple[np.ndarray, tuple[int, int], tuple[int, int]]:
+    # Misma contabilidad que 'BaseDataset.load_image' de Ultralytics para
+    # los cargadores propios: búfer de imágenes recientes (lo usa el
+    # mosaico) y expulsión de las antiguas si no hay caché en RAM.
+    if dataset.augment:
+        dataset.ims[i], dataset.im_hw0[i], dataset.im_hw[i] = im, hw0, im.shape[:2]
+        dataset.buffer.append(i)
+        if 1 < len(dataset.buffer) >= dataset.max_buffer_length:
+            j = dataset.buffer.pop(0)
+            if dataset.cache != "ram":
+                dataset.ims[j], dataset.im_hw0[j], dataset.im_hw[j] = None, None, None
+    return im, hw0, im.shape[:2]
+
+
+class CachedImageLoader:
+    def __init__(self, dataset, cache: DecodedCache, rows: np.ndarray) -> None:
+        self._dataset = dataset
+        self._cache: DecodedCache = cache
+        self._rows: np.ndarray = rows
+
+    def __call__(self, i: int, rect_mode: bool = True):
+        dataset = self._dataset
+        if dataset.ims[i] is not None:
+            return dataset.ims[i], dataset.im_hw0[i], dataset.im_hw[i]
+
+        row = int(self._rows[i])
+        if row >= 0 and rect_mode:
+            im, hw0, _ = self._cache.image(row)
+            return bufferImage(dataset, i, im, hw0)
+
+        # Sin entrada en la caché (o en modo cuadrado) se usa el cargador
+        # original de la clase.
+        return type(self._dataset).load_image(self._dataset, i, rect_mode)
@@ -0,0 +1,240 @@
+import re
+import json
+import time
+import functools
+import threading
+import contextlib
+from pathlib import Path
+
+from core.constants import (
+    PROFILE_DIRNAME,
+    PROFILE_FILENAME,
+    PROFILE_RSS_INTERVAL_S,
+    PROFILE_TOOLS,
+)
+
+
+class StageRecord:
+    __slots__ = (
+        "name",
+        "parent",
+        "depth",
+        "wall_s",
+        "cpu_s",
+        "bytes",
+        "files",
+        "peak_rss",
+        "failed",
+    )
+
+    def __init__(self, name: str, parent: "StageRecord | None") -> None:
+        self.name: str = name
+        self.parent: StageRecord | None = parent
+        self.depth: int = 0 if parent is None else parent.depth + 1
+        self.wall_s: float = 0.0
+        self.cpu_s: float = 0.0
+        self.bytes: int = 0
+        self.files: int = 0
+        self.peak_rss: int = 0
+        self.failed: bool = False
+
+    def record(self) -> dict[str, object]:
+        return {
+            "stage": self.name,
+            "depth": self.depth,
+            "wall_s": round(self.wall_s, 3),
+            "cpu_s": round(self.cpu_s, 3),
+            "bytes": self.bytes,
+            "files": self.files,
+            "peak_rss_mb": round(self.peak_rss / (1024 * 1024), 1),
+            "failed": self.failed,
+        }
+
+
+class Profiler:
+    def __init__(self, tool: str | None = None) -> None:
+        if tool is not None and tool not in PROFILE_TOOLS:
+            raise Exception(
+                f"Perfilador '{tool}' no soportado. Opciones: {', '.join(PROFILE_TOOLS)}."
+            )
+
+        self.tool: str | None = tool
+
+        self._stages: list[StageRecord] = []
+        # Etapas abiertas de todos los hilos (para el muestreo de memoria) y
+        # la pila de cada hilo, que decide el padre de sus etapas.
+        self._open: list[StageRecord] = []
+        self._local = threading.local()
+        self._dumps: list[tuple[str, object]] = []
+        self._profiling: bool = False
+
+        self._lock = threading.Lock()
+        self._sampling: threading.Event | None = None
+        self._process = None
+
+    @contextlib.contextmanager
+    def stage(
+        self,
+        name: str,
+        profile: bool = False,
+        parent: StageRecord | None = None,
+    ):
+        # Un hilo de trabajo no hereda la pila de quien lo lanza: su etapa
+        # recibe el padre de forma explícita (ver 'current').
+        stack = self._stack()
+        record = StageRecord(name.strip(), parent or (stack[-1] if stack else None))
+        stack.append(record)
+
+        with self._lock:
+            self._stages.append(record)
+            self._open.append(record)
+            if len(self._open) == 1:
+                self._startSampler()
+
+        profiler = self._startProfile() if profile else None
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+
+        try:
+            yield record
+        except BaseException:
+            record.failed = True
+            raise
+        finally:
+            record.wall_s = time.perf_counter() - wall_start
+            record.cpu_s = time.process_time() - cpu_start
+
+            if profiler is not None:
+                self._stopProfile(name, profiler)
+
+            stack.remove(record)
+            with self._lock:
+                self._sample()
+                self._open.remove(record)
+                if not self._open:
+                    self._stopSampler()
+
+    def current(self) -> StageRecord | None:
+        stack = self._stack()
+        return stack[-1] if stack else None
+
+    def account(self, unit: str | None, amount: int) -> None:
+        # Los bytes y archivos de una etapa cuentan también para las etapas
+        # que la contienen (p. ej. la sección que la invoca), solo en el
+        # hilo que los procesa.
+        record = self.current()
+        with self._lock:
+            while record is not None:
+                if unit == "bytes":
+                    record.bytes += amount
+                elif unit == "items":
+                    record.files += amount
+                record = record.parent
+
+    def records(self) -> list[dict[str, object]]:
+        # En orden de árbol: las etapas de hilos concurrentes se intercalan
+        # al empezar, pero cada una se lista bajo su padre.
+        ordered: list[dict[str, object]] = []
+
+        def visit(parent: StageRecord | None) -> None:
+            for record in self._stages:
+                if record.parent is parent:
+                    ordered.append(record.record())
+                    visit(record)
+
+        visit(None)
+        return ordered
+
+    def save(self, dest_folder: Path) -> Path:
+        dest_folder.mkdir(parents=True, exist_ok=True)
+
+        path = dest_folder / PROFILE_FILENAME
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"tool": self.tool, "stages": self.records()}, f, indent=2)
+
+        if self._dumps:
+            profile_dir = dest_folder / PROFILE_DIRNAME
+            profile_dir.mkdir(parents=True, exist_ok=True)
+
+            for i, (name, profiler) in enumerate(self._dumps):
+                slug = re.sub(r"[^a-z0-9]+", "_", name.lower()).strip("_")
+                if self.tool == "pyinstrument":
+                    with open(profile_dir / f"{i:02d}_{slug}.html", "w") as f:
+                        f.write(profiler.output_html())
+                else:
+                    profiler.dump_stats(str(profile_dir / f"{i:02d}_{slug}.prof"))
+
+        return path
+
+    def _stack(self) -> list[StageRecord]:
+        if not hasattr(self._local, "open"):
+            self._local.open = []
+        return self._local.open
+
+    def _startProfile(self):
+        # Solo un perfilador activo a la vez: las etapas anidadas quedan
+        # incluidas en el perfil de la etapa exterior.
+        if self.tool is None or self._profiling:
+            return None
+        self._profiling = True
+
+        if self.tool == "pyinstrument":
+            from pyinstrument import Profiler as Instrument
+
+            profiler = Instrument()
+            profiler.start()
+        else:
+            import cProfile
+
+            profiler = cProfile.Profile()
+            profiler.enable()
+
+        return profiler
+
+    def _stopProfile(self, name: str, profiler) -> None:
+        if self.tool == "pyinstrument":
+            profiler.stop()
+        else:
+            profiler.disable()
+
+        self._dumps.append((name, profiler))
+        self._profiling = False
+
+    def _startSampler(self) -> None:
+        self._sampling = threading.Event()
+        threading.Thread(
+            target=self._sampleLoop, args=(self._sampling,), daemon=True
+        ).start()
+
+    def _stopSampler(self) -> None:
+        self._sampling.set()
+        self._sampling = None
+
+    def _sampleLoop(self, stopped: threading.Event) -> None:
+        while not stopped.wait(PROFILE_RSS_INTERVAL_S):
+            with self._lock:
+                self._sample()
+
+    def _sample(self) -> None:
+        if self._process is None:
+            import psutil
+
+            self._process = psutil.Process()
+
+        rss = self._process.memory_info().rss
+        for record in self._open:
+            record.peak_rss = max(record.peak_rss, rss)
+
+
+def timed(name: str, profile: bool = False):
+    # Envuelve un método de una clase con 'self._ui' en una etapa del
+    # perfilador de la interfaz.
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with self._ui.stage(name, profile=profile):
+                return method(self, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
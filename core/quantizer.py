@@ -0,0 +1,195 @@
+import json
+import time
+from pathlib import Path
+
+from core.benchmark import Benchmark
+from core.constants import (
+    QUANT_BENCHMARK_RUNS,
+    QUANT_CALIBRATION_IMAGES,
+    QUANT_FILENAME,
+)
+from core.profiler import timed
+from ui import BashUI
+
+
+class Quantizer:
+    def __init__(
+        self,
+        ui: BashUI,
+        calibration_images: int = QUANT_CALIBRATION_IMAGES,
+        benchmark_runs: int = QUANT_BENCHMARK_RUNS,
+    ) -> None:
+        self._ui: BashUI = ui
+        self._calibration_images: int = calibration_images
+        self._benchmark_runs: int = benchmark_runs
+
+    @timed("Cuantización INT8")
+    def run(
+        self,
+        best_model_path: Path,
+        data_yaml: Path,
+        imgsz: int,
+        run_dir: Path,
+    ) -> dict[str, object]:
+        try:
+            from ultralytics.utils.checks import check_requirements
+
+            check_requirements(("onnx", "onnxruntime"))
+
+            calibration = Benchmark.loadValImages(
+                data_yaml, imgsz, self._calibration_images, seed=0
+            )
+            if len(calibration) == 0:
+                raise Exception("No hay imágenes de validación para calibrar.")
+
+            self._ui.stepInfo("Exportando modelo ONNX fp32")
+            fp32_path = self._exportFP32(best_model_path, imgsz)
+
+            self._ui.stepInfo(
+                f"Cuantizando a INT8 con {len(calibration)} imágenes de calibración"
+            )
+            int8_path = fp32_path.with_name(f"{best_model_path.stem}_int8.onnx")
+            self._quantize(fp32_path, int8_path, calibration)
+
+            self._ui.stepInfo("Midiendo latencia fp32 frente a INT8")
+            fp32_latency = self._latency(fp32_path, calibration)
+            int8_latency = self._latency(int8_path, calibration)
+
+            self._ui.stepInfo("Evaluando mAP de ambos modelos")
+            fp32_map = self._evaluate(fp32_path, data_yaml, imgsz)
+            int8_map = self._evaluate(int8_path, data_yaml, imgsz)
+
+            report = {
+                "imgsz": imgsz,
+                "calibration_images": len(calibration),
+                "fp32": {
+                    "path": str(fp32_path),
+                    "size_mb": round(fp32_path.stat().st_size / (1024 * 1024), 2),
+                    "p50_ms": fp32_latency,
+                    "map50_95": fp32_map,
+                },
+                "int8": {
+                    "path": str(int8_path),
+                    "size_mb": round(int8_path.stat().st_size / (1024 * 1024), 2),
+                    "p50_ms": int8_latency,
+                    "map50_95": int8_map,
+                },
+                "speedup": round(fp32_latency / int8_latency, 2) if int8_latency else 0,
+                "map_delta": round(int8_map - fp32_map, 4),
+            }
+
+            with open(run_dir / QUANT_FILENAME, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+
+            return report
+
+        except Exception:
+            raise
+
+    def _exportFP32(self, model_path: Path, imgsz: int) -> Path:
+        from ultralytics import YOLO
+
+        exported = Path(
+            YOLO(str(model_path)).export(
+                format="onnx",
+                imgsz=imgsz,
+                batch=1,
+                simplify=True,
+                device="cpu",
+                verbose=False,
+            )
+        )
+        target = exported.with_name(f"{model_path.stem}_fp32.onnx")
+        exported.replace(target)
+        return target
+
+    def _quantize(self, fp32_path: Path, int8_path: Path, calibration) -> None:
+        import onnx
+        from onnxruntime.quantization import (
+            CalibrationDataReader,
+            CalibrationMethod,
+            QuantFormat,
+            QuantType,
+            quantize_static,
+        )
+
+        model = onnx.load(str(fp32_path))
+        input_name = model.graph.input[0].name
+
+        class _Reader(CalibrationDataReader):
+            def __init__(self) -> None:
+                self._items = iter(calibration)
+
+            def get_next(self) -> dict[str, object] | None:
+                image = next(self._items, None)
+                if image is None:
+                    return None
+                return {input_name: (image[None].astype("float32") / 255.0)}
+
+        quantize_static(
+            model_input=str(fp32_path),
+            model_output=str(int8_path),
+            calibration_data_reader=_Reader(),
+            quant_format=QuantFormat.QDQ,
+            activation_type=QuantType.QUInt8,
+            weight_type=QuantType.QInt8,
+            per_channel=True,
+            calibrate_method=CalibrationMethod.MinMax,
+            nodes_to_exclude=self._headNodes(model),
+        )
+
+        # Ultralytics necesita los metadatos (clases, stride, imgsz) del
+        # modelo exportado para validar el ONNX cuantizado.
+        quantized = onnx.load(str(int8_path))
+        if not quantized.metadata_props:
+            quantized.metadata_props.extend(model.metadata_props)
+            onnx.save(quantized, str(int8_path))
+
+    def _headNodes(self, model) -> list[str]:
+        # La cabeza de detección (DFL, concatenaciones y decodificación de
+        # cajas) es muy sensible a INT8; solo se cuantizan sus convoluciones.
+        prefixes = sorted(
+            {node.name.split("/")[1] for node in model.graph.node if "/" in node.name},
+            key=lambda p: int(p.split(".")[-1]) if p.split(".")[-1].isdigit() else -1,
+        )
+        if not prefixes:
+            return []
+
+        head = f"/{prefixes[-1]}/"
+        return [
+            node.name
+            for node in model.graph.node
+            if node.name.startswith(head) and node.op_type != "Conv"
+        ]
+
+    def _latency(self, model_path: Path, images) -> float:
+        import numpy as np
+        import onnxruntime as ort
+
+        session = ort.InferenceSession(
+            str(model_path), providers=["CPUExecutionProvider"]
+        )
+        input_name = session.get_inputs()[0].name
+
+        timings: list[float] = []
+        for i in range(self._benchmark_runs + 2):
+            image = images[i % len(images)][None].astype("float32") / 255.0
+            start = time.perf_counter()
+            session.run(None, {input_name: image})
+            if i >= 2:
+                timings.append(time.perf_counter() - start)
+
+        return round(float(np.percentile(timings, 50)) * 1000, 2)
+
+    def _evaluate(self, model_path: Path, data_yaml: Path, imgsz: int) -> float:
+        from ultralytics import YOLO
+
+        metrics = YOLO(str(model_path), task="detect").val(
+            data=str(data_yaml),
+            imgsz=imgsz,
+            batch=1,
+            device="cpu",
+            plots=False,
+            verbose=False,
+        )
+        return round(float(metrics.box.map), 4)
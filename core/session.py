@@ -0,0 +1,76 @@
+import json
+from pathlib import Path
+
+from core.constants import CHECKPOINT_LAST, CONTEXT_FILENAME, MODELS_TRAINED_DIR
+
+
+class Session:
+    @staticmethod
+    def save(context: dict[str, object], run_dir: Path, status: str) -> Path:
+        run_dir.mkdir(parents=True, exist_ok=True)
+
+        data: dict[str, object] = {"status": status}
+        for key, value in context.items():
+            data[key] = str(value) if isinstance(value, Path) else value
+
+        path = run_dir / CONTEXT_FILENAME
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, default=str)
+        tmp_path.replace(path)
+
+        return path
+
+    @staticmethod
+    def load(run_dir: Path) -> dict[str, object]:
+        path = run_dir / CONTEXT_FILENAME
+        if not path.exists():
+            raise Exception(f"No se encontró '{CONTEXT_FILENAME}' en '{run_dir}'.")
+
+        with open(path, "r", encoding="utf-8") as f:
+            data: dict[str, object] = json.load(f)
+
+        context: dict[str, object] = {}
+        for key, value in data.items():
+            if key == "status":
+                continue
+            context[key] = Path(value) if key.endswith("_path") and value else value
+
+        return context
+
+    @staticmethod
+    def isResumable(run_dir: Path | None) -> bool:
+        if not run_dir or not isinstance(run_dir, Path):
+            return False
+        return (run_dir / CHECKPOINT_LAST).exists() and (
+            run_dir / CONTEXT_FILENAME
+        ).exists()
+
+    @staticmethod
+    def find(run: str | None = None) -> Path:
+        if run:
+            run_dir = Path(run).expanduser()
+            if not run_dir.exists():
+                run_dir = MODELS_TRAINED_DIR / run
+
+            if not Session.isResumable(run_dir):
+                raise Exception(
+                    f"El entrenamiento '{run}' no tiene un punto de control reanudable."
+                )
+            return run_dir.resolve()
+
+        candidates: list[Path] = []
+        for path in MODELS_TRAINED_DIR.glob(f"*/{CONTEXT_FILENAME}"):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    status = json.load(f).get("status")
+            except (OSError, ValueError):
+                continue
+
+            if status != "completed" and Session.isResumable(path.parent):
+                candidates.append(path.parent)
+
+        if not candidates:
+            raise Exception("No hay entrenamientos interrumpidos para reanudar.")
+
+        return max(candidates, key=lambda p: (p / CHECKPOINT_LAST).stat().st_mtime)
@@ -0,0 +1,255 @@
+import os
+import random
+from pathlib import Path
+from typing import Iterator
+
+import numpy as np
+
+from core.constants import SHARD_SHUFFLE_BUFFER, SHARD_TARGET_MB
+
+# Índice binario por imagen: shard, posición y tamaño de sus bytes, tamaño de
+# la imagen (ya orientada) y rango de sus filas en 'labels.f32'.
+INDEX_DTYPE = np.dtype(
+    [
+        ("shard", "<i4"),
+        ("offset", "<i8"),
+        ("size", "<i8"),
+        ("h", "<i4"),
+        ("w", "<i4"),
+        ("label_start", "<i8"),
+        ("label_count", "<i4"),
+    ]
+)
+
+
+def parseLabels(path: str) -> np.ndarray:
+    # Filas (clase, x, y, w, h); los polígonos de segmentación se reducen a
+    # su caja envolvente.
+    rows: list[list[float]] = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            values = line.split()
+            if len(values) < 5:
+                continue
+            numbers = [float(v) for v in values]
+            if len(numbers) > 5:
+                xs, ys = numbers[1::2], numbers[2::2]
+                x0, x1, y0, y1 = min(xs), max(xs), min(ys), max(ys)
+                numbers = [numbers[0], (x0 + x1) / 2, (y0 + y1) / 2, x1 - x0, y1 - y0]
+            rows.append(numbers)
+    return np.array(rows, dtype=np.float32).reshape(-1, 5)
+
+
+class ShardWriter:
+    def __init__(
+        self,
+        dest_folder: Path,
+        target_mb: int = SHARD_TARGET_MB,
+        first_shard: int = 0,
+    ) -> None:
+        # Si 'dest_folder' ya tiene un índice, las imágenes se añaden al final
+        # en shards nuevos a partir de 'first_shard'.
+        dest_folder.mkdir(parents=True, exist_ok=True)
+        self.path: Path = dest_folder
+        self._target: int = target_mb * 1024 * 1024
+
+        index_path = dest_folder / "index.bin"
+        labels_path = dest_folder / "labels.f32"
+        existing = index_path.exists()
+        self.count: int = (
+            index_path.stat().st_size // INDEX_DTYPE.itemsize if existing else 0
+        )
+        self._label_rows: int = labels_path.stat().st_size // (5 * 4) if existing else 0
+
+        mode = "a" if existing else "w"
+        self._index = open(index_path, mode + "b")
+        self._labels = open(labels_path, mode + "b")
+        self._names = open(dest_folder / "names.txt", mode, encoding="utf-8")
+        self._shard_file = None
+        self._shard: int = first_shard - 1
+        self._offset: int = 0
+
+    def add(self, name: str, image_path: str, label_path: str) -> None:
+        from PIL import Image
+
+        with open(image_path, "rb") as f:
+            data = f.read()
+        with Image.open(image_path) as image:
+            w, h = image.size
+            if image.getexif().get(0x0112) in (5, 6, 7, 8):
+                w, h = h, w
+        labels = parseLabels(label_path)
+
+        if self._shard_file is None or self._offset + len(data) > self._target:
+            self._nextShard()
+
+        self._shard_file.write(data)
+        record = np.array(
+            [
+                (
+                    self._shard,
+                    self._offset,
+                    len(data),
+                    h,
+                    w,
+                    self._label_rows,
+                    len(labels),
+                )
+            ],
+            dtype=INDEX_DTYPE,
+        )
+        self._index.write(record.tobytes())
+        self._labels.write(labels.tobytes())
+        self._names.write(name + "\n")
+
+        self._offset += len(data)
+        self._label_rows += len(labels)
+        self.count += 1
+
+    @property
+    def shards(self) -> int:
+        return self._shard + 1
+
+    def close(self) -> None:
+        for f in (self._shard_file, self._index, self._labels, self._names):
+            if f is not None:
+                f.flush()
+                os.fsync(f.fileno())
+                f.close()
+
+    def _nextShard(self) -> None:
+        if self._shard_file is not None:
+            self._shard_file.close()
+        self._shard += 1
+        self._offset = 0
+        self._shard_file = open(self.path / f"{self._shard:05d}.shard", "wb")
+
+
+class ShardReader:
+    def __init__(self, path: Path) -> None:
+        self.path: Path = path
+        self.index: np.ndarray = np.fromfile(path / "index.bin", dtype=INDEX_DTYPE)
+        self._labels: np.ndarray | None = None
+        self._shards: dict[int, np.memmap] = {}
+
+    @staticmethod
+    def isShardDir(path: Path | str) -> bool:
+        return (Path(path) / "index.bin").exists()
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def names(self) -> list[str]:
+        with open(self.path / "names.txt", "r", encoding="utf-8") as f:
+            return [line.rstrip("\n") for line in f]
+
+    def labels(self, i: int) -> np.ndarray:
+        if self._labels is None:
+            self._labels = np.memmap(
+                self.path / "labels.f32", dtype=np.float32, mode="r"
+            ).reshape(-1, 5)
+        start, count = int(self.index[i]["label_start"]), int(
+            self.index[i]["label_count"]
+        )
+        return self._labels[start : start + count]
+
+    def data(self, i: int) -> memoryview:
+        record = self.index[i]
+        shard = int(record["shard"])
+        if shard not in self._shards:
+            self._shards[shard] = np.memmap(
+                self.path / f"{shard:05d}.shard", dtype=np.uint8, mode="r"
+            )
+        offset, size = int(record["offset"]), int(record["size"])
+        return memoryview(self._shards[shard][offset : offset + size])
+
+    def subset(self, indices: np.ndarray, dest_folder: Path) -> None:
+        # Shard reducido a 'indices': índice, etiquetas y nombres propios y
+        # enlaces simbólicos a los shards originales (sin copiar imágenes).
+        dest_folder.mkdir(parents=True, exist_ok=True)
+        index = self.index[indices].copy()
+        counts = index["label_count"].astype(np.int64)
+        starts = index["label_start"].copy()
+        index["label_start"] = np.cumsum(counts) - counts
+        index.tofile(dest_folder / "index.bin")
+
+        total = int(counts.sum())
+        labels = np.zeros((0, 5), dtype=np.float32)
+        if total:
+            rows = np.repeat(starts - index["label_start"], counts) + np.arange(total)
+            labels = np.memmap(
+                self.path / "labels.f32", dtype=np.float32, mode="r"
+            ).reshape(-1, 5)[rows]
+        labels.tofile(dest_folder / "labels.f32")
+
+        names = self.names()
+        with open(dest_folder / "names.txt", "w", encoding="utf-8") as f:
+            for i in indices.tolist():
+                f.write(names[i] + "\n")
+
+        for shard in np.unique(index["shard"]).tolist():
+            link = dest_folder / f"{shard:05d}.shard"
+            link.symlink_to((self.path / f"{shard:05d}.shard").resolve())
+
+    def order(
+        self,
+        seed: int | None = None,
+        buffer: int = SHARD_SHUFFLE_BUFFER,
+    ) -> Iterator[int]:
+        # Shards en orden aleatorio y, dentro de cada uno, lectura secuencial
+        # a través de un búfer de mezcla: las lecturas siguen siendo casi
+        # secuenciales y el orden de las muestras cambia en cada época.
+        rng = random.Random(seed)
+        shards = np.unique(self.index["shard"]).tolist()
+        rng.shuffle(shards)
+
+        starts = np.searchsorted(self.index["shard"], shards, side="left")
+        ends = np.searchsorted(self.index["shard"], shards, side="right")
+
+        pool: list[int] = []
+        for start, end in zip(starts.tolist(), ends.tolist()):
+            for i in range(start, end):
+                pool.append(i)
+                if len(pool) >= buffer:
+                    j = rng.randrange(len(pool))
+                    pool[j], pool[-1] = pool[-1], pool[j]
+                    yield pool.pop()
+        rng.shuffle(pool)
+        yield from pool
+
+    def __iter__(self) -> Iterator[tuple[int, memoryview, np.ndarray]]:
+        for i in self.order():
+            yield i, self.data(i), self.labels(i)
+
+    def __getstate__(self) -> dict[str, object]:
+        # Los mmap se reabren en cada proceso del dataloader.
+        state = self.__dict__.copy()
+        state["_labels"] = None
+        state["_shards"] = {}
+        return state
+
+
+class ShardSampler:
+    def __init__(
+        self,
+        reader: ShardReader,
+        size: int | None = None,
+        buffer: int = SHARD_SHUFFLE_BUFFER,
+        seed: int = 0,
+    ) -> None:
+        # 'size' limita las muestras a las primeras del índice (fracción del
+        # dataset).
+        self._reader: ShardReader = reader
+        self._size: int = len(reader) if size is None else size
+        self._buffer: int = buffer
+        self._seed: int = seed
+        self._epoch: int = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[int]:
+        self._epoch += 1
+        for i in self._reader.order(self._seed + self._epoch, self._buffer):
+            if i < self._size:
+                yield i
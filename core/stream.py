@@ -0,0 +1,209 @@
+import os
+import sys
+import heapq
+import tempfile
+from pathlib import Path
+from collections import deque
+from typing import Callable, Iterable, Iterator
+
+from core.constants import STREAM_BYTES_PER_ROW, STREAM_MEMORY_BUDGET_MB
+
+
+class FileRecord:
+    __slots__ = ("parent", "name", "size")
+
+    def __init__(self, parent: str, name: str, size: int = 0) -> None:
+        # 'parent' se interna: todos los archivos de una carpeta comparten la
+        # misma cadena en memoria.
+        self.parent: str = parent
+        self.name: str = name
+        self.size: int = size
+
+    @property
+    def path(self) -> str:
+        return os.path.join(self.parent, self.name)
+
+    @property
+    def suffix(self) -> str:
+        return os.path.splitext(self.name)[1].lower()
+
+    @property
+    def stem(self) -> str:
+        return os.path.splitext(self.name)[0]
+
+
+def walk(
+    root: Path,
+    skip: Iterable[Path] = (),
+    sizes: bool = False,
+) -> Iterator[FileRecord]:
+    skip_dirs = {os.path.normpath(str(p)) for p in skip}
+    stack: list[str] = [os.path.normpath(str(root))]
+
+    while stack:
+        parent = sys.intern(stack.pop())
+        with os.scandir(parent) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.path not in skip_dirs:
+                        stack.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    size = entry.stat(follow_symlinks=False).st_size if sizes else 0
+                    yield FileRecord(parent, entry.name, size)
+
+
+def rows(path: Path, suffixes: set[str]) -> Iterator[tuple[str, str]]:
+    # Archivos de una carpeta plana como filas (stem, nombre).
+    with os.scandir(path) as entries:
+        for entry in entries:
+            stem, suffix = os.path.splitext(entry.name)
+            if suffix.lower() in suffixes and entry.is_file(follow_symlinks=False):
+                yield stem, entry.name
+
+
+def digest(path: str) -> str:
+    # Hash de contenido (blake2b de 128 bits) leído por bloques.
+    import hashlib
+
+    hasher = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            hasher.update(block)
+    return hasher.hexdigest()
+
+
+def digestChunk(paths: list[str]) -> list[str]:
+    return [digest(path) for path in paths]
+
+
+class SpillList:
+    def __init__(self, tmp_dir: Path | None = None, path: Path | None = None) -> None:
+        # Lista de filas en un archivo (temporal anónimo o persistente en
+        # 'path'): solo la cuenta vive en memoria.
+        self._count: int = 0
+        if path is None:
+            self._file = tempfile.TemporaryFile(
+                mode="w+", encoding="utf-8", dir=tmp_dir, newline="\n"
+            )
+        else:
+            self._file = open(path, "a+", encoding="utf-8", newline="\n")
+            self._file.seek(0)
+            self._count = sum(1 for _ in self._file)
+
+    def append(self, *fields: str) -> None:
+        self._file.write("\t".join(fields) + "\n")
+        self._count += 1
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[tuple[str, ...]]:
+        self._file.flush()
+        self._file.seek(0)
+        for line in self._file:
+            yield tuple(line.rstrip("\n").split("\t"))
+        self._file.seek(0, os.SEEK_END)
+
+    def sync(self) -> None:
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class ExternalSorter:
+    def __init__(
+        self,
+        tmp_dir: Path | None = None,
+        budget_mb: int = STREAM_MEMORY_BUDGET_MB,
+    ) -> None:
+        # Ordena filas (tuplas de texto) dentro de un presupuesto de memoria;
+        # al superarlo, cada tramo ordenado se vuelca a disco y la lectura
+        # mezcla los tramos con 'heapq.merge'.
+        self._tmp_dir: Path | None = tmp_dir
+        self._chunk_rows: int = max(
+            1000, budget_mb * 1024 * 1024 // STREAM_BYTES_PER_ROW
+        )
+        self._buffer: list[tuple[str, ...]] = []
+        self._runs: list[SpillList] = []
+        self._count: int = 0
+        self._sorted: bool = False
+
+    def add(self, *fields: str) -> None:
+        self._buffer.append(fields)
+        self._count += 1
+        if len(self._buffer) >= self._chunk_rows:
+            self._spill()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[tuple[str, ...]]:
+        if not self._sorted:
+            self._buffer.sort()
+            self._sorted = True
+
+        if not self._runs:
+            return iter(self._buffer)
+        return heapq.merge(*self._runs, iter(self._buffer))
+
+    def close(self) -> None:
+        for run in self._runs:
+            run.close()
+        self._runs.clear()
+        self._buffer.clear()
+
+    def _spill(self) -> None:
+        self._buffer.sort()
+        run = SpillList(self._tmp_dir)
+        for row in self._buffer:
+            run.append(*row)
+        self._runs.append(run)
+        self._buffer = []
+
+
+def groupBy(sorted_rows: Iterable[tuple[str, ...]]) -> Iterator[tuple[str, list]]:
+    # Agrupa filas ya ordenadas por su primer campo.
+    key: str | None = None
+    group: list[tuple[str, ...]] = []
+    for row in sorted_rows:
+        if row[0] != key:
+            if group:
+                yield key, group
+            key, group = row[0], []
+        group.append(row)
+    if group:
+        yield key, group
+
+
+def poolMap(
+    fn: Callable,
+    items: Iterable,
+    chunk_size: int,
+    workers: int | None = None,
+    *args,
+) -> Iterator:
+    # Aplica 'fn(bloque, *args)' en un pool de procesos y devuelve los
+    # resultados en orden. Solo hay unos pocos bloques en vuelo por proceso,
+    # así que los elementos no se materializan aunque sean millones.
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    workers = workers or os.cpu_count() or 1
+    context = multiprocessing.get_context("spawn")
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        pending: deque = deque()
+        chunk: list = []
+        for item in items:
+            chunk.append(item)
+            if len(chunk) == chunk_size:
+                pending.append(pool.submit(fn, chunk, *args))
+                chunk = []
+                if len(pending) >= workers * 4:
+                    yield pending.popleft().result()
+        if chunk:
+            pending.append(pool.submit(fn, chunk, *args))
+        while pending:
+            yield pending.popleft().result()
@@ -0,0 +1,42 @@
+import numpy as np
+
+
+def strata(files: np.ndarray, classes: np.ndarray, count: int) -> np.ndarray:
+    # Estrato de cada imagen: su clase menos frecuente (por número de
+    # imágenes que la contienen), así las clases raras no se diluyen entre
+    # las comunes. Las imágenes sin cajas forman su propio estrato (-1).
+    pairs = np.unique(np.stack([files, classes], axis=1), axis=0)
+    frequency = np.bincount(pairs[:, 1], minlength=int(classes.max(initial=-1)) + 1)
+
+    order = np.lexsort([frequency[pairs[:, 1]], pairs[:, 0]])
+    pairs = pairs[order]
+    first = np.ones(len(pairs), dtype=bool)
+    first[1:] = pairs[1:, 0] != pairs[:-1, 0]
+
+    result = np.full(count, -1, dtype=np.int64)
+    result[pairs[first, 0]] = pairs[first, 1]
+    return result
+
+
+def stratify(groups: np.ndarray, percent: float, seed: int = 0) -> np.ndarray:
+    # Índices elegidos (ordenados): 'percent' de cada estrato y al menos una
+    # imagen por estrato. Una permutación y una ordenación estable por
+    # estrato dan el rango aleatorio de cada imagen dentro del suyo.
+    rng = np.random.default_rng(seed)
+    permutation = rng.permutation(len(groups))
+    order = permutation[np.argsort(groups[permutation], kind="stable")]
+
+    _, starts, sizes = np.unique(groups[order], return_index=True, return_counts=True)
+    quota = np.maximum(1, np.round(sizes * percent / 100)).astype(np.int64)
+    rank = np.arange(len(order)) - np.repeat(starts, sizes)
+    return np.sort(order[rank < np.repeat(quota, sizes)])
+
+
+def coverage(
+    files: np.ndarray, classes: np.ndarray, selected: np.ndarray
+) -> tuple[int, int]:
+    # Clases presentes en el total y en las imágenes elegidas.
+    return (
+        len(np.unique(classes)),
+        len(np.unique(classes[np.isin(files, selected)])),
+    )
@@ -0,0 +1,355 @@
+import os
+import json
+import time
+import itertools
+import multiprocessing
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from core.constants import (
+    MODELS_BASE_DIR,
+    MODELS_TRAINED_DIR,
+    SWEEP_ETA,
+    SWEEP_MIN_EPOCHS,
+    SWEEP_SPACE_KEYS,
+    YOLO_MODEL_URL,
+    YOLO_MODEL_VERSIONS,
+)
+from core.downloader import Downloader
+from ui import BashUI
+
+
+def _initWorker(threads: int) -> None:
+    # Los procesos del pool se reutilizan entre pruebas: OpenMP y MKL leen
+    # sus hilos una sola vez, antes de importar torch en el proceso.
+    os.environ["OMP_NUM_THREADS"] = str(threads)
+    os.environ["MKL_NUM_THREADS"] = str(threads)
+
+
+def _runTrial(
+    trial: dict[str, object],
+    data_yaml: str,
+    project_dir: str,
+    rung_epochs: list[int],
+    eta: int,
+    slots,
+    rungs,
+    lock,
+) -> dict[str, object]:
+    slot: dict[str, object] = slots.get()
+    state: dict[str, object] = {"stopped_at": None}
+
+    try:
+        cpus: list[int] = slot["cpus"]
+        threads = max(1, len(cpus))
+
+        if cpus and hasattr(os, "sched_setaffinity"):
+            os.sched_setaffinity(0, cpus)
+
+        # El slot puede cambiar entre pruebas del mismo proceso: los hilos de
+        # torch se fijan en cada una.
+        import torch
+
+        torch.set_num_threads(threads)
+
+        from core.trainer import Trainer
+
+        def onFitEpochEnd(trainer) -> None:
+            epoch = trainer.epoch + 1
+            if epoch not in rung_epochs:
+                return
+
+            fitness = float(trainer.fitness or 0.0)
+            with lock:
+                scores: list[float] = rungs.get(epoch, [])
+                scores.append(fitness)
+                rungs[epoch] = scores
+
+            # Successive halving asíncrono: con al menos 'eta' resultados en el
+            # escalón, solo continúa la mejor fracción 1/eta.
+            if len(scores) >= eta:
+                keep = max(1, len(scores) // eta)
+                rank = sorted(scores, reverse=True).index(fitness)
+                if rank >= keep:
+                    trainer.stop = True
+                    state["stopped_at"] = epoch
+
+        start = time.perf_counter()
+        trainer = Trainer(str(trial["model_path"]))
+        trainer.addCallback("on_fit_epoch_end", onFitEpochEnd)
+        _, best_model_path = trainer.run(
+            data_yaml=data_yaml,
+            epochs=int(trial["epochs"]),
+            imgsz=int(trial["imgsz"]),
+            batch=int(trial["batch"]),
+            project_dir=project_dir,
+            run_name=str(trial["name"]),
+            device=slot["device"],
+            workers=min(4, threads),
+            threads=threads,
+            lr0=float(trial["lr0"]),
+            decoded_cache=trial.get("decoded_cache", None),
+        )
+
+        return {
+            **trial,
+            **trainer.results(),
+            "stopped_at": state["stopped_at"],
+            "time_s": round(time.perf_counter() - start, 1),
+            "best_model_path": str(best_model_path),
+        }
+
+    except Exception as e:
+        return {**trial, "fitness": 0.0, "error": str(e)}
+
+    finally:
+        slots.put(slot)
+
+
+class Sweep:
+    def __init__(self, ui: BashUI, downloader: Downloader) -> None:
+        self._ui: BashUI = ui
+        self._downloader: Downloader = downloader
+
+    @staticmethod
+    def loadSpec(spec_path: Path) -> dict[str, object]:
+        import yaml
+
+        spec_path = Path(spec_path).expanduser()
+        if not spec_path.exists():
+            raise Exception(f"El archivo '{spec_path}' no existe.")
+
+        with open(spec_path, "r", encoding="utf-8") as f:
+            spec = yaml.safe_load(f) or {}
+
+        if "data" not in spec or not Path(spec["data"]).expanduser().exists():
+            raise Exception("La especificación debe indicar un 'data' existente.")
+
+        space: dict[str, object] = spec.get("space") or {}
+        unknown = set(space) - SWEEP_SPACE_KEYS
+        if unknown:
+            raise Exception(
+                f"Parámetros no soportados en 'space': {', '.join(sorted(unknown))}."
+            )
+
+        return spec
+
+    def run(self, spec: dict[str, object]) -> list[dict[str, object]]:
+        try:
+            from core.trainer import Trainer
+
+            data_yaml = str(Path(spec["data"]).expanduser().resolve())
+            sweep_dir = MODELS_TRAINED_DIR / f"sweep_{time.strftime('%Y%m%d%H%M%S')}"
+            sweep_dir.mkdir(parents=True, exist_ok=True)
+
+            trials = self._expand(spec)
+            halving: dict[str, int] = spec.get("halving") or {}
+            eta = int(halving.get("eta", SWEEP_ETA))
+            rung_epochs = self._rungs(
+                int(halving.get("min_epochs", SWEEP_MIN_EPOCHS)),
+                eta,
+                max(int(t["epochs"]) for t in trials),
+            )
+
+            self._ui.stepInfo("Preparando modelos base")
+            for trial in trials:
+                trial["model_path"] = str(self._resolveModel(str(trial["model"])))
+
+            self._ui.stepInfo("Generando cachés de etiquetas compartidas")
+            Trainer.prepareCaches(data_yaml)
+
+            # Una caché de imágenes decodificadas por 'imgsz', compartida en
+            # solo lectura por todas las pruebas con ese tamaño.
+            if spec.get("decoded_cache", False):
+                from core import Dataset
+
+                self._ui.stepInfo("Generando cachés de imágenes decodificadas")
+                dataset = Dataset(self._ui)
+                caches: dict[int, str] = {}
+                for trial in trials:
+                    imgsz = int(trial["imgsz"])
+                    if imgsz not in caches:
+                        result = dataset.decode(Path(data_yaml).parent, imgsz)
+                        caches[imgsz] = str(result["path"])
+                    trial["decoded_cache"] = caches[imgsz]
+
+            slots = self._slots(
+                spec.get("device", "auto"),
+                spec.get("threads"),
+                spec.get("workers"),
+            )
+            self._ui.stepSuccess(
+                f"{len(trials)} pruebas en {len(slots)} procesos paralelos.\n"
+                + f"  Escalones de halving (épocas): {', '.join(map(str, rung_epochs)) or 'ninguno'}"
+            )
+
+            leaderboard: list[dict[str, object]] = []
+            context = multiprocessing.get_context("spawn")
+
+            with context.Manager() as manager:
+                slot_queue = manager.Queue()
+                for slot in slots:
+                    slot_queue.put(slot)
+                rungs = manager.dict()
+                lock = manager.Lock()
+
+                with ProcessPoolExecutor(
+                    max_workers=min(len(slots), len(trials)),
+                    mp_context=context,
+                    initializer=_initWorker,
+                    initargs=(max(1, min(len(slot["cpus"]) for slot in slots)),),
+                ) as pool:
+                    futures = [
+                        pool.submit(
+                            _runTrial,
+                            trial,
+                            data_yaml,
+                            str(sweep_dir),
+                            rung_epochs,
+                            eta,
+                            slot_queue,
+                            rungs,
+                            lock,
+                        )
+                        for trial in trials
+                    ]
+
+                    for future in as_completed(futures):
+                        result = future.result()
+                        leaderboard.append(result)
+                        self._reportTrial(result)
+
+            leaderboard.sort(key=lambda r: r.get("fitness", 0.0), reverse=True)
+            with open(sweep_dir / "leaderboard.json", "w", encoding="utf-8") as f:
+                json.dump(leaderboard, f, indent=2)
+
+            self._printLeaderboard(leaderboard)
+            self._ui.stepSuccess(
+                f"Clasificación guardada en: {sweep_dir.parent.name}/{sweep_dir.name}/leaderboard.json"
+            )
+
+            return leaderboard
+
+        except Exception:
+            raise
+
+    def _expand(self, spec: dict[str, object]) -> list[dict[str, object]]:
+        space: dict[str, object] = spec.get("space") or {}
+        defaults: dict[str, object] = {
+            "model": "n",
+            "imgsz": 640,
+            "lr0": 0.01,
+            "epochs": 100,
+            "batch": spec.get("batch", 16),
+        }
+
+        keys = list(defaults.keys())
+        values = [
+            space[k] if isinstance(space.get(k), list) else [space.get(k, defaults[k])]
+            for k in keys
+        ]
+
+        trials: list[dict[str, object]] = []
+        for i, combination in enumerate(itertools.product(*values)):
+            trial = dict(zip(keys, combination))
+            trial["name"] = f"trial_{i:03d}"
+            trials.append(trial)
+
+        return trials
+
+    def _rungs(self, min_epochs: int, eta: int, max_epochs: int) -> list[int]:
+        rungs: list[int] = []
+        epoch = max(1, min_epochs)
+        while epoch < max_epochs:
+            rungs.append(epoch)
+            epoch *= max(2, eta)
+        return rungs
+
+    def _slots(
+        self,
+        device: object,
+        threads: int | None,
+        workers: int | None,
+    ) -> list[dict[str, object]]:
+        import torch
+
+        if hasattr(os, "sched_getaffinity"):
+            cpus = sorted(os.sched_getaffinity(0))
+        else:
+            cpus = list(range(os.cpu_count() or 1))
+
+        if device in (None, "auto", "cuda") and torch.cuda.is_available():
+            devices: list[object] = list(range(torch.cuda.device_count()))
+        elif isinstance(device, list):
+            devices = device
+        elif device in (None, "auto", "cuda"):
+            devices = ["cpu"]
+        else:
+            devices = [device]
+
+        if devices == ["cpu"]:
+            per_trial = int(threads or max(1, min(4, len(cpus))))
+            count = max(1, len(cpus) // per_trial)
+            devices = ["cpu"] * count
+        elif devices == ["mps"]:
+            count = 1
+        else:
+            count = len(devices)
+
+        if workers:
+            count = min(count, int(workers))
+            devices = devices[:count]
+
+        chunk = max(1, len(cpus) // count)
+        return [
+            {"device": devices[i], "cpus": cpus[i * chunk : (i + 1) * chunk]}
+            for i in range(count)
+        ]
+
+    def _resolveModel(self, model: str) -> Path:
+        if model in YOLO_MODEL_VERSIONS:
+            yolo_model = YOLO_MODEL_VERSIONS[model]
+            path = MODELS_BASE_DIR / yolo_model
+            if not path.exists():
+                if not self._downloader.runYOLO(YOLO_MODEL_URL + yolo_model, path):
+                    raise Exception(
+                        f"No se pudo descargar el modelo base '{yolo_model}'."
+                    )
+            return path
+
+        path = Path(model).expanduser()
+        if not path.exists() or path.suffix != ".pt":
+            raise Exception(f"El modelo '{model}' no existe o no es un modelo '.pt'.")
+        return path
+
+    def _reportTrial(self, result: dict[str, object]) -> None:
+        if result.get("error"):
+            self._ui.stepWarning(f"{result['name']} falló: {result['error']}")
+        elif result.get("stopped_at"):
+            self._ui.stepInfoBox(
+                result["name"],
+                f"detenido en época {result['stopped_at']} | fitness {result['fitness']:.4f}",
+            )
+        else:
+            self._ui.stepInfoBox(
+                result["name"], f"completado | fitness {result['fitness']:.4f}"
+            )
+
+    def _printLeaderboard(self, leaderboard: list[dict[str, object]]) -> None:
+        rows = [
+            [
+                result["name"],
+                result["model"],
+                result["imgsz"],
+                result["lr0"],
+                result.get("epochs_trained", 0),
+                f"{result.get('metrics/mAP50-95(B)', 0.0):.4f}",
+                f"{result.get('fitness', 0.0):.4f}",
+            ]
+            for result in leaderboard
+        ]
+        self._ui.table(
+            "CLASIFICACIÓN",
+            ["Prueba", "Modelo", "Imgsz", "LR0", "Épocas", "mAP50-95", "Fitness"],
+            rows,
+        )
@@ -0,0 +1,200 @@
+import json
+import time
+from pathlib import Path
+from typing import Callable
+
+from core.constants import (
+    TELEMETRY_FILENAME,
+    TELEMETRY_IO_BOUND_RATIO,
+    TELEMETRY_REFRESH_S,
+)
+from core.trainer import Trainer
+
+
+class Telemetry:
+    def __init__(
+        self,
+        on_update: Callable[[dict[str, object]], None] | None = None,
+        refresh_s: float = TELEMETRY_REFRESH_S,
+    ) -> None:
+        self._on_update = on_update
+        self._refresh_s: float = refresh_s
+
+        self.path: Path | None = None
+        self.summary: dict[str, object] = {}
+
+        self._file = None
+        self._cuda: bool = False
+        self._batch_images: int = 0
+        self._last_update: float = 0.0
+        self._reset()
+
+    def __enter__(self) -> "Telemetry":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        # Un error o una interrupción no pasan por 'on_train_end'.
+        self.close()
+
+    def close(self) -> None:
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def register(self, trainer: Trainer) -> None:
+        trainer.addCallback("on_train_start", self._onTrainStart)
+        trainer.addCallback("on_train_epoch_start", self._onEpochStart)
+        trainer.addCallback("on_train_batch_start", self._onBatchStart)
+        trainer.addCallback("on_train_batch_end", self._onBatchEnd)
+        trainer.addCallback("on_train_epoch_end", self._onEpochEnd)
+        trainer.addCallback("on_fit_epoch_end", self._onFitEpochEnd)
+        trainer.addCallback("on_train_end", self._onTrainEnd)
+
+    def _reset(self) -> None:
+        self._epoch_start: float = time.perf_counter()
+        self._batch_start: float = self._epoch_start
+        self._batch_end: float = self._epoch_start
+        self._train_end: float = self._epoch_start
+        self._batches: int = 0
+        self._images: int = 0
+        self._data_s: float = 0.0
+        self._compute_s: float = 0.0
+        self._peak_rss: int = 0
+
+    def _onTrainStart(self, trainer) -> None:
+        self.path = Path(trainer.save_dir) / TELEMETRY_FILENAME
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # En modo 'resume' se continúa el archivo existente.
+        self._file = open(self.path, "a", encoding="utf-8")
+
+        # En GPU los tiempos se toman con el dispositivo sincronizado; si no,
+        # el cálculo pendiente se atribuye a la espera de datos.
+        self._cuda = getattr(trainer.device, "type", "") == "cuda"
+
+        # Número real de imágenes de cada lote (el último suele ser menor).
+        preprocess = trainer.preprocess_batch
+
+        def preprocessBatch(batch):
+            self._batch_images = len(batch["img"])
+            return preprocess(batch)
+
+        trainer.preprocess_batch = preprocessBatch
+
+    def _onEpochStart(self, trainer) -> None:
+        self._reset()
+
+    def _onBatchStart(self, trainer) -> None:
+        self._synchronize()
+        self._batch_images = 0
+        self._batch_start = time.perf_counter()
+        self._data_s += self._batch_start - self._batch_end
+
+    def _onBatchEnd(self, trainer) -> None:
+        self._synchronize()
+        now = time.perf_counter()
+        data_s = self._batch_start - self._batch_end
+        compute_s = now - self._batch_start
+        self._compute_s += compute_s
+        self._batch_end = now
+
+        images = self._batch_images or int(trainer.batch_size)
+        self._batches += 1
+        self._images += images
+
+        rss, gpu = self._memory()
+        self._peak_rss = max(self._peak_rss, rss)
+
+        record = {
+            "type": "batch",
+            "epoch": trainer.epoch + 1,
+            "batch": self._batches,
+            "time": round(time.time(), 3),
+            "wall_s": round(data_s + compute_s, 4),
+            "data_s": round(data_s, 4),
+            "compute_s": round(compute_s, 4),
+            "images_per_s": round(images / max(data_s + compute_s, 1e-9), 2),
+            "rss_mb": self._mb(rss),
+            "gpu_mb": self._mb(gpu),
+        }
+        self._write(record)
+
+        if now - self._last_update >= self._refresh_s:
+            self._last_update = now
+            self._update(trainer, record)
+
+    def _onEpochEnd(self, trainer) -> None:
+        self._train_end = time.perf_counter()
+
+    def _onFitEpochEnd(self, trainer) -> None:
+        now = time.perf_counter()
+        train_s = self._train_end - self._epoch_start
+        busy_s = self._data_s + self._compute_s
+        data_ratio = self._data_s / busy_s if busy_s > 0 else 0.0
+        rss, gpu = self._memory()
+
+        record = {
+            "type": "epoch",
+            "epoch": trainer.epoch + 1,
+            "time": round(time.time(), 3),
+            "wall_s": round(now - self._epoch_start, 3),
+            "train_s": round(train_s, 3),
+            "val_s": round(now - self._train_end, 3),
+            "images": self._images,
+            "images_per_s": round(self._images / train_s, 2) if train_s > 0 else 0.0,
+            "data_s": round(self._data_s, 3),
+            "compute_s": round(self._compute_s, 3),
+            "data_ratio": round(data_ratio, 3),
+            "bound": "io" if data_ratio >= TELEMETRY_IO_BOUND_RATIO else "compute",
+            "rss_mb": self._mb(rss),
+            "peak_rss_mb": self._mb(max(self._peak_rss, rss)),
+            "gpu_mb": self._mb(gpu),
+            "gpu_peak_mb": self._mb(self._gpuPeak()),
+        }
+        self._write(record)
+        self._file.flush()
+
+        self.summary = record
+        self._update(trainer, record)
+
+    def _onTrainEnd(self, trainer) -> None:
+        self.close()
+
+    def _update(self, trainer, record: dict[str, object]) -> None:
+        if not self._on_update:
+            return
+
+        snapshot = {
+            **record,
+            "epochs": trainer.epochs,
+            "batches": len(trainer.train_loader),
+            "last_epoch": self.summary,
+        }
+        self._on_update(snapshot)
+
+    def _write(self, record: dict[str, object]) -> None:
+        if self._file:
+            self._file.write(json.dumps(record) + "\n")
+
+    def _synchronize(self) -> None:
+        if self._cuda:
+            import torch
+
+            torch.cuda.synchronize()
+
+    def _memory(self) -> tuple[int, int]:
+        import psutil
+        import torch
+
+        rss = psutil.Process().memory_info().rss
+        gpu = torch.cuda.memory_allocated() if torch.cuda.is_available() else 0
+        return rss, gpu
+
+    def _gpuPeak(self) -> int:
+        import torch
+
+        if not torch.cuda.is_available():
+            return 0
+        return torch.cuda.max_memory_allocated()
+
+    def _mb(self, value: int) -> float:
+        return round(value / (1024 * 1024), 1)
@@ -0,0 +1,125 @@
+import os
+import random
+
+import numpy as np
+
+from core.shards import parseLabels
+
+
+def tileOrigins(size: int, tile: int, stride: int) -> list[int]:
+    # Inicios de las teselas en un eje; la última se alinea con el borde.
+    if size <= tile:
+        return [0]
+    origins = list(range(0, size - tile, stride))
+    origins.append(size - tile)
+    return origins
+
+
+def clipBoxes(
+    boxes: np.ndarray,
+    tiles: np.ndarray,
+    min_visibility: float,
+) -> tuple[np.ndarray, np.ndarray]:
+    # Cajas (n, 4) y teselas (t, 4) en píxeles xyxy: una única operación
+    # difundida (t, n) recorta todas las cajas contra todas las teselas y
+    # marca las que conservan al menos 'min_visibility' de su área.
+    x0 = np.maximum(boxes[None, :, 0], tiles[:, None, 0])
+    y0 = np.maximum(boxes[None, :, 1], tiles[:, None, 1])
+    x1 = np.minimum(boxes[None, :, 2], tiles[:, None, 2])
+    y1 = np.minimum(boxes[None, :, 3], tiles[:, None, 3])
+
+    visible = np.clip(x1 - x0, 0, None) * np.clip(y1 - y0, 0, None)
+    area = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    keep = (visible > 0) & (visible >= min_visibility * area[None, :])
+
+    # Coordenadas YOLO (cx, cy, w, h) normalizadas a cada tesela.
+    size = (tiles[:, 2:] - tiles[:, :2])[:, None, :]
+    origin = tiles[:, None, :2]
+    center = (np.stack([x0 + x1, y0 + y1], axis=-1) / 2 - origin) / size
+    extent = np.stack([x1 - x0, y1 - y0], axis=-1) / size
+    return keep, np.concatenate([center, extent], axis=-1)
+
+
+def tileChunk(
+    rows: list[tuple[str, ...]],
+    images_dir: str,
+    labels_dir: str,
+    dest_folder: str,
+    tile_size: int,
+    overlap: float,
+    min_visibility: float,
+    empty_keep: float,
+) -> list[tuple[tuple[str, ...], list[tuple[str, str, str]] | None, int, int]]:
+    # Por par: la fila original, las teselas escritas en 'dest_folder'
+    # (stem, imagen, etiqueta) o None si la imagen no supera el tamaño de
+    # tesela, y cuántas teselas vacías y cajas recortadas se descartaron.
+    from PIL import Image, ImageOps
+
+    Image.MAX_IMAGE_PIXELS = None
+    stride = max(1, int(tile_size * (1 - overlap)))
+    results = []
+
+    for row in rows:
+        stem, image_name, label_name = row[:3]
+        ext = os.path.splitext(image_name)[1]
+
+        with Image.open(os.path.join(images_dir, image_name)) as source:
+            image = ImageOps.exif_transpose(source)
+            width, height = image.size
+            if width <= tile_size and height <= tile_size:
+                results.append((row, None, 0, 0))
+                continue
+
+            if ext.lower() in (".jpg", ".jpeg") and image.mode not in ("RGB", "L"):
+                image = image.convert("RGB")
+
+            labels = parseLabels(os.path.join(labels_dir, label_name))
+            boxes = np.empty((len(labels), 4), dtype=np.float64)
+            boxes[:, 0] = (labels[:, 1] - labels[:, 3] / 2) * width
+            boxes[:, 1] = (labels[:, 2] - labels[:, 4] / 2) * height
+            boxes[:, 2] = (labels[:, 1] + labels[:, 3] / 2) * width
+            boxes[:, 3] = (labels[:, 2] + labels[:, 4] / 2) * height
+
+            tiles = np.array(
+                [
+                    (x, y, min(x + tile_size, width), min(y + tile_size, height))
+                    for y in tileOrigins(height, tile_size, stride)
+                    for x in tileOrigins(width, tile_size, stride)
+                ],
+                dtype=np.float64,
+            )
+            keep, clipped = clipBoxes(boxes, tiles, min_visibility)
+
+            # Las teselas vacías se submuestrean con una semilla por imagen:
+            # repetir la etapa produce las mismas teselas.
+            rng = random.Random(stem)
+            written: list[tuple[str, str, str]] = []
+            empty_dropped = 0
+            for t, (x0, y0, x1, y1) in enumerate(tiles.astype(int).tolist()):
+                if not keep[t].any() and rng.random() >= empty_keep:
+                    empty_dropped += 1
+                    continue
+
+                tile_stem = f"{stem}_{x0}_{y0}"
+                tile_image = tile_stem + ext
+                tile_label = tile_stem + ".txt"
+
+                tile_rows = np.column_stack([labels[keep[t], 0], clipped[t, keep[t]]])
+                with open(
+                    os.path.join(dest_folder, "labels", tile_label),
+                    "w",
+                    encoding="utf-8",
+                ) as f:
+                    for cls, cx, cy, w, h in tile_rows.tolist():
+                        f.write(f"{int(cls)} {cx:.6f} {cy:.6f} {w:.6f} {h:.6f}\n")
+
+                image.crop((x0, y0, x1, y1)).save(
+                    os.path.join(dest_folder, "images", tile_image), quality=95
+                )
+                written.append((tile_stem, tile_image, tile_label))
+
+            # Cajas que no quedan visibles en ninguna tesela.
+            boxes_dropped = int((~keep.any(axis=0)).sum())
+            results.append((row, written, empty_dropped, boxes_dropped))
+
+    return results
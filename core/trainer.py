@@ -1,10 +1,22 @@
+import os
+import math
+import time
 from pathlib import Path
+
+import cv2
+import numpy as np
 from ultralytics import YOLO
+from ultralytics.data.dataset import YOLODataset
+
+from core.loaders import bufferImage
+from core.shards import ShardReader, ShardSampler
 
 
 class Trainer:
     def __init__(self, model_name: str) -> None:
         self._model: YOLO = YOLO(model_name)
+        self._epochs_s: list[tuple[float, float]] = []
+        self.projection: dict[str, float] | None = None
 
     def run(
         self,
@@ -15,8 +27,26 @@ class Trainer:
         project_dir: str,
         run_name: str,
         device: str,
+        workers: int = 8,
+        cache: bool | str = False,
+        amp: bool = True,
+        threads: int | None = None,
+        patience: int = 50,
+        lr0: float = 0.01,
+        decoded_cache: Path | None = None,
+        projection: dict[str, int] | None = None,
     ) -> tuple[bool, Path]:
         try:
+            if threads:
+                import torch
+
+                torch.set_num_threads(threads)
+
+            self._useDecodedCache(decoded_cache)
+            self.addCallback("on_pretrain_routine_start", useShards)
+            if projection:
+                self._timeEpochs()
+
             self._model.train(
                 data=data_yaml,  # Ruta del archivo data.yaml 'datasets/dataset_20260125120000/data.yaml'
                 epochs=epochs,  # Épocas
@@ -25,14 +55,379 @@ class Trainer:
                 project=str(project_dir),  # Ruta del proyecto 'models/trained'
                 name=run_name,  # Nombre del modelo entrenado 'model_20260125120000'
                 device=device,  # Dispositivo de entrenamiento 0 o 'mps' o 'cpu'
-                patience=50,  # Patencia para el entrenamiento
+                workers=workers,  # Procesos del dataloader
+                cache=cache,  # Caché de imágenes: False, 'ram' o 'disk'
+                amp=amp,  # Precisión mixta automática
+                lr0=lr0,  # Tasa de aprendizaje inicial
+                patience=patience,  # Patencia para el entrenamiento
                 exist_ok=True,  # Si el modelo ya existe, lo sobreescribe
                 verbose=True,  # Muestra el progreso del entrenamiento
             )
 
+            # Con 'projection' (imágenes de train y val, épocas e imgsz del
+            # entrenamiento completo) se extrapola su duración a partir del
+            # rendimiento medido en este entrenamiento.
+            if projection:
+                self.projection = self._project(imgsz, **projection)
+
+            best_model_path = self._model.trainer.save_dir / "weights" / "best.pt"
+
+            return True, best_model_path
+
+        except Exception:
+            raise
+
+    def resume(
+        self,
+        device: str | None = None,
+        threads: int | None = None,
+        decoded_cache: Path | None = None,
+    ) -> tuple[bool, Path]:
+        try:
+            if threads:
+                import torch
+
+                torch.set_num_threads(threads)
+
+            self._useDecodedCache(decoded_cache)
+            self.addCallback("on_pretrain_routine_start", useShards)
+
+            # Ultralytics recupera data, épocas e hiperparámetros desde el
+            # checkpoint 'last.pt'; solo se permite actualizar el dispositivo.
+            self._model.train(resume=True, device=device)
+
             best_model_path = self._model.trainer.save_dir / "weights" / "best.pt"
 
             return True, best_model_path
 
         except Exception:
             raise
+
+    def _useDecodedCache(self, decoded_cache: Path | None) -> None:
+        # Las imágenes de la caché se leen del mmap compartido en lugar de
+        # decodificarse en cada época.
+        if decoded_cache and Path(decoded_cache).exists():
+            from core.loaders import DecodedCache
+
+            DecodedCache(Path(decoded_cache)).register(self)
+
+    def _timeEpochs(self) -> None:
+        marks: dict[str, float] = {}
+
+        def onEpochStart(trainer) -> None:
+            marks["start"] = time.perf_counter()
+
+        def onEpochEnd(trainer) -> None:
+            marks["train"] = time.perf_counter()
+
+        def onFitEpochEnd(trainer) -> None:
+            now = time.perf_counter()
+            self._epochs_s.append(
+                (marks["train"] - marks["start"], now - marks["train"])
+            )
+
+        self._epochs_s = []
+        self.addCallback("on_train_epoch_start", onEpochStart)
+        self.addCallback("on_train_epoch_end", onEpochEnd)
+        self.addCallback("on_fit_epoch_end", onFitEpochEnd)
+
+    def _project(
+        self, imgsz: int, train: int, val: int, epochs: int, full_imgsz: int
+    ) -> dict[str, float] | None:
+        # La primera época incluye el arranque de los workers y las cachés:
+        # solo se usa si no hay otra.
+        measured = self._epochs_s[1:] or self._epochs_s
+        if not measured:
+            return None
+
+        trainer = self._model.trainer
+        subset_train = len(trainer.train_loader.dataset)
+        subset_val = len(trainer.test_loader.dataset) if trainer.test_loader else 0
+
+        train_s = sum(t for t, _ in measured) / len(measured)
+        val_s = sum(v for _, v in measured) / len(measured)
+
+        # El cómputo por imagen crece con el número de píxeles.
+        scale = (full_imgsz / imgsz) ** 2
+        epoch_s = train_s / max(subset_train, 1) * train * scale
+        if subset_val:
+            epoch_s += val_s / subset_val * val * scale
+
+        return {
+            "subset_epoch_s": round(train_s + val_s, 3),
+            "images_per_s": round(subset_train / train_s, 2) if train_s > 0 else 0.0,
+            "epoch_s": round(epoch_s, 3),
+            "seconds": round(epoch_s * epochs, 1),
+        }
+
+    def addCallback(self, event: str, callback) -> None:
+        self._model.add_callback(event, callback)
+
+    def results(self) -> dict[str, float]:
+        trainer = self._model.trainer
+        metrics = {k: float(v) for k, v in (trainer.metrics or {}).items()}
+        metrics["fitness"] = float(trainer.best_fitness or 0.0)
+        metrics["epochs_trained"] = int(trainer.epoch) + 1
+        return metrics
+
+    @staticmethod
+    def prepareCaches(data_yaml: str) -> None:
+        from ultralytics.cfg import get_cfg
+        from ultralytics.data.utils import check_det_dataset
+
+        # Construir los datasets una vez genera los 'labels.cache' que luego
+        # comparten todos los procesos de entrenamiento en modo solo lectura.
+        data = check_det_dataset(str(data_yaml))
+        hyp = get_cfg()
+        for split in ("train", "val"):
+            if ShardReader.isShardDir(data[split]):
+                continue
+            YOLODataset(
+                img_path=data[split],
+                data=data,
+                hyp=hyp,
+                augment=False,
+                task="detect",
+            )
+
+    @staticmethod
+    def checkCaches(data_yaml: str) -> set[str]:
+        from ultralytics.data.dataset import DATASET_CACHE_VERSION
+        from ultralytics.data.utils import (
+            check_det_dataset,
+            get_hash,
+            load_dataset_cache_file,
+        )
+
+        # Splits cuyo 'labels.cache' corresponde a sus archivos actuales. Una
+        # caché obsoleta o parcial (p. ej. de una prueba rápida) se borra
+        # para que Ultralytics la genere completa: parchearla la daría por
+        # válida.
+        data = check_det_dataset(str(data_yaml))
+        valid: set[str] = set()
+        for split in ("train", "val"):
+            if ShardReader.isShardDir(data[split]):
+                continue
+            im_files, label_files = _splitFiles(data[split])
+            if not im_files:
+                continue
+            cache_path = Path(label_files[0]).parent.with_suffix(".cache")
+            if not cache_path.exists():
+                continue
+
+            try:
+                cache = load_dataset_cache_file(cache_path)
+            except Exception:
+                cache = {}
+            if cache.get("version") == DATASET_CACHE_VERSION and cache.get(
+                "hash"
+            ) == get_hash(label_files + im_files):
+                valid.add(split)
+            else:
+                cache_path.unlink(missing_ok=True)
+
+        return valid
+
+    @staticmethod
+    def updateCaches(
+        data_yaml: str,
+        files: dict[str, list[str]],
+        valid: set[str],
+    ) -> int:
+        from ultralytics.data.dataset import DATASET_CACHE_VERSION
+        from ultralytics.data.utils import (
+            check_det_dataset,
+            get_hash,
+            img2label_paths,
+            load_dataset_cache_file,
+            save_dataset_cache_file,
+            verify_image_label,
+        )
+
+        # Actualiza con las imágenes nuevas o reemplazadas de cada split los
+        # 'labels.cache' que eran válidos antes de incorporarlas ('valid',
+        # de 'checkCaches'), sin volver a verificar el resto. Un split sin
+        # caché la genera Ultralytics completa en el siguiente entrenamiento.
+        data = check_det_dataset(str(data_yaml))
+        updated = 0
+        for split, changed in files.items():
+            if not changed or split not in valid:
+                continue
+
+            im_files, label_files = _splitFiles(data[split])
+            cache_path = Path(label_files[0]).parent.with_suffix(".cache")
+            try:
+                cache = load_dataset_cache_file(cache_path)
+            except Exception:
+                cache_path.unlink(missing_ok=True)
+                continue
+
+            existing = set(im_files)
+            replaced = set(changed)
+            labels = [
+                label
+                for label in cache["labels"]
+                if label["im_file"] in existing and label["im_file"] not in replaced
+            ]
+            for im_file, lb_file in zip(changed, img2label_paths(changed)):
+                im_file, lb, shape, segments, keypoints, *_ = verify_image_label(
+                    (im_file, lb_file, "", False, len(data["names"]), 0, 0, False)
+                )
+                if im_file:
+                    labels.append(
+                        {
+                            "im_file": im_file,
+                            "shape": shape,
+                            "cls": lb[:, 0:1],
+                            "bboxes": lb[:, 1:],
+                            "segments": segments,
+                            "keypoints": keypoints,
+                            "normalized": True,
+                            "bbox_format": "xywh",
+                        }
+                    )
+
+            found = sum(1 for label in labels if len(label["cls"]))
+            cache["labels"] = labels
+            cache["hash"] = get_hash(label_files + im_files)
+            cache["results"] = (
+                found,
+                0,
+                len(labels) - found,
+                len(im_files) - len(labels),
+                len(im_files),
+            )
+            save_dataset_cache_file(
+                f"{split}: ", cache_path, cache, DATASET_CACHE_VERSION
+            )
+            updated += 1
+
+        return updated
+
+
+def _splitFiles(img_path: str) -> tuple[list[str], list[str]]:
+    import glob
+    from ultralytics.data.utils import IMG_FORMATS, img2label_paths
+
+    # Misma lista (y orden) de imágenes y etiquetas con la que Ultralytics
+    # calcula el hash de 'labels.cache'.
+    im_files = sorted(
+        path
+        for path in glob.glob(str(Path(img_path) / "**" / "*.*"), recursive=True)
+        if path.rpartition(".")[-1].lower() in IMG_FORMATS
+    )
+    return im_files, img2label_paths(im_files)
+
+
+class ShardYOLODataset(YOLODataset):
+    def __init__(self, *args, img_path: str, **kwargs) -> None:
+        self.reader: ShardReader = ShardReader(Path(img_path))
+        super().__init__(*args, img_path=img_path, **kwargs)
+
+    def get_img_files(self, img_path: str) -> list[str]:
+        # Rutas virtuales: solo identifican cada imagen dentro de los shards.
+        files = [str(self.reader.path / name) for name in self.reader.names()]
+        fraction = getattr(self, "fraction", 1.0)
+        if fraction < 1:
+            files = files[: round(len(files) * fraction)]
+        return files
+
+    def get_labels(self) -> list[dict]:
+        self.label_files = []
+        labels = []
+        for i, im_file in enumerate(self.im_files):
+            rows = np.array(self.reader.labels(i), dtype=np.float32)
+            record = self.reader.index[i]
+            labels.append(
+                {
+                    "im_file": im_file,
+                    "shape": (int(record["h"]), int(record["w"])),
+                    "cls": rows[:, 0:1],
+                    "bboxes": rows[:, 1:],
+                    "segments": [],
+                    "keypoints": None,
+                    "normalized": True,
+                    "bbox_format": "xywh",
+                }
+            )
+        return labels
+
+    def load_image(self, i: int, rect_mode: bool = True):
+        if self.ims[i] is not None:
+            return self.ims[i], self.im_hw0[i], self.im_hw[i]
+
+        im = cv2.imdecode(
+            np.frombuffer(self.reader.data(i), dtype=np.uint8), cv2.IMREAD_COLOR
+        )
+        if im is None:
+            raise Exception(f"No se pudo decodificar '{self.im_files[i]}'.")
+
+        h0, w0 = im.shape[:2]
+        if rect_mode:
+            r = self.imgsz / max(h0, w0)
+            if r != 1:
+                w = min(math.ceil(w0 * r), self.imgsz)
+                h = min(math.ceil(h0 * r), self.imgsz)
+                im = cv2.resize(im, (w, h), interpolation=cv2.INTER_LINEAR)
+        elif not (h0 == w0 == self.imgsz):
+            im = cv2.resize(
+                im, (self.imgsz, self.imgsz), interpolation=cv2.INTER_LINEAR
+            )
+
+        return bufferImage(self, i, im, (h0, w0))
+
+
+def useShards(trainer) -> None:
+    # Las rutas de data.yaml que apuntan a shards (ver Dataset.pack) se leen
+    # con ShardYOLODataset; el dataloader de train recorre los shards en
+    # orden aleatorio y cada uno de forma casi secuencial.
+    build = trainer.build_dataset
+    get_dataloader = trainer.get_dataloader
+
+    def buildDataset(img_path, mode="train", batch=None):
+        if not ShardReader.isShardDir(img_path):
+            return build(img_path, mode, batch)
+
+        args = trainer.args
+        model = getattr(trainer.model, "module", trainer.model)
+        stride = getattr(model, "stride", None)
+        return ShardYOLODataset(
+            img_path=str(img_path),
+            imgsz=args.imgsz,
+            batch_size=batch,
+            augment=mode == "train",
+            hyp=args,
+            rect=args.rect or mode == "val",
+            cache="ram" if args.cache in (True, "ram") else None,
+            single_cls=args.single_cls or False,
+            stride=max(int(stride.max()) if stride is not None else 0, 32),
+            pad=0.0 if mode == "train" else 0.5,
+            prefix=f"{mode}: ",
+            task=args.task,
+            classes=args.classes,
+            data=trainer.data,
+            fraction=args.fraction if mode == "train" else 1.0,
+        )
+
+    def getDataloader(dataset_path, batch_size=16, rank=0, mode="train"):
+        if mode != "train" or rank != -1 or not ShardReader.isShardDir(dataset_path):
+            return get_dataloader(dataset_path, batch_size, rank, mode)
+
+        import torch
+        from ultralytics.data.build import InfiniteDataLoader, seed_worker
+
+        dataset = trainer.build_dataset(dataset_path, mode, batch_size)
+        devices = max(torch.cuda.device_count(), 1)
+        return InfiniteDataLoader(
+            dataset=dataset,
+            batch_size=min(batch_size, len(dataset)),
+            shuffle=False,
+            num_workers=min((os.cpu_count() or 1) // devices, trainer.args.workers),
+            sampler=ShardSampler(dataset.reader, len(dataset), seed=trainer.args.seed),
+            pin_memory=torch.cuda.is_available(),
+            collate_fn=dataset.collate_fn,
+            worker_init_fn=seed_worker,
+        )
+
+    trainer.build_dataset = buildDataset
+    trainer.get_dataloader = getDataloader
@@ -0,0 +1,101 @@
+import os
+import time
+import hashlib
+import shutil
+
+from core.constants import RESIZE_FORMATS
+
+
+def transcodeChunk(
+    items: list[tuple[str, str]],
+    long_side: int,
+    fmt: str,
+    quality: int,
+    cache_dir: str,
+) -> list[tuple[str, str, str, str, int, int]]:
+    # Por imagen (origen, destino sin extensión): estado ('skip', 'cached' o
+    # 'new'), origen, ruta temporal con el resultado, destino final y bytes
+    # antes y después. La salida se guarda en la caché con la clave (hash del
+    # origen, lado largo, formato y calidad) y se enlaza junto al destino.
+    from PIL import Image
+
+    ext = RESIZE_FORMATS[fmt]
+    results: list[tuple[str, str, str, str, int, int]] = []
+
+    for src, dst_base in items:
+        dst = dst_base + ext
+        size_in = os.path.getsize(src)
+
+        with Image.open(src) as image:
+            same_format = (image.format or "").lower() == fmt
+            if same_format and max(image.size) <= long_side and src == dst:
+                results.append(("skip", src, "", dst, size_in, size_in))
+                continue
+
+        with open(src, "rb") as f:
+            digest = hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+        key = f"{digest}_{long_side}_{fmt}_{quality}"
+        cached = os.path.join(cache_dir, key[:2], key + ext)
+
+        status = "cached"
+        if not os.path.exists(cached):
+            status = "new"
+            _encode(src, cached, long_side, fmt, quality)
+
+        # Enlace duro desde la caché (sin copiar datos si están en el mismo
+        # sistema de archivos); el archivo temporal se renombra al aplicar.
+        part = dst + ".part"
+        if os.path.exists(part):
+            os.remove(part)
+        try:
+            os.link(cached, part)
+        except OSError:
+            shutil.copyfile(cached, part)
+
+        results.append((status, src, part, dst, size_in, os.path.getsize(part)))
+
+    return results
+
+
+def decodeTime(paths: list[str], imgsz: int) -> float:
+    # Segundos medios para decodificar una imagen y llevarla a 'imgsz', como
+    # hace el dataloader en cada época.
+    from PIL import Image
+
+    if not paths:
+        return 0.0
+
+    start = time.perf_counter()
+    for path in paths:
+        with Image.open(path) as image:
+            image = image.convert("RGB")
+            ratio = imgsz / max(image.size)
+            if ratio < 1:
+                size = (round(image.width * ratio), round(image.height * ratio))
+                image.resize(size, Image.BILINEAR)
+
+    return (time.perf_counter() - start) / len(paths)
+
+
+def _encode(src: str, dest: str, long_side: int, fmt: str, quality: int) -> None:
+    from PIL import Image, ImageOps
+
+    with Image.open(src) as image:
+        # 'draft' permite al decodificador JPEG reducir la imagen al leerla.
+        image.draft("RGB", (long_side, long_side))
+
+        # Las etiquetas se anotan sobre la imagen ya orientada; la orientación
+        # EXIF se aplica antes de descartar los metadatos.
+        image = ImageOps.exif_transpose(image)
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+        if max(image.size) > long_side:
+            image.thumbnail((long_side, long_side), Image.LANCZOS)
+
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        tmp = f"{dest}.{os.getpid()}.tmp"
+        if fmt == "webp":
+            image.save(tmp, format="WEBP", quality=quality, method=4)
+        else:
+            image.save(tmp, format="JPEG", quality=quality, optimize=True)
+        os.replace(tmp, dest)
@@ -0,0 +1,265 @@
+import os
+import json
+import time
+import shutil
+import tempfile
+from pathlib import Path
+
+from core.constants import (
+    AUTOTUNE_FILENAME,
+    AUTOTUNE_TRIAL_BATCHES,
+    AUTOTUNE_WARMUP_BATCHES,
+)
+from core.profiler import timed
+from ui import BashUI
+
+
+class _TrialStop(Exception):
+    pass
+
+
+class Tuner:
+    def __init__(
+        self,
+        ui: BashUI,
+        model_name: str,
+        warmup_batches: int = AUTOTUNE_WARMUP_BATCHES,
+        trial_batches: int = AUTOTUNE_TRIAL_BATCHES,
+    ) -> None:
+        self._ui: BashUI = ui
+        self._model_name: str = model_name
+        self._warmup_batches: int = warmup_batches
+        self._trial_batches: int = trial_batches
+
+    @timed("Auto-ajuste")
+    def run(
+        self,
+        data_yaml: str,
+        imgsz: int,
+        batch: int,
+        device: str | list[int] | None,
+        images: int = 0,
+    ) -> dict[str, object]:
+        try:
+            is_cuda = self._isCUDA(device)
+            cpus = self._cpuCount()
+
+            best: dict[str, object] = {
+                "batch": batch,
+                "workers": min(8, cpus) if is_cuda else 0,
+                "cache": False,
+                "amp": is_cuda,
+                "threads": cpus,
+            }
+            candidates = self._candidates(batch, cpus, is_cuda)
+
+            measured: dict[str, dict[str, object]] = {}
+            trials: list[dict[str, object]] = []
+
+            # Búsqueda por coordenadas: se ajusta un parámetro a la vez
+            # manteniendo fijo el mejor valor encontrado para el resto.
+            for param, values in candidates.items():
+                results: list[dict[str, object]] = []
+
+                for value in values:
+                    config = {**best, param: value}
+                    key = json.dumps(config, sort_keys=True)
+
+                    if key not in measured:
+                        self._ui.stepInfo(
+                            "Prueba "
+                            + " | ".join(f"{k}: {v}" for k, v in config.items())
+                        )
+                        measured[key] = self._trial(data_yaml, imgsz, device, config)
+                        trials.append(measured[key])
+                        self._reportTrial(measured[key])
+
+                    results.append(measured[key])
+
+                valid = [r for r in results if not r.get("error")]
+                if valid:
+                    best = dict(max(valid, key=lambda r: r["images_per_s"])["config"])
+
+            best_key = json.dumps(best, sort_keys=True)
+            if measured.get(best_key, {}).get("error"):
+                raise Exception("Ninguna configuración de prueba pudo entrenar.")
+
+            return {
+                "key": self.key(imgsz, device, images),
+                "config": best,
+                "measurements": measured[best_key],
+                "trials": trials,
+            }
+
+        except Exception:
+            raise
+
+    def key(
+        self,
+        imgsz: int,
+        device: str | list[int] | None,
+        images: int = 0,
+    ) -> dict[str, object]:
+        return {
+            "model": Path(self._model_name).name,
+            "images": images,
+            "imgsz": imgsz,
+            "device": str(device),
+            "cpus": self._cpuCount(),
+        }
+
+    @staticmethod
+    def save(result: dict[str, object], run_dir: Path) -> Path:
+        run_dir.mkdir(parents=True, exist_ok=True)
+        path = run_dir / AUTOTUNE_FILENAME
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+        return path
+
+    @staticmethod
+    def find(project_dir: Path, key: dict[str, object]) -> dict[str, object] | None:
+        if not project_dir.exists():
+            return None
+
+        candidates = sorted(
+            project_dir.glob(f"*/{AUTOTUNE_FILENAME}"),
+            key=lambda p: p.stat().st_mtime,
+            reverse=True,
+        )
+        for path in candidates:
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    result = json.load(f)
+            except (OSError, ValueError):
+                continue
+
+            if result.get("key") == key:
+                return result
+
+        return None
+
+    def _trial(
+        self,
+        data_yaml: str,
+        imgsz: int,
+        device: str | list[int] | None,
+        config: dict[str, object],
+    ) -> dict[str, object]:
+        import torch
+        from ultralytics import YOLO
+
+        from core.trainer import useShards
+
+        total_batches = self._warmup_batches + self._trial_batches
+        state: dict[str, object] = {"times": [], "peak_rss": self._rss()}
+
+        def onBatchEnd(trainer) -> None:
+            state["times"].append(time.perf_counter())
+            state["peak_rss"] = max(state["peak_rss"], self._rss())
+            if len(state["times"]) >= total_batches:
+                raise _TrialStop()
+
+        project_dir = Path(tempfile.mkdtemp(prefix="autotune_"))
+        torch.set_num_threads(int(config["threads"]))
+
+        try:
+            model = YOLO(self._model_name)
+            model.add_callback("on_train_batch_end", onBatchEnd)
+            model.add_callback("on_pretrain_routine_start", useShards)
+            model.train(
+                data=data_yaml,
+                epochs=1,
+                imgsz=imgsz,
+                batch=config["batch"],
+                workers=config["workers"],
+                cache=config["cache"],
+                amp=config["amp"],
+                device=device,
+                project=str(project_dir),
+                name="trial",
+                exist_ok=True,
+                val=False,
+                save=False,
+                plots=False,
+                verbose=False,
+            )
+        except _TrialStop:
+            pass
+        except Exception as e:
+            return {"config": config, "images_per_s": 0.0, "error": str(e)}
+        finally:
+            shutil.rmtree(str(project_dir), ignore_errors=True)
+            if torch.cuda.is_available():
+                torch.cuda.empty_cache()
+
+        times: list[float] = state["times"]
+        if len(times) <= self._warmup_batches:
+            return {
+                "config": config,
+                "images_per_s": 0.0,
+                "error": "Dataset insuficiente para medir el rendimiento.",
+            }
+
+        measured = times[self._warmup_batches - 1 :] if self._warmup_batches else times
+        elapsed = measured[-1] - measured[0]
+        images = (len(measured) - 1) * int(config["batch"])
+
+        return {
+            "config": config,
+            "images_per_s": round(images / elapsed, 2) if elapsed > 0 else 0.0,
+            "peak_rss_mb": round(state["peak_rss"] / (1024 * 1024), 1),
+        }
+
+    def _candidates(
+        self,
+        batch: int,
+        cpus: int,
+        is_cuda: bool,
+    ) -> dict[str, list[object]]:
+        candidates: dict[str, list[object]] = {
+            "threads": sorted({max(1, cpus // 2), cpus}),
+            "cache": [False, "ram", "disk"],
+            "batch": sorted({max(1, batch // 2), batch, batch * 2}),
+        }
+
+        # Ultralytics fuerza workers=0 en CPU/MPS y solo usa AMP con CUDA,
+        # por lo que esas dimensiones solo se prueban con GPUs NVIDIA.
+        if is_cuda:
+            candidates["workers"] = sorted({0, min(8, cpus // 2), min(16, cpus)})
+            candidates["amp"] = [True, False]
+
+        return candidates
+
+    def _reportTrial(self, result: dict[str, object]) -> None:
+        if result.get("error"):
+            self._ui.stepInfoBox("Resultado", f"Error: {result['error'][:40]}")
+        else:
+            self._ui.stepInfoBox(
+                "Resultado",
+                f"{result['images_per_s']} img/s | {result['peak_rss_mb']} MB",
+            )
+
+    def _isCUDA(self, device: str | list[int] | None) -> bool:
+        if device in ("cpu", "mps"):
+            return False
+
+        import torch
+
+        return torch.cuda.is_available()
+
+    def _cpuCount(self) -> int:
+        if hasattr(os, "sched_getaffinity"):
+            return len(os.sched_getaffinity(0))
+        return os.cpu_count() or 1
+
+    def _rss(self) -> int:
+        import psutil
+
+        process = psutil.Process()
+        total = process.memory_info().rss
+        for child in process.children(recursive=True):
+            try:
+                total += child.memory_info().rss
+            except psutil.Error:
+                continue
+        return total
@@ -1,6 +1,3 @@
-import zipfile
-import rarfile
-import tarfile
 from pathlib import Path
 
 from core.constants import IMAGE_EXTENSIONS, LABEL_EXTENSIONS, UNZIP_EXTENSIONS
@@ -70,6 +67,10 @@ class Validator:
 
     @staticmethod
     def unzipType(path: Path) -> str:
+        import zipfile
+        import tarfile
+        import rarfile
+
         if not path.exists():
             return "path_not_found"
         elif path.is_file() and path.suffix.lower() in UNZIP_EXTENSIONS:
@@ -0,0 +1,489 @@
+import os
+import sys
+import json
+import time
+import shutil
+import select
+import struct
+import multiprocessing
+from pathlib import Path
+from concurrent.futures import Future, ProcessPoolExecutor
+
+from core.constants import (
+    IMAGE_EXTENSIONS,
+    LABEL_EXTENSIONS,
+    MODELS_BASE_DIR,
+    MODELS_TRAINED_DIR,
+    WATCH_DIRNAME,
+    WATCH_LR0,
+    WATCH_PATIENCE,
+    WATCH_POLL_SECONDS,
+    WATCH_STATE_FILE,
+    YOLO_MODEL_URL,
+    YOLO_MODEL_VERSIONS,
+)
+from core.append import Append
+from core.dataset import Dataset
+from core.downloader import Downloader
+from core.stream import walk
+from core.validator import Validator
+from ui import BashUI
+
+# Máscaras de inotify (linux/inotify.h).
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+
+
+class Inotify:
+    def __init__(self, root: Path) -> None:
+        # Archivos terminados de escribir (o movidos) en 'root' y sus
+        # subcarpetas, sin recorrer la carpeta en cada consulta.
+        import ctypes
+        import ctypes.util
+
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._fd: int = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error))
+
+        self._dirs: dict[int, str] = {}
+        self.overflow: bool = False
+        try:
+            for parent, _, _ in os.walk(root):
+                self._add(parent)
+        except Exception:
+            self.close()
+            raise
+
+    def read(self, timeout: float) -> list[str]:
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return []
+
+        paths: list[str] = []
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                break
+
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = struct.unpack_from("iIII", data, offset)
+                name = data[offset + 16 : offset + 16 + length].rstrip(b"\0")
+                offset += 16 + length
+
+                if mask & IN_Q_OVERFLOW:
+                    self.overflow = True
+                    continue
+                if mask & IN_IGNORED:
+                    self._dirs.pop(wd, None)
+                    continue
+
+                parent = self._dirs.get(wd)
+                if parent is None or not name:
+                    continue
+                path = os.path.join(parent, os.fsdecode(name))
+
+                if mask & IN_ISDIR:
+                    # Carpeta nueva: se vigila y se recogen los archivos que
+                    # ya contenga (movida entera o creados antes del watch).
+                    if mask & (IN_CREATE | IN_MOVED_TO):
+                        for folder, _, names in os.walk(path):
+                            self._add(folder)
+                            paths.extend(os.path.join(folder, n) for n in names)
+                elif mask & (IN_CLOSE_WRITE | IN_MOVED_TO):
+                    paths.append(path)
+
+        return paths
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+    def _add(self, path: str) -> None:
+        wd = self._libc.inotify_add_watch(
+            self._fd, os.fsencode(path), IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+        )
+        if wd < 0:
+            import ctypes
+
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error), path)
+        self._dirs[wd] = path
+
+
+class Poller:
+    def __init__(self, root: Path) -> None:
+        # Alternativa sin inotify (otros sistemas o carpetas de red): un
+        # archivo se da por terminado cuando su tamaño y fecha no cambian
+        # entre dos recorridos.
+        self._root: Path = root
+        self._last: dict[str, tuple[int, int]] = self._scan()
+        self._reported: dict[str, tuple[int, int]] = dict(self._last)
+        self.overflow: bool = False
+
+    def read(self, timeout: float) -> list[str]:
+        time.sleep(timeout)
+        current = self._scan()
+
+        paths = [
+            path
+            for path, stat in current.items()
+            if self._last.get(path) == stat and self._reported.get(path) != stat
+        ]
+        self._reported = {path: self._reported.get(path) for path in current}
+        for path in paths:
+            self._reported[path] = current[path]
+        self._last = current
+        return paths
+
+    def close(self) -> None:
+        pass
+
+    def _scan(self) -> dict[str, tuple[int, int]]:
+        files: dict[str, tuple[int, int]] = {}
+        for record in walk(self._root):
+            if record.suffix in IMAGE_EXTENSIONS or record.suffix in LABEL_EXTENSIONS:
+                try:
+                    stat = os.stat(record.path)
+                except FileNotFoundError:
+                    continue
+                files[record.path] = (stat.st_size, stat.st_mtime_ns)
+        return files
+
+
+def createWatcher(root: Path, poll: bool = False) -> Inotify | Poller:
+    if not poll and sys.platform.startswith("linux"):
+        try:
+            return Inotify(root)
+        except (OSError, AttributeError):
+            pass
+    return Poller(root)
+
+
+def _fineTune(
+    model_path: str,
+    data_yaml: str,
+    project_dir: str,
+    run_name: str,
+    pairs: int,
+    options: dict[str, object],
+) -> dict[str, object]:
+    start = time.perf_counter()
+    result: dict[str, object] = {
+        "name": run_name,
+        "pairs": pairs,
+        "model_path": model_path,
+    }
+
+    try:
+        from core.trainer import Trainer
+
+        trainer = Trainer(model_path)
+        _, best_model_path = trainer.run(
+            data_yaml=data_yaml,
+            epochs=int(options["epochs"]),
+            imgsz=int(options["imgsz"]),
+            batch=int(options["batch"]),
+            project_dir=project_dir,
+            run_name=run_name,
+            device=options.get("device", None),
+            lr0=WATCH_LR0,
+            patience=WATCH_PATIENCE,
+        )
+
+        return {
+            **result,
+            **trainer.results(),
+            "time_s": round(time.perf_counter() - start, 1),
+            "best_model_path": str(best_model_path),
+        }
+
+    except Exception as e:
+        return {**result, "error": str(e)}
+
+
+class Watch:
+    def __init__(
+        self,
+        ui: BashUI,
+        validator: Validator,
+        dataset: Dataset,
+        downloader: Downloader,
+    ) -> None:
+        self._ui: BashUI = ui
+        self._downloader: Downloader = downloader
+        self._append: Append = Append(ui, validator, dataset, downloader)
+
+        # Archivos terminados por carpeta y stem hasta completar su par.
+        self._pending: dict[tuple[str, str], dict[str, str]] = {}
+        self._ready_at: float | None = None
+
+    def run(
+        self,
+        dataset_path: Path,
+        folder: Path | str,
+        options: dict[str, object],
+    ) -> None:
+        try:
+            folder = Path(folder).expanduser().resolve()
+            if not folder.is_dir():
+                raise Exception(f"La carpeta '{folder}' no existe.")
+            if folder == dataset_path or dataset_path in folder.parents:
+                raise Exception(
+                    "La carpeta vigilada no puede estar dentro del dataset."
+                )
+
+            run_dir = MODELS_TRAINED_DIR / f"watch_{dataset_path.name}"
+            run_dir.mkdir(parents=True, exist_ok=True)
+            state = self._loadState(run_dir, dataset_path)
+
+            model_path = self._lastModel(state)
+            if model_path:
+                self._ui.stepInfo(f"Se continúa desde: {model_path}")
+            else:
+                model_path = self._resolveModel(str(options["model"]))
+
+            classes: list[str] | None = options.get("classes", None)
+            watcher = createWatcher(folder, bool(options.get("poll", False)))
+            backend = (
+                "inotify"
+                if isinstance(watcher, Inotify)
+                else f"sondeo cada {WATCH_POLL_SECONDS:g} s"
+            )
+
+            try:
+                # Lo que ya está en la carpeta se compara completo una vez;
+                # después solo llegan los pares que notifica el vigilante.
+                self._ui.stepInfo(f"Comparando '{folder}' con el dataset")
+                untrained = self._catchUp(dataset_path, folder, classes)
+
+                self._ui.stepSuccess(
+                    f"Vigilando '{folder}' ({backend}).\n"
+                    + f"  Lotes de {options['pairs']} pares o cada"
+                    + f" {options['seconds']:g} s; Ctrl-C para detener."
+                )
+
+                future: Future | None = None
+                held = False
+                context = multiprocessing.get_context("spawn")
+
+                # Un único proceso de entrenamiento: mientras hay un ajuste
+                # en curso los lotes se acumulan y se incorporan juntos al
+                # terminar, seguidos de un solo ajuste nuevo.
+                with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                    while True:
+                        self._collect(watcher.read(WATCH_POLL_SECONDS))
+
+                        if future is not None and future.done():
+                            model_path = (
+                                self._finishRound(future.result(), state, run_dir)
+                                or model_path
+                            )
+                            future, held = None, False
+
+                        if future is not None:
+                            if not held and self._batchReady(options):
+                                self._ui.stepInfo(
+                                    "Lote listo: se incorporará al terminar el ajuste en curso."
+                                )
+                                held = True
+                            continue
+
+                        if watcher.overflow:
+                            # Cola de eventos desbordada: se compara la carpeta
+                            # completa en lugar de confiar en los eventos.
+                            watcher.overflow = False
+                            self._pending.clear()
+                            self._ready_at = None
+                            untrained += self._catchUp(dataset_path, folder, classes)
+                        elif self._batchReady(options):
+                            untrained += self._appendBatch(
+                                dataset_path, folder, classes
+                            )
+
+                        if untrained:
+                            run_name = f"round_{len(state['rounds']) + 1:03d}"
+                            self._ui.stepInfo(
+                                f"Ajuste fino '{run_name}' con {untrained} pares"
+                                + f" incorporados desde '{model_path}'"
+                            )
+                            future = pool.submit(
+                                _fineTune,
+                                str(model_path),
+                                str(dataset_path / "data.yaml"),
+                                str(run_dir),
+                                run_name,
+                                untrained,
+                                options,
+                            )
+                            untrained = 0
+
+            finally:
+                watcher.close()
+                shutil.rmtree(dataset_path / WATCH_DIRNAME, ignore_errors=True)
+
+        except Exception:
+            raise
+
+    def _collect(self, paths: list[str]) -> None:
+        for path in paths:
+            suffix = os.path.splitext(path)[1].lower()
+            if suffix in IMAGE_EXTENSIONS:
+                kind = "images"
+            elif suffix in LABEL_EXTENSIONS:
+                kind = "labels"
+            else:
+                continue
+
+            files = self._pending.setdefault(self._pairKey(path), {})
+            files[kind] = path
+
+            # Si solo cambia uno de los dos archivos, su pareja ya está en la
+            # carpeta y no generará evento.
+            if len(files) == 1:
+                partner = self._partner(path, kind)
+                if partner:
+                    files[partner[0]] = partner[1]
+            if len(files) == 2 and self._ready_at is None:
+                self._ready_at = time.monotonic()
+
+    def _pairKey(self, path: str) -> tuple[str, str]:
+        # 'cam1/0001' y 'cam2/0001' son pares distintos; 'images/' y
+        # 'labels/' hermanas cuentan como la misma carpeta.
+        directory, name = os.path.split(path)
+        parent, base = os.path.split(directory)
+        if base in ("images", "labels"):
+            directory = os.path.join(parent, "images|labels")
+        return directory, os.path.splitext(name)[0]
+
+    def _partner(self, path: str, kind: str) -> tuple[str, str] | None:
+        # Misma carpeta o la carpeta hermana del esquema YOLO (images/labels).
+        directory, name = os.path.split(path)
+        stem = os.path.splitext(name)[0]
+        other = "labels" if kind == "images" else "images"
+        extensions = LABEL_EXTENSIONS if kind == "images" else IMAGE_EXTENSIONS
+
+        folders = [directory]
+        parent, base = os.path.split(directory)
+        if base == kind:
+            folders.append(os.path.join(parent, other))
+
+        for folder in folders:
+            for ext in extensions:
+                for candidate in (stem + ext, stem + ext.upper()):
+                    candidate_path = os.path.join(folder, candidate)
+                    if os.path.isfile(candidate_path):
+                        return other, candidate_path
+        return None
+
+    def _batchReady(self, options: dict[str, object]) -> bool:
+        ready = sum(len(files) == 2 for files in self._pending.values())
+        if not ready:
+            return False
+        return ready >= int(
+            options["pairs"]
+        ) or time.monotonic() - self._ready_at >= float(options["seconds"])
+
+    def _appendBatch(
+        self,
+        dataset_path: Path,
+        folder: Path,
+        classes: list[str] | None,
+    ) -> int:
+        # Los pares completos se enlazan (o copian si están en otro sistema
+        # de archivos) en una carpeta de lote con sus rutas relativas; los
+        # incompletos siguen esperando a su pareja.
+        batch_path = dataset_path / WATCH_DIRNAME
+        shutil.rmtree(batch_path, ignore_errors=True)
+
+        keys = [key for key, files in self._pending.items() if len(files) == 2]
+        for key in keys:
+            for path in self._pending.pop(key).values():
+                target = batch_path / os.path.relpath(path, folder)
+                target.parent.mkdir(parents=True, exist_ok=True)
+                try:
+                    os.link(path, target)
+                except FileNotFoundError:
+                    continue
+                except OSError:
+                    shutil.copy2(path, target)
+        self._ready_at = None
+
+        self._ui.stepInfo(f"Incorporando un lote de {len(keys)} pares")
+        result = self._append.run(dataset_path, batch_path, classes)
+        shutil.rmtree(batch_path, ignore_errors=True)
+        return int(result["new"]) + int(result["changed"])
+
+    def _catchUp(
+        self,
+        dataset_path: Path,
+        folder: Path,
+        classes: list[str] | None,
+    ) -> int:
+        result = self._append.run(dataset_path, folder, classes)
+        return int(result["new"]) + int(result["changed"])
+
+    def _finishRound(
+        self,
+        result: dict[str, object],
+        state: dict[str, object],
+        run_dir: Path,
+    ) -> Path | None:
+        state["rounds"].append(result)
+        with open(run_dir / WATCH_STATE_FILE, "w", encoding="utf-8") as f:
+            json.dump(state, f, indent=2)
+
+        if result.get("error"):
+            self._ui.stepWarning(
+                f"{result['name']} falló: {result['error']}\n"
+                + "  Se mantiene el modelo anterior para el próximo ajuste."
+            )
+            return None
+
+        self._ui.stepInfoBox(
+            result["name"],
+            f"{result['pairs']} pares | {result.get('epochs_trained', 0)} épocas"
+            + f" | fitness {result.get('fitness', 0.0):.4f} | {result['time_s']} s",
+        )
+        self._ui.stepSuccess(f"Modelo actualizado: {result['best_model_path']}")
+        return Path(result["best_model_path"])
+
+    def _loadState(self, run_dir: Path, dataset_path: Path) -> dict[str, object]:
+        path = run_dir / WATCH_STATE_FILE
+        if path.exists():
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        return {"dataset": str(dataset_path), "rounds": []}
+
+    def _lastModel(self, state: dict[str, object]) -> Path | None:
+        # Cada ajuste parte del 'best.pt' de la última ronda completada.
+        for result in reversed(state["rounds"]):
+            path = Path(result.get("best_model_path", ""))
+            if not result.get("error") and path.is_file():
+                return path
+        return None
+
+    def _resolveModel(self, model: str) -> Path:
+        if model in YOLO_MODEL_VERSIONS:
+            yolo_model = YOLO_MODEL_VERSIONS[model]
+            path = MODELS_BASE_DIR / yolo_model
+            if not path.exists():
+                path.parent.mkdir(parents=True, exist_ok=True)
+                if not self._downloader.runYOLO(YOLO_MODEL_URL + yolo_model, path):
+                    raise Exception(
+                        f"No se pudo descargar el modelo base '{yolo_model}'."
+                    )
+            return path
+
+        path = Path(model).expanduser()
+        if not path.exists() or path.suffix != ".pt":
+            raise Exception(f"El modelo '{model}' no existe o no es un modelo '.pt'.")
+        return path
@@ -10,21 +10,46 @@ Herramienta CLI para entrenamiento automatizado de modelos YOLO.
 
 import sys
 import shutil
+import argparse
+import importlib.util
 from pathlib import Path
 
-from core.constants import APP_NAME, APP_SUBTITLE
+from core.constants import (
+    APP_NAME,
+    APP_SUBTITLE,
+    PROFILE_TOOLS,
+    PROGRESS_MODES,
+    WATCH_BATCH_PAIRS,
+    WATCH_BATCH_SECONDS,
+    WATCH_EPOCHS,
+)
 from core import Dataset, Downloader, Validator
+from core.journal import Journal
+from core.session import Session
 from ui import BashUI
-from ui.seccions import SectionOne, SectionTwo, SectionThree
+from ui.seccions import SectionOne, SectionTwo, SectionThree, SectionFour
 
 
-def safeClean(context: dict[str, object]) -> None:
+def safeClean(context: dict[str, object]) -> str | None:
+    kept: str | None = None
+
     if context:
+        # Un entrenamiento con 'last.pt' se conserva junto a su dataset para
+        # poder reanudarlo con 'python main.py resume'.
+        trained_model_path: Path = context.get("trained_model_path", None)
+        if Session.isResumable(trained_model_path):
+            Session.save(context, trained_model_path, status="interrupted")
+            context.clear()
+            return "training"
+
+        # Un dataset con etapas registradas en su diario se conserva para
+        # reanudar el preprocesado al volver a usar el mismo origen.
         dataset_path: Path = context.get("dataset_path", None)
-        if dataset_path and isinstance(dataset_path, Path) and dataset_path.exists():
+        if Journal.isResumable(dataset_path):
+            kept = "dataset"
+        elif dataset_path and isinstance(dataset_path, Path) and dataset_path.exists():
             shutil.rmtree(str(dataset_path), ignore_errors=True)
 
-        trained_model_path: Path = context.get("trained_model_path", None)
         if (
             trained_model_path
             and isinstance(trained_model_path, Path)
@@ -34,9 +59,287 @@ def safeClean(context: dict[str, object]) -> None:
 
         context.clear()
 
+    return kept
 
-def main():
-    ui = BashUI()
+
+def notifyResumable(ui: BashUI, context: dict[str, object]) -> None:
+    run_dir: Path = context.get("trained_model_path", None)
+    dataset_path: Path = context.get("dataset_path", None)
+
+    kept = safeClean(context)
+    if kept == "training":
+        ui.stepWarning(
+            "El entrenamiento se ha conservado con su último punto de control.\n"
+            + f"  Para continuarlo ejecute: python main.py resume {run_dir.name}"
+        )
+    elif kept == "dataset":
+        ui.stepWarning(
+            f"El dataset parcialmente procesado se ha conservado en '{dataset_path}'.\n"
+            + "  Se reanudará automáticamente al usar de nuevo el mismo origen."
+        )
+
+
+def saveProfile(ui: BashUI, context: dict[str, object]) -> None:
+    dest_folder: Path = context.get("trained_model_path", None) or context.get(
+        "dataset_path", None
+    )
+    if dest_folder and Path(dest_folder).exists():
+        context["profile_path"] = ui.profiler.save(Path(dest_folder))
+
+
+def pipeline(ui: BashUI, context: dict[str, object]) -> None:
+    validator = Validator()
+    dataset = Dataset(ui)
+    downloader = Downloader(ui)
+
+    SectionOne(ui, validator, dataset, downloader).run(context)
+    SectionTwo(ui, validator, dataset).run(context)
+    SectionThree(ui, validator, dataset, downloader).run(context)
+    SectionFour(ui).run(context)
+
+    Journal(context["dataset_path"]).finish()
+    saveProfile(ui, context)
+    ui.footer(context)
+
+
+def parseArgs(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="main.py", description=APP_SUBTITLE)
+    parser.add_argument(
+        "--progress",
+        choices=PROGRESS_MODES,
+        default="auto",
+        help="Formato del progreso: rich, texto plano o eventos JSON.",
+    )
+    parser.add_argument(
+        "--refresh",
+        type=float,
+        default=None,
+        help="Actualizaciones de progreso por segundo.",
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        choices=PROFILE_TOOLS,
+        const="cprofile",
+        default=None,
+        help="Guarda perfiles de las etapas de preprocesado (cprofile o pyinstrument).",
+    )
+    subparsers = parser.add_subparsers(dest="command")
+
+    sweep_parser = subparsers.add_parser(
+        "sweep",
+        help="Barrido de hiperparámetros en paralelo con successive halving.",
+    )
+    sweep_parser.add_argument(
+        "spec",
+        type=Path,
+        help="Archivo YAML con el dataset y el espacio de búsqueda.",
+    )
+
+    resume_parser = subparsers.add_parser(
+        "resume",
+        help="Reanuda un entrenamiento interrumpido desde su último checkpoint.",
+    )
+    resume_parser.add_argument(
+        "run",
+        nargs="?",
+        default=None,
+        help="Nombre o ruta del entrenamiento (por defecto, el más reciente).",
+    )
+
+    append_parser = subparsers.add_parser(
+        "append",
+        help="Incorpora a un dataset procesado solo los pares nuevos o modificados.",
+    )
+    append_parser.add_argument(
+        "dataset",
+        help="Ruta o nombre del dataset en 'datasets/'.",
+    )
+    append_parser.add_argument(
+        "source",
+        help="Carpeta, archivo comprimido o enlace de Drive con la nueva entrega.",
+    )
+    append_parser.add_argument(
+        "--classes",
+        help="Clases de la entrega en el orden de sus ids (si difieren del dataset).",
+    )
+
+    watch_parser = subparsers.add_parser(
+        "watch",
+        help="Vigila una carpeta, incorpora sus pares por lotes y reentrena.",
+    )
+    watch_parser.add_argument(
+        "dataset",
+        help="Ruta o nombre del dataset en 'datasets/'.",
+    )
+    watch_parser.add_argument(
+        "folder",
+        help="Carpeta donde se depositan las nuevas imágenes y etiquetas.",
+    )
+    watch_parser.add_argument(
+        "--classes",
+        help="Clases de las etiquetas en el orden de sus ids (si difieren del dataset).",
+    )
+    watch_parser.add_argument(
+        "--model",
+        default="n",
+        help="Modelo del primer ajuste: versión YOLO o ruta '.pt'.",
+    )
+    watch_parser.add_argument(
+        "--pairs",
+        type=int,
+        default=WATCH_BATCH_PAIRS,
+        help="Pares que completan un lote.",
+    )
+    watch_parser.add_argument(
+        "--seconds",
+        type=float,
+        default=WATCH_BATCH_SECONDS,
+        help="Segundos máximos de espera de un lote incompleto.",
+    )
+    watch_parser.add_argument("--epochs", type=int, default=WATCH_EPOCHS)
+    watch_parser.add_argument("--batch", type=int, default=16)
+    watch_parser.add_argument("--imgsz", type=int, default=640)
+    watch_parser.add_argument("--device", help="auto, cpu, mps, cuda o IDs '0,1'.")
+    watch_parser.add_argument(
+        "--poll",
+        action="store_true",
+        help="Sondea la carpeta en lugar de usar inotify (p. ej. en carpetas de red).",
+    )
+
+    run_parser = subparsers.add_parser(
+        "run",
+        help="Ejecuta el pipeline completo sin preguntas (modo headless).",
+    )
+    run_parser.add_argument(
+        "job",
+        nargs="?",
+        type=Path,
+        default=None,
+        help="Trabajo en YAML o TOML (los flags tienen prioridad).",
+    )
+    run_parser.add_argument("--source", help="Carpeta, archivo o enlace de Drive.")
+    run_parser.add_argument("--classes", help="Clases separadas por coma.")
+    run_parser.add_argument("--split", type=float, help="Proporción de train.")
+    run_parser.add_argument("--model", help="Versión YOLO, ruta '.pt' o enlace.")
+    run_parser.add_argument("--epochs", type=int)
+    run_parser.add_argument("--batch", type=int)
+    run_parser.add_argument("--imgsz", type=int)
+    run_parser.add_argument("--device", help="auto, cpu, mps, cuda o IDs '0,1'.")
+
+    args = parser.parse_args(argv)
+    if args.profile == "pyinstrument" and not importlib.util.find_spec("pyinstrument"):
+        parser.error("pyinstrument no está instalado (pip install pyinstrument).")
+
+    return args
+
+
+def sweep(args: argparse.Namespace) -> None:
+    from core.sweep import Sweep
+
+    ui = BashUI(args.progress, args.refresh, args.profile)
+    downloader = Downloader(ui)
+
+    try:
+        ui.header(APP_NAME, "Barrido de Hiperparámetros")
+
+        spec = Sweep.loadSpec(args.spec)
+        Sweep(ui, downloader).run(spec)
+
+    except KeyboardInterrupt:
+        ui.console.print()
+        ui.stepError("Operación cancelada por el usuario.")
+        sys.exit(0)
+    except Exception as e:
+        ui.console.print()
+        ui.stepError(f"Error inesperado: {e}")
+        sys.exit(1)
+
+
+def append(args: argparse.Namespace) -> None:
+    from core.append import Append
+    from core.labels import sanitizeClassName
+
+    ui = BashUI(args.progress, args.refresh, args.profile)
+    dataset = Dataset(ui)
+
+    try:
+        ui.header(APP_NAME, "Actualización Incremental")
+
+        dataset_path = Append.locate(args.dataset)
+        classes = (
+            [sanitizeClassName(name) for name in args.classes.split(",")]
+            if args.classes
+            else None
+        )
+        Append(ui, Validator(), dataset, Downloader(ui)).run(
+            dataset_path, args.source, classes
+        )
+
+        ui.profileTable()
+
+    except KeyboardInterrupt:
+        ui.console.print()
+        ui.stepError("Operación cancelada por el usuario.")
+        ui.stepWarning(
+            "La entrega se volverá a comparar al repetir el comando;"
+            + " una incorporación ya confirmada se completa entonces."
+        )
+        sys.exit(0)
+    except Exception as e:
+        ui.console.print()
+        ui.stepError(f"Error inesperado: {e}")
+        sys.exit(1)
+
+
+def watch(args: argparse.Namespace) -> None:
+    from core.append import Append
+    from core.labels import sanitizeClassName
+    from core.watch import Watch
+
+    ui = BashUI(args.progress, args.refresh, args.profile)
+
+    try:
+        ui.header(APP_NAME, "Ajuste Fino Continuo")
+
+        dataset_path = Append.locate(args.dataset)
+        device = args.device.strip().lower() if args.device else None
+        if device in ("auto", "cuda"):
+            device = None
+        options = {
+            "classes": (
+                [sanitizeClassName(name) for name in args.classes.split(",")]
+                if args.classes
+                else None
+            ),
+            "model": args.model,
+            "pairs": max(1, args.pairs),
+            "seconds": max(0.0, args.seconds),
+            "epochs": args.epochs,
+            "batch": args.batch,
+            "imgsz": args.imgsz,
+            "device": device,
+            "poll": args.poll,
+        }
+        Watch(ui, Validator(), Dataset(ui), Downloader(ui)).run(
+            dataset_path, args.folder, options
+        )
+
+    except KeyboardInterrupt:
+        ui.console.print()
+        ui.stepWarning(
+            "Vigilancia detenida. Los pares aún no incorporados se compararán"
+            + " al volver a iniciarla."
+        )
+        sys.exit(0)
+    except Exception as e:
+        ui.console.print()
+        ui.stepError(f"Error inesperado: {e}")
+        sys.exit(1)
+
+
+def resume(args: argparse.Namespace) -> None:
+    ui = BashUI(args.progress, args.refresh, args.profile)
     validator = Validator()
     dataset = Dataset(ui)
     downloader = Downloader(ui)
@@ -44,23 +347,108 @@ def main():
     context: dict[str, object] = {}
 
     try:
-        ui.header(APP_NAME, APP_SUBTITLE)
+        ui.header(APP_NAME, "Reanudar Entrenamiento")
+
+        run_dir = Session.find(args.run)
+        context = Session.load(run_dir)
+        context["trained_model_path"] = run_dir
 
-        SectionOne(ui, validator, dataset, downloader).run(context)
-        SectionTwo(ui, validator, dataset).run(context)
-        SectionThree(ui, validator, dataset, downloader).run(context)
+        SectionThree(ui, validator, dataset, downloader).resume(context)
+        SectionFour(ui).run(context)
 
+        saveProfile(ui, context)
         ui.footer(context)
 
     except KeyboardInterrupt:
         ui.console.print()
         ui.stepError("Operación cancelada por el usuario.")
-        safeClean(context)
+        notifyResumable(ui, context)
+        sys.exit(0)
+    except Exception as e:
+        ui.console.print()
+        ui.stepError(f"Error inesperado: {e}")
+        notifyResumable(ui, context)
+        sys.exit(1)
+
+
+def headless(args: argparse.Namespace) -> None:
+    from core.job import Job
+    from ui.headless import HeadlessUI
+
+    overrides = {
+        "source": args.source,
+        "classes": args.classes,
+        "split": args.split,
+        "model": args.model,
+        "epochs": args.epochs,
+        "batch": args.batch,
+        "imgsz": args.imgsz,
+        "device": args.device,
+    }
+
+    # En modo headless el progreso por defecto son eventos JSON.
+    progress = "json" if args.progress == "auto" else args.progress
+
+    try:
+        spec = Job.load(args.job, overrides)
+        ui = HeadlessUI(Job.answers(spec), progress, args.refresh, args.profile)
+    except Exception as e:
+        HeadlessUI({}, progress, args.refresh).emit(
+            "error", message=f"Trabajo inválido: {e}", code=2
+        )
+        sys.exit(2)
+
+    context: dict[str, object] = {}
+
+    try:
+        ui.header(APP_NAME, APP_SUBTITLE)
+        pipeline(ui, context)
+        ui.emit("done", code=0)
+        sys.exit(0)
+
+    except KeyboardInterrupt:
+        ui.stepError("Operación cancelada por el usuario.")
+        notifyResumable(ui, context)
+        ui.emit("done", code=130)
+        sys.exit(130)
+    except Exception as e:
+        ui.stepError(f"Error inesperado: {e}")
+        notifyResumable(ui, context)
+        ui.emit("done", code=1)
+        sys.exit(1)
+
+
+def main():
+    args = parseArgs(sys.argv[1:])
+
+    if args.command == "sweep":
+        return sweep(args)
+    elif args.command == "resume":
+        return resume(args)
+    elif args.command == "append":
+        return append(args)
+    elif args.command == "watch":
+        return watch(args)
+    elif args.command == "run":
+        return headless(args)
+
+    ui = BashUI(args.progress, args.refresh, args.profile)
+
+    context: dict[str, object] = {}
+
+    try:
+        ui.header(APP_NAME, APP_SUBTITLE)
+        pipeline(ui, context)
+
+    except KeyboardInterrupt:
+        ui.console.print()
+        ui.stepError("Operación cancelada por el usuario.")
+        notifyResumable(ui, context)
         sys.exit(0)
     except Exception as e:
         ui.console.print()
         ui.stepError(f"Error inesperado: {e}")
-        safeClean(context)
+        notifyResumable(ui, context)
         sys.exit(1)
 
 
@@ -0,0 +1,88 @@
+import os
+import shutil
+from pathlib import Path
+
+import pytest
+
+from core import Dataset, Downloader, Validator
+from core.append import Append
+from core.journal import Journal
+from ui import BashUI
+
+
+def writePair(folder: Path, stem: str, cls: int = 0, color: int = 0) -> None:
+    from PIL import Image
+
+    folder.mkdir(parents=True, exist_ok=True)
+    Image.new("RGB", (32, 32), (color, 10, 10)).save(folder / f"{stem}.jpg")
+    (folder / f"{stem}.txt").write_text(f"{cls} 0.5 0.5 0.2 0.2\n")
+
+
+def process(
+    dataset: Dataset,
+    source: Path,
+    dataset_path: Path,
+    classes: list[str],
+    fingerprint: bool = True,
+) -> Path:
+    # Mismo recorrido que el asistente: copia, normalización, integridad,
+    # split y data.yaml.
+    dataset_path.mkdir(parents=True)
+    dataset.copy(source, dataset_path, True)
+    journal = Journal(dataset_path)
+    journal.start(str(source))
+    journal.complete("ingest", classes=classes)
+
+    images_dir, labels_dir = dataset_path / "images", dataset_path / "labels"
+    dataset.normalize(dataset_path, images_dir, labels_dir)
+    pairs, _ = dataset.integrity(
+        dataset_path, images_dir, labels_dir, fingerprint=fingerprint
+    )
+    dataset.split(pairs, dataset_path, images_dir, labels_dir)
+    dataset.generateYAML(dataset_path)
+    Journal(dataset_path).finish()
+    return dataset_path
+
+
+def splitOf(dataset_path: Path, stem: str) -> str | None:
+    for split in ("train", "val"):
+        if (dataset_path / split / "labels" / f"{stem}.txt").exists():
+            return split
+    return None
+
+
+@pytest.fixture
+def ui():
+    ui = BashUI(progress="plain")
+    ui.console.file = open(os.devnull, "w")
+    yield ui
+    ui.console.file.close()
+
+
+@pytest.fixture
+def dataset(ui):
+    return Dataset(ui)
+
+
+@pytest.fixture
+def append(ui, dataset):
+    return Append(ui, Validator(), dataset, Downloader(ui))
+
+
+@pytest.fixture
+def source(tmp_path):
+    # Dos cámaras con los mismos nombres (colisión de stems) y una carpeta
+    # sin colisiones.
+    source = tmp_path / "source"
+    for cam, cls in (("cam1", 0), ("cam2", 1)):
+        for i in range(6):
+            writePair(source / cam, f"{i:04d}", cls, color=40 * cls + i)
+    for i in range(8):
+        writePair(source / "extra", f"img{i}", 0, color=100 + i)
+    yield source
+    shutil.rmtree(source, ignore_errors=True)
+
+
+@pytest.fixture
+def processed(tmp_path, dataset, source):
+    return process(dataset, source, tmp_path / "dataset", ["a", "b"])
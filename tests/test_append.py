@@ -0,0 +1,102 @@
+import os
+
+import pytest
+
+from core.journal import Journal
+from tests.conftest import process, splitOf, writePair
+
+
+def counts(result: dict[str, object]) -> tuple[int, int, int]:
+    return result["new"], result["changed"], result["incomplete"]
+
+
+def test_same_delivery_is_unchanged(append, processed, source):
+    result = append.run(processed, source)
+
+    assert counts(result) == (0, 0, 0)
+    assert result["unchanged"] == 20
+
+
+def test_copy_without_mtimes_is_unchanged(append, processed, source):
+    # Una descarga o copia que no conserva las fechas no cuenta como cambio.
+    for path in source.rglob("*"):
+        if path.is_file():
+            os.utime(path, (1, 1))
+
+    assert counts(append.run(processed, source)) == (0, 0, 0)
+
+
+def test_stat_manifest_counts_new_mtimes_as_changed(append, dataset, source, tmp_path):
+    # Sin huellas de contenido la integridad no lee los archivos: solo el
+    # tamaño y la fecha deciden, y el hash se guarda al incorporar.
+    processed = process(dataset, source, tmp_path / "stat", ["a", "b"], False)
+    assert counts(append.run(processed, source)) == (0, 0, 0)
+
+    os.utime(source / "extra" / "img0.jpg", (1, 1))
+    assert counts(append.run(processed, source)) == (0, 1, 0)
+    assert counts(append.run(processed, source)) == (0, 0, 0)
+
+
+def test_colliding_stems_match_their_source_folder(append, processed, source):
+    (source / "cam1" / "0002.txt").write_text("1 0.4 0.4 0.1 0.1\n")
+    split = splitOf(processed, "cam1_0002")
+
+    result = append.run(processed, source)
+
+    assert counts(result) == (0, 1, 0)
+    assert splitOf(processed, "cam1_0002") == split
+    label = processed / split / "labels" / "cam1_0002.txt"
+    assert label.read_text() == "1 0.4 0.4 0.1 0.1\n"
+    assert (processed / splitOf(processed, "cam2_0002") / "labels").exists()
+
+
+def test_new_pairs_are_split_and_recorded(append, processed, source):
+    for i in range(5):
+        writePair(source / "week2", f"new{i}", 1, color=200 + i)
+    writePair(source / "cam3", "0001", 0, color=250)
+    (source / "week2" / "new0.txt").unlink()
+
+    result = append.run(processed, source)
+
+    assert counts(result) == (5, 0, 1)
+    assert splitOf(processed, "cam3_0001")
+    assert splitOf(processed, "new0") is None
+    split = Journal(processed).result("split")
+    assert split["train"] + split["val"] == 25
+
+    # Lo incorporado queda en el manifiesto; el par incompleto no.
+    assert counts(append.run(processed, source)) == (0, 0, 1)
+    writePair(source / "week2", "new0", 1, color=200)
+    assert counts(append.run(processed, source)) == (1, 0, 0)
+
+
+def test_append_leaves_no_staging(append, processed, source):
+    writePair(source / "week2", "new0", 1)
+    append.run(processed, source)
+
+    assert sorted(os.listdir(processed)) == [".journal", "data.yaml", "train", "val"]
+    assert not Journal(processed).isCommitted("append")
+
+
+def test_stale_labels_cache_is_dropped(append, dataset, processed, source):
+    pytest.importorskip("ultralytics")
+    pytest.importorskip("cv2")
+    from core.trainer import Trainer
+
+    data_yaml = str(processed / "data.yaml")
+    Trainer.prepareCaches(data_yaml)
+    assert Trainer.checkCaches(data_yaml) == {"train", "val"}
+
+    # Una caché generada sobre un subconjunto no corresponde al split
+    # completo: se borra en lugar de parchearse.
+    cache_path = processed / "train" / "labels.cache"
+    subset = dataset.subset(processed, 20)
+    Trainer.prepareCaches(str(subset["yaml_path"]))
+    assert cache_path.exists()
+    os.replace(processed / "subset" / "train" / "labels.cache", cache_path)
+
+    writePair(source / "week2", "new0", 1)
+    append.run(processed, source)
+
+    assert not cache_path.exists()
+    assert (processed / "val" / "labels.cache").exists()
@@ -0,0 +1,71 @@
+import json
+
+from core.convert import COCOReader
+
+
+def writeCOCO(path, images, annotations) -> str:
+    # Las anotaciones van antes que las imágenes, como en algunos exportadores.
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "annotations": annotations,
+                "images": images,
+                "categories": [{"id": 1, "name": "persona"}],
+            },
+            f,
+        )
+    return str(path)
+
+
+def annotation(image_id: int, x: float) -> dict[str, object]:
+    return {"image_id": image_id, "category_id": 1, "bbox": [x, 0, 1, 1]}
+
+
+def test_image_ids_restart_per_file(tmp_path):
+    train = writeCOCO(
+        tmp_path / "instances_train.json",
+        [{"id": 1, "file_name": "train1.jpg"}, {"id": 2, "file_name": "train2.jpg"}],
+        [annotation(1, 10), annotation(2, 20)],
+    )
+    val = writeCOCO(
+        tmp_path / "instances_val.json",
+        [{"id": 1, "file_name": "val1.jpg"}],
+        [annotation(1, 30), annotation(2, 40)],
+    )
+
+    reader = COCOReader()
+    reader.read(train)
+    reader.read(val)
+    image_index, _, boxes = reader.annotations()
+
+    files = [reader.files[i] for i in image_index.tolist()]
+    assert sorted(zip(files, boxes[:, 0].tolist())) == [
+        ("train1.jpg", 10.0),
+        ("train2.jpg", 20.0),
+        ("val1.jpg", 30.0),
+    ]
+    # La anotación de val con el id 2 de train no se resuelve, pero se cuenta.
+    assert reader.unmatched == 1
+
+
+def test_pending_flush_does_not_cross_files(tmp_path):
+    # Más anotaciones pendientes que el umbral de resolución parcial.
+    train = writeCOCO(
+        tmp_path / "instances_train.json",
+        [{"id": 1, "file_name": "train1.jpg"}],
+        [annotation(1, 1)],
+    )
+    val = writeCOCO(
+        tmp_path / "instances_val.json",
+        [{"id": 1, "file_name": "val1.jpg"}],
+        [annotation(1, 2) for _ in range(70000)],
+    )
+
+    reader = COCOReader()
+    reader.read(train)
+    reader.read(val)
+    image_index, _, _ = reader.annotations()
+
+    assert (image_index == 0).sum() == 1
+    assert (image_index == 1).sum() == 70000
+    assert reader.unmatched == 0
@@ -0,0 +1,52 @@
+import pytest
+
+from core.journal import Journal
+
+
+@pytest.fixture
+def moves(tmp_path):
+    (tmp_path / "a").mkdir()
+    for name in ("x.txt", "y.txt", "z.txt"):
+        (tmp_path / "a" / name).write_text(name)
+    journal = Journal(tmp_path)
+    plan = journal.plan("stage")
+    plan.append(str(tmp_path / "a" / "x.txt"), str(tmp_path / "b" / "x.txt"))
+    plan.append(str(tmp_path / "a" / "y.txt"), str(tmp_path / "b" / "y.txt"))
+    plan.append(str(tmp_path / "a" / "z.txt"), "")
+    journal.commit("stage", plan, {"moved": 2}, dirs=[tmp_path / "b"])
+    return tmp_path
+
+
+def test_apply_is_idempotent(moves):
+    # Un plan interrumpido a medias se reproduce completo.
+    (moves / "b").mkdir()
+    (moves / "a" / "x.txt").rename(moves / "b" / "x.txt")
+
+    result = Journal(moves).apply("stage")
+
+    assert result == {"moved": 2}
+    assert sorted(p.name for p in (moves / "b").iterdir()) == ["x.txt", "y.txt"]
+    assert list((moves / "a").iterdir()) == []
+    assert Journal(moves).isDone("stage")
+    assert not Journal(moves).isCommitted("stage")
+
+
+def test_apply_fails_on_missing_source(moves):
+    (moves / "a" / "y.txt").unlink()
+
+    with pytest.raises(Exception, match="y.txt"):
+        Journal(moves).apply("stage")
+
+
+def test_rollback_restores_moves(moves):
+    (moves / "b").mkdir()
+    (moves / "a" / "x.txt").rename(moves / "b" / "x.txt")
+
+    Journal(moves).rollback("stage")
+
+    assert sorted(p.name for p in (moves / "a").iterdir()) == [
+        "x.txt",
+        "y.txt",
+        "z.txt",
+    ]
+    assert not Journal(moves).isCommitted("stage")
@@ -0,0 +1,44 @@
+import threading
+
+from core.profiler import Profiler
+
+
+def test_threads_account_to_their_own_stages():
+    profiler = Profiler()
+    started = threading.Barrier(2)
+
+    def fetch(name: str, amount: int, parent) -> None:
+        with profiler.stage(name, parent=parent):
+            # Ambas etapas abiertas a la vez.
+            started.wait()
+            with profiler.stage(f"{name} copia"):
+                profiler.account("items", amount)
+            started.wait()
+
+    with profiler.stage("Sección"):
+        parent = profiler.current()
+        threads = [
+            threading.Thread(target=fetch, args=(f"fuente_{i}", i, parent))
+            for i in (1, 2)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        with profiler.stage("Remapeo"):
+            profiler.account("items", 10)
+
+    records = {
+        record["stage"]: (record["depth"], record["files"])
+        for record in profiler.records()
+    }
+    assert records == {
+        "Sección": (0, 13),
+        "fuente_1": (1, 1),
+        "fuente_1 copia": (2, 1),
+        "fuente_2": (1, 2),
+        "fuente_2 copia": (2, 2),
+        "Remapeo": (1, 10),
+    }
+    order = [record["stage"] for record in profiler.records()]
+    assert order.index("fuente_1 copia") == order.index("fuente_1") + 1
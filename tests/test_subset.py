@@ -0,0 +1,13 @@
+import yaml
+
+
+def test_subset_has_its_own_tree(dataset, processed):
+    result = dataset.subset(processed, 20)
+
+    with open(result["yaml_path"]) as f:
+        data = yaml.safe_load(f)
+    assert data["train"] == "subset/train/images"
+    images = list((processed / "subset" / "train" / "images").iterdir())
+    labels = list((processed / "subset" / "train" / "labels").iterdir())
+    assert len(images) == len(labels) == result["train"]
+    assert not (processed / "subset" / "train.txt").exists()
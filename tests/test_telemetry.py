@@ -0,0 +1,53 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("ultralytics")
+pytest.importorskip("cv2")
+
+from core.telemetry import Telemetry
+
+
+class FakeTrainer:
+    # Lo mínimo de un entrenador de Ultralytics que usa la telemetría.
+    def __init__(self, save_dir) -> None:
+        self.save_dir = save_dir
+        self.device = SimpleNamespace(type="cpu")
+        self.batch_size = 4
+        self.epoch = 0
+        self.epochs = 1
+        self.train_loader = [None] * 3
+        self.callbacks: dict[str, list] = {}
+
+    def addCallback(self, event: str, callback) -> None:
+        self.callbacks.setdefault(event, []).append(callback)
+
+    def run(self, event: str) -> None:
+        for callback in self.callbacks.get(event, []):
+            callback(self)
+
+    def preprocess_batch(self, batch):
+        return batch
+
+
+def test_partial_batch_and_file_closed_on_error(tmp_path):
+    trainer = FakeTrainer(tmp_path)
+    with pytest.raises(RuntimeError):
+        with Telemetry() as telemetry:
+            telemetry.register(trainer)
+            trainer.run("on_train_start")
+            trainer.run("on_train_epoch_start")
+            for size in (4, 4, 2):
+                trainer.run("on_train_batch_start")
+                trainer.preprocess_batch({"img": [None] * size})
+                trainer.run("on_train_batch_end")
+            trainer.run("on_train_epoch_end")
+            trainer.run("on_fit_epoch_end")
+            raise RuntimeError("interrumpido")
+
+    assert telemetry._file is None
+    records = [json.loads(line) for line in telemetry.path.read_text().splitlines()]
+    assert len([r for r in records if r["type"] == "batch"]) == 3
+    assert records[-1]["images"] == 10
@@ -0,0 +1,50 @@
+import pytest
+
+from tests.conftest import writePair
+
+
+def test_tile_name_collision_is_detected(dataset, tmp_path):
+    from PIL import Image
+
+    dataset_path = tmp_path / "dataset"
+    images_dir, labels_dir = dataset_path / "images", dataset_path / "labels"
+    writePair(images_dir, "a_0_0")
+    Image.new("RGB", (64, 64)).save(images_dir / "a.jpg")
+    labels_dir.mkdir()
+    (labels_dir / "a.txt").write_text("0 0.25 0.25 0.2 0.2\n")
+    (images_dir / "a_0_0.txt").rename(labels_dir / "a_0_0.txt")
+    pairs = [("a", "a.jpg", "a.txt"), ("a_0_0", "a_0_0.jpg", "a_0_0.txt")]
+
+    # La primera tesela de 'a' se llamaría como el par 'a_0_0'.
+    with pytest.raises(Exception, match="a_0_0"):
+        dataset.tile(dataset_path, pairs, images_dir, labels_dir, 32, empty_keep=1.0)
+
+    assert sorted(p.name for p in images_dir.iterdir()) == ["a.jpg", "a_0_0.jpg"]
+    assert (labels_dir / "a_0_0.txt").read_text() == "0 0.5 0.5 0.2 0.2\n"
+    assert not (dataset_path / "tiles.tmp").exists()
+
+
+def test_tile_like_stems_without_collision_are_tiled(dataset, tmp_path):
+    from PIL import Image
+
+    dataset_path = tmp_path / "dataset"
+    images_dir, labels_dir = dataset_path / "images", dataset_path / "labels"
+    writePair(images_dir, "b_0_0")
+    labels_dir.mkdir()
+    (images_dir / "b_0_0.txt").rename(labels_dir / "b_0_0.txt")
+    Image.new("RGB", (64, 64)).save(images_dir / "a.jpg")
+    (labels_dir / "a.txt").write_text("0 0.25 0.25 0.2 0.2\n")
+    pairs = [("a", "a.jpg", "a.txt"), ("b_0_0", "b_0_0.jpg", "b_0_0.txt")]
+
+    tiled, stats = dataset.tile(
+        dataset_path, pairs, images_dir, labels_dir, 32, overlap=0.0, empty_keep=1.0
+    )
+
+    assert stats["tiles"] == 4
+    assert sorted(row[0] for row in tiled) == [
+        "a_0_0",
+        "a_0_32",
+        "a_32_0",
+        "a_32_32",
+        "b_0_0",
+    ]
@@ -0,0 +1,200 @@
+import os
+import sys
+import json
+import time
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from core import Validator, Downloader
+from core import watch
+from core.journal import Journal
+from core.watch import Inotify, Poller, Watch, createWatcher
+from tests.conftest import splitOf, writePair
+
+
+@pytest.fixture
+def folder(tmp_path):
+    folder = tmp_path / "drop"
+    folder.mkdir()
+    return folder
+
+
+@pytest.fixture
+def watcher(ui, dataset):
+    return Watch(ui, Validator(), dataset, Downloader(ui))
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify")
+def test_inotify_reports_finished_files_and_new_folders(folder):
+    notify = createWatcher(folder)
+    assert isinstance(notify, Inotify)
+    try:
+        writePair(folder, "a")
+        writePair(folder / "sub", "b")
+        (folder / "skip.tmp").write_text("x")
+        (folder / "sub" / "c.txt").write_text("0 0.5 0.5 0.1 0.1\n")
+
+        paths = []
+        deadline = time.monotonic() + 5
+        while len(paths) < 5 and time.monotonic() < deadline:
+            paths += notify.read(0.2)
+    finally:
+        notify.close()
+
+    names = {os.path.relpath(path, folder) for path in paths}
+    assert {"a.jpg", "a.txt", "sub/b.jpg", "sub/b.txt", "sub/c.txt"} <= names
+
+
+def test_poller_waits_until_files_settle(folder):
+    writePair(folder, "old")
+    poller = Poller(folder)
+
+    (folder / "a.txt").write_text("0")
+    assert poller.read(0) == []
+    assert poller.read(0) == [str(folder / "a.txt")]
+    assert poller.read(0) == []
+
+    (folder / "a.txt").write_text("0 0.5 0.5 0.1 0.1\n")
+    assert poller.read(0) == []
+    assert poller.read(0) == [str(folder / "a.txt")]
+
+
+def test_pairs_complete_with_partner_already_in_folder(watcher, folder):
+    writePair(folder / "images", "x")
+    (folder / "labels").mkdir()
+    (folder / "labels" / "x.txt").write_text("0 0.5 0.5 0.1 0.1\n")
+    (folder / "y.txt").write_text("0 0.5 0.5 0.1 0.1\n")
+
+    # Solo cambia la etiqueta de 'x': su imagen se toma de 'images/'.
+    watcher._collect([str(folder / "labels" / "x.txt"), str(folder / "y.txt")])
+
+    assert watcher._pending[(str(folder / "images|labels"), "x")] == {
+        "labels": str(folder / "labels" / "x.txt"),
+        "images": str(folder / "images" / "x.jpg"),
+    }
+    assert watcher._pending[(str(folder), "y")] == {"labels": str(folder / "y.txt")}
+
+
+def test_colliding_stems_pair_within_their_folder(watcher, processed, folder):
+    # Mismo nombre en dos cámaras: cada archivo se empareja en su carpeta.
+    writePair(folder / "cam3", "0001", 0, color=210)
+    writePair(folder / "cam4" / "images", "0001", 1, color=220)
+    (folder / "cam4" / "labels").mkdir()
+    os.replace(
+        folder / "cam4" / "images" / "0001.txt",
+        folder / "cam4" / "labels" / "0001.txt",
+    )
+    watcher._collect([str(folder / "cam3" / "0001.jpg")])
+    watcher._collect([str(folder / "cam4" / "images" / "0001.jpg")])
+    watcher._collect([str(folder / "cam3" / "0001.txt")])
+
+    assert watcher._pending == {
+        (str(folder / "cam3"), "0001"): {
+            "images": str(folder / "cam3" / "0001.jpg"),
+            "labels": str(folder / "cam3" / "0001.txt"),
+        },
+        (str(folder / "cam4" / "images|labels"), "0001"): {
+            "images": str(folder / "cam4" / "images" / "0001.jpg"),
+            "labels": str(folder / "cam4" / "labels" / "0001.txt"),
+        },
+    }
+
+    assert watcher._appendBatch(processed, folder, None) == 2
+    assert watcher._pending == {}
+    for stem, label in (("cam3_0001", "0"), ("cam4_0001", "1")):
+        path = processed / splitOf(processed, stem) / "labels" / f"{stem}.txt"
+        assert path.read_text().startswith(label)
+
+
+def test_batch_ready_by_count_or_time(watcher, folder):
+    options = {"pairs": 2, "seconds": 60}
+    writePair(folder, "a")
+    watcher._collect([str(folder / "a.jpg")])
+    assert not watcher._batchReady(options)
+
+    watcher._ready_at -= 61
+    assert watcher._batchReady(options)
+
+    watcher._ready_at += 61
+    writePair(folder, "b")
+    watcher._collect([str(folder / "b.txt")])
+    assert watcher._batchReady(options)
+
+
+def test_batches_coalesce_while_training(
+    monkeypatch, tmp_path, watcher, processed, folder
+):
+    rounds = []
+
+    def fineTune(model_path, data_yaml, project_dir, run_name, pairs, options):
+        rounds.append((run_name, pairs, model_path))
+        # Mientras dura el ajuste llegan dos lotes más.
+        if len(rounds) == 1:
+            for i in range(3):
+                writePair(folder, f"late{i}", 1, color=150 + i)
+            writePair(folder / "later", "late3", 1, color=160)
+            time.sleep(0.5)
+        best = tmp_path / "trained" / run_name / "best.pt"
+        best.parent.mkdir(parents=True)
+        best.write_text(run_name)
+        return {
+            "name": run_name,
+            "pairs": pairs,
+            "fitness": 0.5,
+            "time_s": 0.0,
+            "best_model_path": str(best),
+        }
+
+    polls = {"count": 0}
+    read = Poller.read
+
+    def stopAfter(self, timeout):
+        polls["count"] += 1
+        if polls["count"] > 40:
+            raise KeyboardInterrupt
+        return read(self, 0.05)
+
+    base = tmp_path / "base.pt"
+    base.write_text("base")
+    monkeypatch.setattr(watch, "_fineTune", fineTune)
+    monkeypatch.setattr(watch, "MODELS_TRAINED_DIR", tmp_path / "trained")
+    monkeypatch.setattr(
+        watch,
+        "ProcessPoolExecutor",
+        lambda max_workers, mp_context: ThreadPoolExecutor(max_workers),
+    )
+    monkeypatch.setattr(Poller, "read", stopAfter)
+
+    writePair(folder, "first", 0, color=140)
+    options = {
+        "classes": None,
+        "model": str(base),
+        "pairs": 1,
+        "seconds": 600,
+        "epochs": 1,
+        "batch": 2,
+        "imgsz": 64,
+        "device": None,
+        "poll": True,
+    }
+    with pytest.raises(KeyboardInterrupt):
+        watcher.run(processed, folder, options)
+
+    # Un ajuste por vez: los cuatro pares que llegaron durante el primero se
+    # incorporan juntos, y cada ronda parte del modelo de la anterior.
+    assert [(name, pairs) for name, pairs, _ in rounds] == [
+        ("round_001", 1),
+        ("round_002", 4),
+    ]
+    assert rounds[0][2] == str(base)
+    assert rounds[1][2].endswith(os.path.join("round_001", "best.pt"))
+    assert all(splitOf(processed, f"late{i}") for i in range(4))
+    assert not (processed / "watch.tmp").exists()
+
+    state_path = tmp_path / "trained" / f"watch_{processed.name}" / "watch.json"
+    with open(state_path) as f:
+        assert [r["name"] for r in json.load(f)["rounds"]] == ["round_001", "round_002"]
+    split = Journal(processed).result("split")
+    assert split["train"] + split["val"] == 25
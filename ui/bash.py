@@ -1,3 +1,6 @@
+import sys
+import json
+import time
 from pathlib import Path
 
 from rich import box
@@ -5,9 +8,23 @@ from rich.panel import Panel
 from rich.table import Table
 from rich.theme import Theme
 from rich.prompt import Prompt
+from rich.live import Live
 from rich.console import Console
 
-from core.constants import CONSOLE_WIDTH
+from core.constants import (
+    CONSOLE_WIDTH,
+    PROGRESS_JSON_REFRESH,
+    PROGRESS_PLAIN_REFRESH,
+    PROGRESS_RICH_REFRESH,
+)
+from core.profiler import Profiler, StageRecord
+from ui.progress import (
+    JsonProgressBackend,
+    PlainProgressBackend,
+    ProgressBackend,
+    ProgressTask,
+    RichProgressBackend,
+)
 
 theme = Theme(
     {
@@ -23,9 +40,64 @@ theme = Theme(
 
 
 class BashUI:
-    def __init__(self) -> None:
-        self.console = Console(width=CONSOLE_WIDTH, theme=theme, force_terminal=True)
+    def __init__(
+        self,
+        progress: str = "auto",
+        refresh_per_second: float | None = None,
+        profile: str | None = None,
+    ) -> None:
+        self.console = Console(width=CONSOLE_WIDTH, theme=theme)
         self.width = CONSOLE_WIDTH
+        self.profiler = Profiler(profile)
+
+        self._live: Live | None = None
+        self._progress: ProgressBackend = self._progressBackend(
+            progress, refresh_per_second
+        )
+
+    def progress(
+        self,
+        description: str,
+        total: int | None = None,
+        unit: str | None = "items",
+    ) -> ProgressTask:
+        return ProgressTask(
+            self._progress, description, total, unit, self.profiler.account
+        )
+
+    def stage(
+        self,
+        name: str,
+        profile: bool = False,
+        parent: StageRecord | None = None,
+    ):
+        return self.profiler.stage(name, profile=profile, parent=parent)
+
+    def emit(self, event: str, **data: object) -> None:
+        record = {"event": event, "time": round(time.time(), 3), **data}
+        sys.stdout.write(json.dumps(record, default=str, ensure_ascii=False) + "\n")
+        sys.stdout.flush()
+
+    def _progressBackend(
+        self,
+        mode: str,
+        refresh_per_second: float | None,
+    ) -> ProgressBackend:
+        if mode == "auto":
+            mode = "rich" if self.console.is_terminal else "plain"
+
+        if mode == "rich":
+            return RichProgressBackend(
+                self.console, refresh_per_second or PROGRESS_RICH_REFRESH
+            )
+        elif mode == "json":
+            return JsonProgressBackend(
+                self.emit, 1.0 / (refresh_per_second or PROGRESS_JSON_REFRESH)
+            )
+        else:
+            return PlainProgressBackend(
+                self.console, 1.0 / (refresh_per_second or PROGRESS_PLAIN_REFRESH)
+            )
 
     def clear(self) -> None:
         self.console.clear()
@@ -94,12 +166,56 @@ class BashUI:
                 "Configuración",
                 f"Epochs: {context.get('epochs', 0)} | Batch: {context.get('batch', 0)} | Imgsz: {context.get('imgsz', 0)}",
             ),
+        ]
+
+        if "images_per_s" in context:
+            rows.append(
+                (
+                    "Rendimiento",
+                    f"Workers: {context.get('workers', 0)} | Cache: {context.get('cache', False)}"
+                    + f" | Hilos: {context.get('threads', 0)} | {context.get('images_per_s', 0)} img/s",
+                )
+            )
+
+        if "telemetry" in context:
+            telemetry: dict[str, object] = context.get("telemetry", {})
+            rows.append(
+                (
+                    "Telemetría",
+                    f"{telemetry.get('images_per_s', 0)} img/s"
+                    + f" | Espera datos: {float(telemetry.get('data_ratio', 0.0)):.0%}"
+                    + f" | RSS máx.: {telemetry.get('peak_rss_mb', 0)} MB",
+                )
+            )
+
+        rows += [
             (
                 "Modelo Entrenado",
                 f"{Path(*Path(context.get('best_model_path', 'N/A')).parts[-3:]).as_posix()}",
             ),
         ]
 
+        if "profile_path" in context:
+            rows.append(
+                (
+                    "Perfil por Etapas",
+                    f"{Path(*Path(context.get('profile_path')).parts[-3:]).as_posix()}",
+                )
+            )
+
+        if "fastest_format" in context:
+            rows.append(("Formato más rápido", f"{context.get('fastest_format')}"))
+
+        if "quantization" in context:
+            quantization: dict[str, object] = context.get("quantization", {})
+            rows.append(
+                (
+                    "INT8",
+                    f"x{quantization.get('speedup', 0)} más rápido"
+                    + f" | Δ mAP: {quantization.get('map_delta', 0.0):+.4f}",
+                )
+            )
+
         grid = Table.grid(expand=True)
         grid.add_column()
 
@@ -119,6 +235,113 @@ class BashUI:
         )
         self.console.print()
 
+        self.profileTable()
+
+    def profileTable(self) -> None:
+        records = self.profiler.records()
+        if not records:
+            return
+
+        rows = [
+            [
+                "  " * record["depth"] + record["stage"],
+                f"{record['wall_s']:.2f}",
+                f"{record['cpu_s']:.2f}",
+                f"{record['bytes'] / (1024 * 1024):.1f}",
+                record["files"],
+                record["peak_rss_mb"],
+            ]
+            for record in records
+        ]
+        self.table(
+            "TIEMPOS POR ETAPA",
+            ["Etapa", "Real (s)", "CPU (s)", "MB", "Archivos", "RSS máx. (MB)"],
+            rows,
+        )
+
+    def table(
+        self,
+        title: str,
+        columns: list[str],
+        rows: list[list[object]],
+    ) -> None:
+        table = Table(
+            title=title,
+            box=box.ROUNDED,
+            style="info",
+            header_style="step",
+            width=self.width,
+        )
+        for column in columns:
+            table.add_column(
+                column, justify="right" if column != columns[0] else "left"
+            )
+
+        for row in rows:
+            table.add_row(*[str(value) for value in row])
+
+        self.console.print()
+        self.console.print(table)
+        self.console.print()
+
+    def liveTelemetry(self) -> Live:
+        self._live = Live(
+            self._telemetryPanel({}),
+            console=self.console,
+            refresh_per_second=2,
+            transient=False,
+            redirect_stdout=True,
+            redirect_stderr=True,
+        )
+        return self._live
+
+    def updateTelemetry(self, snapshot: dict[str, object]) -> None:
+        if self._live:
+            self._live.update(self._telemetryPanel(snapshot))
+
+    def _telemetryPanel(self, snapshot: dict[str, object]) -> Panel:
+        last_epoch: dict[str, object] = snapshot.get("last_epoch") or {}
+        data_ratio = float(last_epoch.get("data_ratio", 0.0))
+        bound = {"io": "E/S (dataloader)", "compute": "Cómputo"}.get(
+            last_epoch.get("bound"), "N/A"
+        )
+
+        rows = [
+            (
+                "Época",
+                f"{snapshot.get('epoch', 0)}/{snapshot.get('epochs', 0)}"
+                + f" | Batch: {snapshot.get('batch', 0)}/{snapshot.get('batches', 0)}",
+            ),
+            ("Imágenes/s", f"{snapshot.get('images_per_s', 0)}"),
+            (
+                "Espera de datos",
+                f"{snapshot.get('data_s', 0)}s | Cómputo: {snapshot.get('compute_s', 0)}s",
+            ),
+            (
+                "Memoria",
+                f"RSS: {snapshot.get('rss_mb', 0)} MB | GPU: {snapshot.get('gpu_mb', 0)} MB",
+            ),
+            (
+                "Última época",
+                f"{last_epoch.get('wall_s', 0)}s | {last_epoch.get('images_per_s', 0)} img/s",
+            ),
+            ("Limitado por", f"{bound} ({data_ratio:.0%} espera)"),
+        ]
+
+        grid = Table.grid(expand=True)
+        grid.add_column()
+        for key, value in rows:
+            grid.add_row(self._fmtDotted(key, value))
+
+        return Panel(
+            grid,
+            title="TELEMETRÍA",
+            style="info",
+            box=box.ROUNDED,
+            width=self.width,
+            padding=(0, 2),
+        )
+
     def section(self, title: str, subtitle: str = "") -> None:
         self.console.print(f"\n[step] {title.upper()} [/step]")
         self.console.print(f"[info]{'─' * self.width}[/info]")
@@ -132,6 +355,7 @@ class BashUI:
         question: str,
         choices: list[str] | None = None,
         default: str | None = None,
+        key: str | None = None,
     ) -> str:
         choices_str = ""
         if choices and len(choices) > 0:
@@ -154,18 +378,23 @@ class BashUI:
                 f"Advertencia: Opción '{value}' no reconocida.\n"
                 + f"  Por favor ingrese una de estas opciones: {', '.join(choices)}."
             )
-            return self.ask(question, choices, default)
+            return self.ask(question, choices, default, key)
 
         if not value:
             self.stepWarning(
                 "Advertencia: El valor no puede estar vacío.\n"
                 + "  Por favor ingrese un valor válido."
             )
-            return self.ask(question, choices, default)
+            return self.ask(question, choices, default, key)
 
         return str(value)
 
-    def askConfirm(self, question: str, default: bool = False) -> bool:
+    def askConfirm(
+        self,
+        question: str,
+        default: bool = False,
+        key: str | None = None,
+    ) -> bool:
         default_str = "(S/n)" if default else "(s/N)"
         raw_value = Prompt.ask(
             f"[bold cyan]?[/bold cyan] [bold white]{question}[/bold white]"
@@ -181,19 +410,26 @@ class BashUI:
                 f"Advertencia: Opción '{value}' no reconocida.\n"
                 + f"  Por favor ingrese una de estas opciones: {', '.join(['s', 'si', 'n', 'no'])}."
             )
-            return self.askConfirm(question, default)
+            return self.askConfirm(question, default, key)
 
         if not value:
             self.stepWarning(
                 "Advertencia: El valor no puede estar vacío.\n"
                 + "  Por favor ingrese un valor válido."
             )
-            return self.askConfirm(question, default)
+            return self.askConfirm(question, default, key)
 
         return value in ["s", "si"]
 
-    def askPath(self, question: str, default: Path | None = None) -> Path:
-        raw_value = self.ask(question, default=str(default) if default else None)
+    def askPath(
+        self,
+        question: str,
+        default: Path | None = None,
+        key: str | None = None,
+    ) -> Path:
+        raw_value = self.ask(
+            question, default=str(default) if default else None, key=key
+        )
         safe_value = str(raw_value) if raw_value is not None else ""
         clean_value = safe_value.strip().replace("'", "").replace('"', "")
 
@@ -202,20 +438,25 @@ class BashUI:
                 "Advertencia: La ruta no puede estar vacía.\n"
                 + "  Por favor escriba una ruta válida."
             )
-            return self.askPath(question, default)
+            return self.askPath(question, default, key)
 
         return Path(clean_value)
 
-    def askInt(self, question: str, default: int | None = None) -> int:
+    def askInt(
+        self,
+        question: str,
+        default: int | None = None,
+        key: str | None = None,
+    ) -> int:
         try:
-            value = self.ask(question, default=str(default))
+            value = self.ask(question, default=str(default), key=key)
             return int(value)
         except ValueError:
             self.stepWarning(
                 f"Advertencia: Número '{value}' incorrecto.\n"
                 + "  Por favor ingrese un número entero válido."
             )
-            return self.askInt(question, default)
+            return self.askInt(question, default, key)
 
     def stepInfo(self, msg: str) -> None:
         # Se puede cambiar por el tag '⠋' por '🔹'
@@ -0,0 +1,143 @@
+import sys
+import contextlib
+from pathlib import Path
+
+from rich.console import Console
+
+from core.constants import CONSOLE_WIDTH
+from core.profiler import Profiler
+from ui.bash import BashUI, theme
+
+
+class HeadlessUI(BashUI):
+    def __init__(
+        self,
+        answers: dict[str, object],
+        progress: str = "json",
+        refresh_per_second: float | None = None,
+        profile: str | None = None,
+    ) -> None:
+        # La salida de Rich va a stderr; stdout queda reservado para eventos
+        # JSON (uno por línea).
+        self.console = Console(file=sys.stderr, width=CONSOLE_WIDTH, theme=theme)
+        self.width = CONSOLE_WIDTH
+        self.profiler = Profiler(profile)
+
+        self._live = None
+        self._progress = self._progressBackend(progress, refresh_per_second)
+        self._answers: dict[str, object] = answers
+        self._asked: set[str] = set()
+
+    def clear(self) -> None:
+        pass
+
+    def header(self, title: str, subtitle: str = "") -> None:
+        self.emit("start", title=title, subtitle=subtitle)
+
+    def footer(self, context: dict[str, object]) -> None:
+        self.emit("context", context=context)
+        self.profileTable()
+
+    def profileTable(self) -> None:
+        self.emit("profile", stages=self.profiler.records())
+
+    def section(self, title: str, subtitle: str = "") -> None:
+        self.emit("section", title=title.strip(), subtitle=subtitle)
+
+    def table(
+        self,
+        title: str,
+        columns: list[str],
+        rows: list[list[object]],
+    ) -> None:
+        self.emit("table", title=title, columns=columns, rows=rows)
+
+    def ask(
+        self,
+        question: str,
+        choices: list[str] | None = None,
+        default: str | None = None,
+        key: str | None = None,
+    ) -> str:
+        value = self._answer(question, default, key)
+        safe_value = str(value).strip() if value is not None else ""
+
+        if choices is not None:
+            safe_value = safe_value.lower()
+            if safe_value not in choices:
+                raise Exception(
+                    f"Valor '{safe_value}' no válido para '{key}'."
+                    + f" Opciones: {', '.join(choices)}."
+                )
+
+        if not safe_value:
+            raise Exception(f"Falta el valor obligatorio '{key}' en el trabajo.")
+
+        return safe_value
+
+    def askConfirm(
+        self,
+        question: str,
+        default: bool = False,
+        key: str | None = None,
+    ) -> bool:
+        value = self._answer(question, default, key)
+
+        if isinstance(value, bool):
+            return value
+        return str(value).strip().lower() in ["s", "si", "y", "yes", "true", "1"]
+
+    def askPath(
+        self,
+        question: str,
+        default: Path | None = None,
+        key: str | None = None,
+    ) -> Path:
+        return Path(self.ask(question, default=default, key=key)).expanduser()
+
+    def askInt(
+        self,
+        question: str,
+        default: int | None = None,
+        key: str | None = None,
+    ) -> int:
+        value = self._answer(question, default, key)
+
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            raise Exception(f"El valor '{value}' de '{key}' no es un entero válido.")
+
+    def liveTelemetry(self) -> contextlib.nullcontext:
+        return contextlib.nullcontext()
+
+    def updateTelemetry(self, snapshot: dict[str, object]) -> None:
+        if snapshot.get("type") == "epoch":
+            snapshot = {k: v for k, v in snapshot.items() if k != "last_epoch"}
+            self.emit("telemetry", **snapshot)
+
+    def stepInfo(self, msg: str) -> None:
+        self.emit("info", message=msg)
+
+    def stepSuccess(self, msg: str) -> None:
+        self.emit("success", message=msg)
+
+    def stepWarning(self, msg: str) -> None:
+        self.emit("warning", message=msg)
+
+    def stepError(self, msg: str) -> None:
+        self.emit("error", message=msg)
+
+    def stepInfoBox(self, key: str, value: str) -> None:
+        self.emit("info", key=key, value=str(value))
+
+    def _answer(self, question: str, default: object, key: str | None) -> object:
+        # Una segunda pregunta con la misma clave significa que el valor
+        # anterior fue rechazado; sin usuario no hay forma de corregirlo.
+        if key in self._asked:
+            raise Exception(f"El valor de '{key}' no es válido ({question}).")
+        self._asked.add(key)
+
+        value = self._answers.get(key, default)
+        self.emit("answer", key=key, value=value)
+        return value
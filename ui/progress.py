@@ -0,0 +1,224 @@
+import time
+import threading
+from typing import Callable
+
+from rich.console import Console
+from rich.progress import BarColumn, Progress, SpinnerColumn, TaskID, TextColumn
+
+
+def _fmtBytes(value: float) -> str:
+    for unit in ["B", "KB", "MB", "GB"]:
+        if abs(value) < 1024:
+            return f"{value:.1f} {unit}" if unit != "B" else f"{int(value)} B"
+        value /= 1024
+    return f"{value:.1f} TB"
+
+
+def _fmtTime(seconds: float) -> str:
+    seconds = int(max(0, seconds))
+    return f"{seconds // 3600}:{(seconds % 3600) // 60:02d}:{seconds % 60:02d}"
+
+
+class ProgressTask:
+    def __init__(
+        self,
+        backend: "ProgressBackend",
+        description: str,
+        total: int | None,
+        unit: str | None,
+        on_finish: Callable[[str | None, int], None] | None = None,
+    ) -> None:
+        self.description: str = description
+        self.total: int | None = total
+        self.unit: str | None = unit
+        self.completed: int = 0
+        self.handle: TaskID | None = None
+
+        self._backend: ProgressBackend = backend
+        self._on_finish = on_finish
+        self._interval: float = backend.interval
+        self._start: float = 0.0
+        self._last_render: float = 0.0
+
+    def __enter__(self) -> "ProgressTask":
+        self._start = time.monotonic()
+        self._last_render = self._start
+        self._backend.start(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self._backend.finish(self, failed=exc_type is not None)
+        if self._on_finish:
+            self._on_finish(self.unit, self.completed)
+
+    def advance(self, amount: int = 1) -> None:
+        self.completed += amount
+
+        # Solo se redibuja cuando vence el intervalo del backend; el coste por
+        # llamada queda en una suma y una lectura del reloj.
+        now = time.monotonic()
+        if now - self._last_render >= self._interval:
+            self._last_render = now
+            self._backend.render(self)
+
+    def update(self, completed: int | None = None, total: int | None = None) -> None:
+        if total is not None:
+            self.total = total
+        if completed is not None:
+            self.completed = completed
+        self.advance(0)
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self._start
+
+    @property
+    def rate(self) -> float:
+        elapsed = self.elapsed
+        return self.completed / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def percentage(self) -> float | None:
+        if not self.total:
+            return None
+        return min(100.0, 100.0 * self.completed / self.total)
+
+    def detail(self) -> str:
+        parts: list[str] = []
+
+        if self.percentage is not None:
+            parts.append(f"{self.percentage:>3.0f}%")
+
+        if self.unit == "bytes":
+            size = _fmtBytes(self.completed)
+            parts.append(f"{size}/{_fmtBytes(self.total)}" if self.total else size)
+            parts.append(f"{_fmtBytes(self.rate)}/s")
+            if self.total and self.rate > 0:
+                parts.append(_fmtTime((self.total - self.completed) / self.rate))
+            else:
+                parts.append(_fmtTime(self.elapsed))
+        elif self.unit == "items":
+            parts.append(
+                f"{self.completed}/{self.total}" if self.total else f"{self.completed}"
+            )
+            parts.append(_fmtTime(self.elapsed))
+        else:
+            parts.append(_fmtTime(self.elapsed))
+
+        return " • ".join(parts)
+
+    def record(self) -> dict[str, object]:
+        return {
+            "task": self.description,
+            "unit": self.unit,
+            "completed": self.completed,
+            "total": self.total,
+            "elapsed_s": round(self.elapsed, 3),
+            "rate": round(self.rate, 2),
+        }
+
+
+class ProgressBackend:
+    interval: float = 0.1
+
+    def start(self, task: ProgressTask) -> None:
+        pass
+
+    def render(self, task: ProgressTask) -> None:
+        pass
+
+    def finish(self, task: ProgressTask, failed: bool = False) -> None:
+        pass
+
+
+class RichProgressBackend(ProgressBackend):
+    def __init__(self, console: Console, refresh_per_second: float) -> None:
+        self.interval = 1.0 / refresh_per_second
+
+        self._console: Console = console
+        self._refresh_per_second: float = refresh_per_second
+        self._progress: Progress | None = None
+        self._active: int = 0
+        self._lock = threading.Lock()
+
+    def start(self, task: ProgressTask) -> None:
+        # Las tareas concurrentes comparten un único 'Progress' (Rich solo
+        # admite una pantalla en vivo a la vez).
+        with self._lock:
+            if self._progress is None:
+                self._progress = Progress(
+                    SpinnerColumn(style="bar.pulse"),
+                    TextColumn("[bold white]{task.description}"),
+                    BarColumn(bar_width=None, style="white", finished_style="white"),
+                    TextColumn("{task.fields[detail]}"),
+                    console=self._console,
+                    transient=False,
+                    refresh_per_second=self._refresh_per_second,
+                )
+                self._progress.start()
+
+            self._active += 1
+            task.handle = self._progress.add_task(
+                task.description,
+                total=task.total,
+                detail=task.detail(),
+            )
+
+    def render(self, task: ProgressTask) -> None:
+        self._progress.update(
+            task.handle,
+            completed=task.completed,
+            total=task.total,
+            detail=task.detail(),
+        )
+
+    def finish(self, task: ProgressTask, failed: bool = False) -> None:
+        with self._lock:
+            if task.total is None and not failed:
+                task.total = max(task.completed, 1)
+                task.completed = task.total
+            self.render(task)
+
+            self._active -= 1
+            if self._active == 0:
+                self._progress.stop()
+                self._progress = None
+
+
+class PlainProgressBackend(ProgressBackend):
+    def __init__(self, console: Console, interval: float) -> None:
+        self.interval = interval
+
+        self._console: Console = console
+        self._lock = threading.Lock()
+
+    def start(self, task: ProgressTask) -> None:
+        self._write(f"{task.description}...")
+
+    def render(self, task: ProgressTask) -> None:
+        self._write(f"{task.description}: {task.detail()}")
+
+    def finish(self, task: ProgressTask, failed: bool = False) -> None:
+        status = "interrumpido" if failed else "completado"
+        self._write(f"{task.description}: {status} • {task.detail()}")
+
+    def _write(self, line: str) -> None:
+        with self._lock:
+            self._console.file.write(line + "\n")
+            self._console.file.flush()
+
+
+class JsonProgressBackend(ProgressBackend):
+    def __init__(self, emit: Callable[..., None], interval: float) -> None:
+        self.interval = interval
+
+        self._emit: Callable[..., None] = emit
+
+    def start(self, task: ProgressTask) -> None:
+        self._emit("progress", status="start", **task.record())
+
+    def render(self, task: ProgressTask) -> None:
+        self._emit("progress", status="running", **task.record())
+
+    def finish(self, task: ProgressTask, failed: bool = False) -> None:
+        self._emit("progress", status="failed" if failed else "done", **task.record())
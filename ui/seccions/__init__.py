@@ -1,5 +1,6 @@
 from .seccion_one import SectionOne
 from .seccion_two import SectionTwo
 from .seccion_three import SectionThree
+from .seccion_four import SectionFour
 
-__all__ = ["SectionOne", "SectionTwo", "SectionThree"]
+__all__ = ["SectionOne", "SectionTwo", "SectionThree", "SectionFour"]
@@ -0,0 +1,115 @@
+from pathlib import Path
+
+from core.constants import BENCHMARK_BATCH_SIZES, EXPORT_FORMATS, SECTION_FOUR_TITLE
+from core.profiler import timed
+from ui import BashUI
+
+
+class SectionFour:
+    def __init__(self, ui: BashUI) -> None:
+        self._ui: BashUI = ui
+
+    @timed(SECTION_FOUR_TITLE)
+    def run(self, context: dict[str, object]) -> None:
+        best_model_path: Path = context.get("best_model_path", None)
+        if not best_model_path or not Path(best_model_path).exists():
+            return
+
+        self._ui.section(
+            SECTION_FOUR_TITLE,
+            subtitle="Exportación del modelo y benchmark de inferencia en CPU:",
+        )
+
+        try:
+            confirm = self._ui.askConfirm(
+                f"Exportar ({', '.join(EXPORT_FORMATS)}) y medir inferencia en CPU",
+                default=False,
+                key="export",
+            )
+            if confirm:
+                self._runBenchmark(context)
+            else:
+                self._ui.stepInfo("Exportación omitida")
+
+            self._ui.console.print()
+            confirm = self._ui.askConfirm(
+                "Cuantizar a INT8 (ONNX estático calibrado con validación)",
+                default=False,
+                key="quantize",
+            )
+            if confirm:
+                self._runQuantization(context)
+            else:
+                self._ui.stepInfo("Cuantización omitida")
+
+        except Exception:
+            raise
+
+    def _runBenchmark(self, context: dict[str, object]) -> None:
+        try:
+            from core.benchmark import Benchmark
+
+            self._ui.console.print()
+            report = Benchmark(self._ui).run(
+                best_model_path=Path(context["best_model_path"]),
+                data_yaml=Path(context["yaml_path"]),
+                imgsz=context.get("imgsz", 640),
+                run_dir=Path(context["trained_model_path"]),
+            )
+
+            rows = [
+                [
+                    result["format"],
+                    result["batch"],
+                    result["p50_ms"],
+                    result["p95_ms"],
+                    result["images_per_s"],
+                    f"{result['map50_95']:.4f}",
+                    f"{result['map_drift']:+.4f}",
+                ]
+                for result in report["results"]
+            ]
+            self._ui.table(
+                f"BENCHMARK CPU ({report['images']} imágenes de validación)",
+                ["Formato", "Batch", "p50 ms", "p95 ms", "img/s", "mAP", "Deriva"],
+                rows,
+            )
+
+            fastest: dict[str, object] = report["fastest"]
+            context["benchmark"] = report
+            context["fastest_format"] = (
+                f"{fastest['format']} (batch {fastest['batch']}:"
+                + f" {fastest['images_per_s']} img/s)"
+            )
+            self._ui.stepSuccess(
+                f"Benchmark completado. Formato más rápido: {context['fastest_format']}.\n"
+                + f"  Lotes medidos: {', '.join(map(str, BENCHMARK_BATCH_SIZES))}"
+            )
+
+        except Exception:
+            raise
+
+    def _runQuantization(self, context: dict[str, object]) -> None:
+        try:
+            from core.quantizer import Quantizer
+
+            self._ui.console.print()
+            report = Quantizer(self._ui).run(
+                best_model_path=Path(context["best_model_path"]),
+                data_yaml=Path(context["yaml_path"]),
+                imgsz=context.get("imgsz", 640),
+                run_dir=Path(context["trained_model_path"]),
+            )
+
+            context["quantization"] = report
+            self._ui.stepSuccess(
+                "Modelo INT8 generado: "
+                + f"{Path(report['int8']['path']).name} ({report['int8']['size_mb']} MB)\n"
+                + f"  Latencia p50: {report['fp32']['p50_ms']} ms (fp32)"
+                + f" → {report['int8']['p50_ms']} ms (INT8) | x{report['speedup']}\n"
+                + f"  mAP50-95: {report['fp32']['map50_95']:.4f}"
+                + f" → {report['int8']['map50_95']:.4f} ({report['map_delta']:+.4f})"
+            )
+
+        except Exception:
+            raise
@@ -1,6 +1,7 @@
 import time
 import shutil
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 
 from core.constants import (
     DATASETS_DIR,
@@ -9,6 +10,9 @@ from core.constants import (
     UNZIP_EXTENSIONS,
 )
 from core import Dataset, Downloader, Validator
+from core.journal import Journal
+from core.labels import sanitizeClassName, unifyClasses
+from core.profiler import StageRecord, timed
 from ui import BashUI
 
 
@@ -27,25 +31,36 @@ class SectionOne:
 
         self._dataset_path: Path | None = None
 
+    @timed(SECTION_ONE_TITLE)
     def run(self, context: dict[str, object]) -> None:
         self._ui.section(
             SECTION_ONE_TITLE,
             subtitle="Seleccione dónde se encuentran sus datos crudos:",
         )
 
-        source = self._ui.ask("Fuente", choices=["local", "drive"], default="local")
+        source = self._ui.ask(
+            "Fuente",
+            choices=["local", "drive", "varias"],
+            default="local",
+            key="source",
+        )
         clean_source = source.lower().strip()
 
         if clean_source == "local":
             source, dataset_path = self._selectLocalSource()
         elif clean_source == "drive":
             source, dataset_path = self._selectDriveSource()
+        elif clean_source == "varias":
+            source, dataset_path = self._selectMultipleSources()
 
         context["dataset_source"] = source
         context["dataset_path"] = Path(dataset_path).expanduser().resolve()
 
     def _selectLocalSource(self) -> tuple[str, Path]:
-        path = self._ui.askPath("Ruta de origen (carpeta o archivo comprimido)")
+        path = self._ui.askPath(
+            "Ruta de origen (carpeta o archivo comprimido)",
+            key="source_path",
+        )
         is_valid, type_detected = self._validator.source(path)
 
         if not is_valid:
@@ -66,6 +81,11 @@ class SectionOne:
                 )
                 return self._selectLocalSource()
 
+        signature = Journal.signature(path)
+        resumed = self._findResumable(signature)
+        if resumed is not None:
+            return path, resumed
+
         self._ui.console.print()
         self._ui.stepInfo("Procesando archivos locales")
 
@@ -86,16 +106,7 @@ class SectionOne:
                 if not self._dataset.copy(path, copy_path, False):
                     raise Exception("No se pudo copiar el archivo.")
 
-                unzip_type = self._validator.unzipType(copy_path)
-                if unzip_type == "zip":
-                    if not self._dataset.unzipZIP(copy_path, self._dataset_path):
-                        raise Exception("No se pudo descomprimir el archivo ZIP.")
-                elif unzip_type == "rar":
-                    if not self._dataset.unzipRAR(copy_path, self._dataset_path):
-                        raise Exception("No se pudo descomprimir el archivo RAR.")
-                elif unzip_type == "tar":
-                    if not self._dataset.unzipTAR(copy_path, self._dataset_path):
-                        raise Exception("No se pudo descomprimir el archivo TAR.")
+                self._unzip(copy_path, self._dataset_path)
 
             elif is_valid and type_detected == "image":
                 self._ui.stepSuccess("Imagen detectada.")
@@ -104,10 +115,13 @@ class SectionOne:
                 if not self._dataset.copy(path, copy_path, False):
                     raise Exception("No se pudo copiar la imagen.")
 
+            classes = self._convertAnnotations(self._dataset_path)
+
             if not self._scanAndValidate(self._dataset_path):
                 self._cleanOnFail()
                 return self._selectLocalSource()
             else:
+                self._startJournal(signature, classes)
                 return path, self._dataset_path
 
         except Exception:
@@ -115,7 +129,7 @@ class SectionOne:
             raise
 
     def _selectDriveSource(self) -> tuple[str, Path]:
-        url = self._ui.ask("Enlace de Google Drive")
+        url = self._ui.ask("Enlace de Google Drive", key="source_url")
 
         if not self._validator.validateGDURL(url):
             self._ui.stepWarning(
@@ -124,6 +138,11 @@ class SectionOne:
             )
             return self._selectDriveSource()
 
+        signature = Journal.signature(url)
+        resumed = self._findResumable(signature)
+        if resumed is not None:
+            return url, resumed
+
         self._ui.console.print()
         self._ui.stepInfo("Conectando con Google Drive")
 
@@ -144,16 +163,7 @@ class SectionOne:
             elif is_valid and type_detected == "unzip":
                 self._ui.stepSuccess("Archivo comprimido detectado.")
 
-                unzip_type = self._validator.unzipType(path)
-                if unzip_type == "zip":
-                    if not self._dataset.unzipZIP(path, self._dataset_path):
-                        raise Exception("No se pudo descomprimir el archivo ZIP.")
-                elif unzip_type == "rar":
-                    if not self._dataset.unzipRAR(path, self._dataset_path):
-                        raise Exception("No se pudo descomprimir el archivo RAR.")
-                elif unzip_type == "tar":
-                    if not self._dataset.unzipTAR(path, self._dataset_path):
-                        raise Exception("No se pudo descomprimir el archivo TAR.")
+                self._unzip(path, self._dataset_path)
 
             elif is_valid and type_detected == "image":
                 self._ui.stepSuccess("Imagen detectada.")
@@ -170,16 +180,204 @@ class SectionOne:
                 self._cleanOnFail()
                 return self._selectDriveSource()
 
+            classes = self._convertAnnotations(self._dataset_path)
+
             if not self._scanAndValidate(self._dataset_path):
                 self._cleanOnFail()
                 return self._selectDriveSource()
             else:
+                self._startJournal(signature, classes)
                 return url, self._dataset_path
 
         except Exception:
             self._cleanOnFail()
             raise
 
+    def _selectMultipleSources(self) -> tuple[str, Path]:
+        count = self._ui.askInt("Número de fuentes", default=2, key="source_count")
+        if count < 2:
+            self._ui.stepWarning(
+                f"Advertencia: '{count}' no es un número de fuentes válido.\n"
+                + "  Para combinar entregas se necesitan al menos 2 fuentes."
+            )
+            return self._selectMultipleSources()
+
+        sources: list[Path | str] = []
+        class_lists: list[list[str]] = []
+        for i in range(1, count + 1):
+            self._ui.console.print()
+            sources.append(self._askSource(i))
+            class_lists.append(self._askSourceClasses(i))
+
+        signature = " + ".join(
+            f"{Journal.signature(source)}#{','.join(names)}"
+            for source, names in zip(sources, class_lists)
+        )
+        label = " + ".join(str(source) for source in sources)
+        resumed = self._findResumable(signature)
+        if resumed is not None:
+            return label, resumed
+
+        self._ui.console.print()
+        self._ui.stepInfo(f"Obteniendo {count} fuentes en paralelo")
+
+        try:
+            self._dataset_path = DATASETS_DIR / f"{time.strftime('%Y%m%d%H%M%S')}"
+            self._dataset_path.mkdir(parents=True, exist_ok=True)
+
+            parent = self._ui.profiler.current()
+            with ThreadPoolExecutor(max_workers=count) as pool:
+                futures = [
+                    pool.submit(
+                        self._fetchSource,
+                        source,
+                        self._dataset_path / f"fuente_{i}",
+                        parent,
+                    )
+                    for i, source in enumerate(sources, 1)
+                ]
+                targets = [future.result() for future in futures]
+
+            # Las fuentes COCO o VOC traen sus propias clases. Cada fuente
+            # conserva su orden de clases y todas se traducen a un espacio de
+            # ids común (por orden de aparición).
+            for i, target in enumerate(targets):
+                converted = self._convertAnnotations(target)
+                if converted:
+                    class_lists[i] = converted
+            classes, luts = unifyClasses(class_lists)
+
+            for target, lut in zip(targets, luts):
+                stats = self._dataset.remap(target, lut)
+                self._ui.stepSuccess(
+                    f"'{target.name}': {stats['labels']} etiquetas reasignadas al"
+                    + " espacio de clases común."
+                )
+
+            self._ui.stepSuccess(
+                f"{count} fuentes combinadas con {len(classes)} clases:"
+                + f" {', '.join(classes)}."
+            )
+
+            if not self._scanAndValidate(self._dataset_path):
+                self._cleanOnFail()
+                return self._selectMultipleSources()
+            else:
+                self._startJournal(signature, classes)
+                return label, self._dataset_path
+
+        except Exception:
+            self._cleanOnFail()
+            raise
+
+    def _askSource(self, index: int) -> Path | str:
+        value = self._ui.ask(
+            f"Fuente {index} (ruta local o enlace de Google Drive)",
+            key=f"source_{index}",
+        )
+
+        if value.startswith("http"):
+            if not self._validator.validateGDURL(value):
+                self._ui.stepWarning(
+                    "Advertencia: La URL no pertenece a Google Drive.\n"
+                    + "  Formato esperado: 'https://drive.google.com/...'"
+                )
+                return self._askSource(index)
+            return value
+
+        path = Path(value).expanduser()
+        is_valid, _ = self._validator.source(path)
+        if not is_valid:
+            self._ui.stepWarning(
+                f"Advertencia: La ruta '{path}' no existe o no es compatible.\n"
+                + "  Verifique que sea una carpeta, un archivo comprimido ("
+                + ", ".join(UNZIP_EXTENSIONS)
+                + ") o una imagen."
+            )
+            return self._askSource(index)
+        return path
+
+    def _askSourceClasses(self, index: int) -> list[str]:
+        class_names = self._ui.ask(
+            f"Clases de la fuente {index} (en el orden de sus ids, separadas por coma)",
+            key=f"source_{index}_classes",
+        )
+
+        # Se admiten nombres repetidos: dos ids de una fuente con el mismo
+        # nombre se fusionan en una sola clase.
+        names = [sanitizeClassName(name) for name in class_names.split(",")]
+        if not all(names):
+            self._ui.stepWarning(
+                "Advertencia: Hay nombres de clase vacíos o no válidos.\n"
+                + "  Ejemplo: 'persona,coche,moto'"
+            )
+            return self._askSourceClasses(index)
+        return names
+
+    def _fetchSource(
+        self,
+        source: Path | str,
+        dest_folder: Path,
+        parent: StageRecord | None = None,
+    ) -> Path:
+        # Se ejecuta en un hilo por fuente: descargas, copias y extracciones
+        # de las distintas fuentes avanzan a la vez, cada una en su etapa
+        # bajo la sección que las lanza.
+        with self._ui.stage(dest_folder.name, parent=parent):
+            dest_folder.mkdir(parents=True, exist_ok=True)
+
+            if isinstance(source, str):
+                path = self._downloader.runGD(source, dest_folder)
+                if path is None:
+                    raise Exception(f"No se pudo descargar '{source}' de Google Drive.")
+            elif source.is_dir():
+                if not self._dataset.copy(source, dest_folder, True):
+                    raise Exception(f"No se pudo copiar el directorio '{source}'.")
+                return dest_folder
+            else:
+                path = dest_folder / source.name
+                if not self._dataset.copy(source, path, False):
+                    raise Exception(f"No se pudo copiar el archivo '{source}'.")
+
+            is_valid, type_detected = self._validator.source(path)
+            if is_valid and type_detected == "unzip":
+                self._unzip(path, dest_folder)
+            return dest_folder
+
+    def _convertAnnotations(self, target_path: Path) -> list[str]:
+        result = self._dataset.convert(target_path)
+        if result is None:
+            return []
+
+        self._ui.stepSuccess(
+            f"Anotaciones {result['format'].upper()} convertidas a YOLO:"
+            + f" {result['boxes']} cajas en {result['images']} imágenes.\n"
+            + f"  Clases ({len(result['classes'])}): {', '.join(result['classes'])}"
+        )
+        if result["missing"]:
+            self._ui.stepWarning(
+                f"{result['missing']} imágenes anotadas no se encontraron en"
+                + f" '{target_path.name}'."
+            )
+        if result.get("unmatched"):
+            self._ui.stepWarning(
+                f"{result['unmatched']} anotaciones COCO se descartaron: su"
+                + " 'image_id' no aparece en su archivo de anotaciones."
+            )
+        return result["classes"]
+
+    def _unzip(self, path: Path, dest_folder: Path) -> None:
+        unzip_type = self._validator.unzipType(path)
+        if unzip_type == "zip":
+            if not self._dataset.unzipZIP(path, dest_folder):
+                raise Exception("No se pudo descomprimir el archivo ZIP.")
+        elif unzip_type == "rar":
+            if not self._dataset.unzipRAR(path, dest_folder):
+                raise Exception("No se pudo descomprimir el archivo RAR.")
+        elif unzip_type == "tar":
+            if not self._dataset.unzipTAR(path, dest_folder):
+                raise Exception("No se pudo descomprimir el archivo TAR.")
+
     def _scanAndValidate(self, target_path: Path) -> bool:
         self._ui.console.print()
         self._ui.stepInfo("Procesando contenido")
@@ -203,6 +401,27 @@ class SectionOne:
             )
             return False
 
+    def _findResumable(self, signature: str) -> Path | None:
+        dataset_path = Journal.find(signature)
+        if dataset_path is None:
+            return None
+
+        journal = Journal(dataset_path)
+        self._ui.console.print()
+        self._ui.stepSuccess(
+            f"Dataset parcialmente procesado encontrado en '{dataset_path}'.\n"
+            + "  Se reanuda desde la última etapa completada"
+            + f" ({', '.join(journal.stages())})."
+        )
+        return dataset_path
+
+    def _startJournal(self, signature: str, classes: list[str]) -> None:
+        # Las clases se conocen al ingerir si vienen de varias fuentes o de
+        # anotaciones COCO/VOC; si no, la Sección 2 las pregunta.
+        journal = Journal(self._dataset_path)
+        journal.start(signature)
+        journal.complete("ingest", classes=classes)
+
     def _cleanOnFail(self) -> None:
         if self._dataset_path and self._dataset_path.exists():
             shutil.rmtree(str(self._dataset_path))
@@ -3,13 +3,19 @@ import shutil
 from pathlib import Path
 
 from core.constants import (
+    CHECKPOINT_LAST,
     MODELS_BASE_DIR,
     MODELS_TRAINED_DIR,
     SECTION_THREE_TITLE,
+    SUBSET_EPOCHS,
+    SUBSET_IMGSZ,
+    SUBSET_PERCENT,
     YOLO_MODEL_URL,
     YOLO_MODEL_VERSIONS,
 )
 from core import Dataset, Downloader, Validator
+from core.profiler import timed
+from core.session import Session
 from ui import BashUI
 
 
@@ -29,6 +35,7 @@ class SectionThree:
         self._base_models_path: Path | None = None
         self._trained_models_path: Path | None = None
 
+    @timed(SECTION_THREE_TITLE)
     def run(self, context: dict[str, object]) -> None:
         model_name = f"model_{time.strftime('%Y%m%d%H%M%S')}"
         self._ui.section(
@@ -38,12 +45,13 @@ class SectionThree:
 
         try:
             self._base_models_path = MODELS_BASE_DIR
-            self._base_models_path.mkdir(exist_ok=True)
+            self._base_models_path.mkdir(parents=True, exist_ok=True)
 
             source = self._ui.ask(
                 "Fuente del Modelo Base",
                 choices=["yolo", "local", "drive"],
                 default="yolo",
+                key="model_source",
             )
 
             if source == "yolo":
@@ -56,9 +64,15 @@ class SectionThree:
             context["base_model_path"] = base_model_path
 
             self._ui.console.print()
-            epochs = self._ui.askInt("Épocas", default=100)
-            batch = self._ui.askInt("Tamaño de Batch", default=16)
-            imgsz = self._ui.askInt("Tamaño de Imagen", default=640)
+            epochs = self._ui.askInt("Épocas", default=100, key="epochs")
+            batch = self._ui.askInt("Tamaño de Batch", default=16, key="batch")
+            if "imgsz" in context:
+                imgsz = context["imgsz"]
+                self._ui.stepInfoBox(
+                    "Tamaño de Imagen", f"{imgsz} (imágenes preparadas)"
+                )
+            else:
+                imgsz = self._ui.askInt("Tamaño de Imagen", default=640, key="imgsz")
             device = self._askForDevice()
 
             context["epochs"] = epochs
@@ -66,14 +80,48 @@ class SectionThree:
             context["imgsz"] = imgsz
             context["device"] = device
 
+            self._ui.console.print()
+            autotune = self._ui.askConfirm(
+                "Auto-ajustar rendimiento (batch, workers, cache, hilos)",
+                default=False,
+                key="autotune",
+            )
+            if autotune:
+                self._runAutoTune(context, model_name)
+
+            # Con train empaquetado en shards la lectura ya es secuencial y la
+            # caché solo cubriría val.
+            if not context.get("shards"):
+                self._ui.console.print()
+                decoded_cache = self._ui.askConfirm(
+                    "Precargar imágenes decodificadas (caché mmap compartida)",
+                    default=False,
+                    key="decoded_cache",
+                )
+                if decoded_cache:
+                    self._runDecodedCache(context)
+
+            self._ui.console.print()
+            smoke_test = self._ui.askConfirm(
+                "Prueba rápida sobre un subconjunto estratificado (tiempo proyectado)",
+                default=False,
+                key="smoke_test",
+            )
+            if smoke_test:
+                self._runSmokeTest(context, model_name)
+
             self._ui.console.print()
             self._ui.stepSuccess("Configuración guardada.")
 
             self._ui.console.print()
-            confirm = self._ui.askConfirm("Iniciar Entrenamiento", default=True)
+            confirm = self._ui.askConfirm(
+                "Iniciar Entrenamiento",
+                default=True,
+                key="start_training",
+            )
             if confirm:
                 self._trained_models_path = MODELS_TRAINED_DIR
-                self._trained_models_path.mkdir(exist_ok=True)
+                self._trained_models_path.mkdir(parents=True, exist_ok=True)
 
                 self._runTraining(context, model_name)
             else:
@@ -82,12 +130,65 @@ class SectionThree:
         except Exception:
             raise
 
+    @timed(SECTION_THREE_TITLE)
+    def resume(self, context: dict[str, object]) -> None:
+        run_dir: Path = context["trained_model_path"]
+        self._ui.section(
+            SECTION_THREE_TITLE,
+            subtitle=f"Reanudando: {run_dir.name}",
+        )
+
+        try:
+            from core.trainer import Trainer
+            from core.telemetry import Telemetry
+
+            yaml_path: Path = context.get("yaml_path", None)
+            if not yaml_path or not Path(yaml_path).exists():
+                raise Exception(
+                    "El dataset del entrenamiento ya no existe. No es posible reanudar."
+                )
+
+            base_model_path = Path(context.get("base_model_path", "N/A"))
+            self._ui.stepInfoBox("Dataset", Path(yaml_path).parent.name)
+            self._ui.stepInfoBox("Modelo Base", base_model_path.name)
+            self._ui.stepInfoBox("Épocas", f"{context.get('epochs', 0)}")
+            self._ui.stepInfoBox("Dispositivo", f"{context.get('device') or 'auto'}")
+
+            self._ui.section("🚀 REANUDANDO ENGINE DE ENTRENAMIENTO... ")
+
+            Session.save(context, run_dir, status="training")
+            telemetry = Telemetry(self._ui.updateTelemetry)
+            with self._ui.stage("Entrenamiento"), self._ui.liveTelemetry(), telemetry:
+                trainer = Trainer(str(run_dir / CHECKPOINT_LAST))
+                telemetry.register(trainer)
+
+                success, best_model_path = trainer.resume(
+                    device=context.get("device", None),
+                    threads=context.get("threads", None),
+                    decoded_cache=context.get("decoded_cache_path", None),
+                )
+
+            context["telemetry"] = telemetry.summary
+
+            if success and best_model_path:
+                context["best_model_path"] = best_model_path
+                Session.save(context, run_dir, status="completed")
+                self._ui.stepSuccess(
+                    "Entrenamiento reanudado y completado correctamente."
+                )
+            else:
+                raise Exception("No se pudo reanudar el entrenamiento.")
+
+        except Exception:
+            raise
+
     def _selectYOLOModel(self) -> Path:
         try:
             version = self._ui.ask(
                 "Versión",
                 choices=["n", "s", "m", "l", "x"],
                 default="n",
+                key="model_version",
             )
 
             yolo_model = YOLO_MODEL_VERSIONS[version]
@@ -120,7 +221,7 @@ class SectionThree:
 
     def _selectLocalModel(self) -> Path:
         try:
-            path = self._ui.askPath("Ruta del modelo '.pt' local")
+            path = self._ui.askPath("Ruta del modelo '.pt' local", key="model_path")
 
             if path.exists() and path.suffix == ".pt":
                 shutil.copy2(path, self._base_models_path)
@@ -134,19 +235,19 @@ class SectionThree:
                 self._ui.stepWarning(
                     "Advertencia: El archivo no existe o no es un modelo '.pt'."
                 )
-                return self.selectLocalModel()
+                return self._selectLocalModel()
         except Exception:
             raise
 
     def _selectDriveModel(self) -> Path:
-        url = self._ui.ask("Enlace de Google Drive del modelo '.pt'")
+        url = self._ui.ask("Enlace de Google Drive del modelo '.pt'", key="model_url")
 
         if not self._validator.validateGDURL(url):
             self._ui.stepWarning(
                 "Advertencia: La URL no pertenece a Google Drive.\n"
                 + "  Formato esperado: 'https://drive.google.com/...'"
             )
-            return self.selectDriveModel()
+            return self._selectDriveModel()
 
         try:
             path = self._downloader.runGD(url, self._base_models_path)
@@ -181,6 +282,7 @@ class SectionThree:
                 "auto",
             ],
             default="auto",
+            key="device",
         )
 
         if device == "auto":
@@ -208,7 +310,7 @@ class SectionThree:
 
             num_devices = torch.cuda.device_count()
             if num_devices == 1:
-                return torch.cuda.get_device_name(0)
+                return "0"
             else:
                 gpu_names = [torch.cuda.get_device_name(i) for i in range(num_devices)]
 
@@ -218,7 +320,10 @@ class SectionThree:
 
     def _askForGPUs(self, num_devices: int, gpu_names: list[str]) -> list[int]:
         # TODO: Testear el ingreso de IDs de GPU
-        gpu_ids = self._ui.ask(f"IDs de la GPU ({', '.join(gpu_names)})")
+        gpu_ids = self._ui.ask(
+            f"IDs de la GPU ({', '.join(gpu_names)})",
+            key="gpu_ids",
+        )
         chunks = [int(i.strip()) for i in gpu_ids.split(",") if i.strip().isdigit()]
 
         if len(chunks) == 0:
@@ -239,26 +344,198 @@ class SectionThree:
 
         return chunks
 
+    def _runAutoTune(self, context: dict[str, object], model_name: str) -> None:
+        try:
+            from core.tuner import Tuner
+
+            tuner = Tuner(self._ui, str(context.get("base_model_path", "N/A")))
+            key = tuner.key(
+                context.get("imgsz", 0),
+                context.get("device", None),
+                context.get("amount_pairs", 0),
+            )
+
+            self._ui.console.print()
+            result = Tuner.find(MODELS_TRAINED_DIR, key)
+            if result and self._ui.askConfirm(
+                "Se encontró un ajuste previo compatible. Reutilizarlo",
+                default=True,
+                key="autotune_reuse",
+            ):
+                self._ui.stepSuccess("Configuración de rendimiento reutilizada.")
+            else:
+                self._ui.stepInfo("Ejecutando pruebas cortas de rendimiento")
+                result = tuner.run(
+                    data_yaml=context.get("yaml_path", "N/A"),
+                    imgsz=context.get("imgsz", 0),
+                    batch=context.get("batch", 0),
+                    device=context.get("device", None),
+                    images=context.get("amount_pairs", 0),
+                )
+
+            config: dict[str, object] = result["config"]
+            context["batch"] = config["batch"]
+            context["workers"] = config["workers"]
+            context["cache"] = config["cache"]
+            context["amp"] = config["amp"]
+            context["threads"] = config["threads"]
+            context["images_per_s"] = result["measurements"]["images_per_s"]
+
+            Tuner.save(result, MODELS_TRAINED_DIR / model_name)
+
+            self._ui.stepSuccess(
+                "Mejor configuración encontrada.\n"
+                + f"  Batch: {config['batch']} | Workers: {config['workers']}"
+                + f" | Cache: {config['cache']} | Hilos: {config['threads']}"
+                + f" | AMP: {config['amp']}\n"
+                + f"  Rendimiento: {result['measurements']['images_per_s']} img/s"
+                + f" | RSS máx.: {result['measurements']['peak_rss_mb']} MB"
+            )
+
+        except Exception:
+            raise
+
+    def _runDecodedCache(self, context: dict[str, object]) -> None:
+        try:
+            result = self._dataset.decode(
+                Path(context["yaml_path"]).parent, context.get("imgsz", 640)
+            )
+
+            # La caché sustituye a la de Ultralytics ('ram' o 'disk').
+            context["decoded_cache_path"] = result["path"]
+            context["cache"] = False
+
+            megabytes = result["bytes"] / (1024 * 1024)
+            self._ui.stepSuccess(
+                (
+                    "Caché decodificada reutilizada"
+                    if result["reused"]
+                    else "Caché decodificada creada"
+                )
+                + f": {result['images']} de {result['total']} imágenes"
+                + f" ({megabytes:.0f} MB).\n"
+                + f"  Ruta: {result['path'].parent.name}/{result['path'].name}"
+            )
+
+        except Exception:
+            raise
+
+    def _runSmokeTest(self, context: dict[str, object], model_name: str) -> None:
+        try:
+            from core.trainer import Trainer
+            from core.telemetry import Telemetry
+
+            percent = self._ui.askInt(
+                "Porcentaje del subconjunto",
+                default=SUBSET_PERCENT,
+                key="smoke_percent",
+            )
+            subset = self._dataset.subset(Path(context["yaml_path"]).parent, percent)
+            self._ui.stepInfo(
+                f"Subconjunto: {subset['train']} de {subset['train_total']} imágenes"
+                + f" de train y {subset['val']} de {subset['val_total']} de val"
+                + f" (clases {subset['train_classes']})"
+            )
+
+            # Pocas épocas a resolución reducida: basta para detectar errores
+            # de configuración o de etiquetas y para medir el rendimiento.
+            imgsz = min(context.get("imgsz", 0), SUBSET_IMGSZ)
+            MODELS_TRAINED_DIR.mkdir(parents=True, exist_ok=True)
+            run_dir = MODELS_TRAINED_DIR / f"{model_name}_smoke"
+            telemetry = Telemetry(self._ui.updateTelemetry)
+            with self._ui.stage("Prueba rápida"), self._ui.liveTelemetry(), telemetry:
+                trainer = Trainer(str(context.get("base_model_path", "N/A")))
+                telemetry.register(trainer)
+
+                try:
+                    trainer.run(
+                        data_yaml=str(subset["yaml_path"]),
+                        epochs=SUBSET_EPOCHS,
+                        imgsz=imgsz,
+                        batch=context.get("batch", 0),
+                        project_dir=MODELS_TRAINED_DIR,
+                        run_name=run_dir.name,
+                        device=context.get("device", None),
+                        workers=context.get("workers", 8),
+                        amp=context.get("amp", True),
+                        threads=context.get("threads", None),
+                        projection={
+                            "train": subset["train_total"],
+                            "val": subset["val_total"],
+                            "epochs": context.get("epochs", 0),
+                            "full_imgsz": context.get("imgsz", 0),
+                        },
+                    )
+                finally:
+                    # De la prueba solo se conserva la proyección: su carpeta de
+                    # entrenamiento y el subconjunto enlazado se eliminan.
+                    shutil.rmtree(run_dir, ignore_errors=True)
+                    shutil.rmtree(Path(subset["yaml_path"]).parent, ignore_errors=True)
+
+            projection = trainer.projection
+            if not projection:
+                raise Exception("La prueba rápida no completó ninguna época.")
+
+            context["smoke_test"] = {
+                "percent": percent,
+                "train": subset["train"],
+                "val": subset["val"],
+                "epochs": SUBSET_EPOCHS,
+                "imgsz": imgsz,
+                **projection,
+            }
+
+            seconds = projection["seconds"]
+            self._ui.stepSuccess(
+                "Prueba rápida completada.\n"
+                + f"  Época del subconjunto: {projection['subset_epoch_s']:.1f} s"
+                + f" | {projection['images_per_s']} img/s\n"
+                + f"  Tiempo proyectado del entrenamiento completo: "
+                + f"{int(seconds // 3600)} h {int(seconds % 3600 // 60):02d} min"
+                + f" ({context.get('epochs', 0)} épocas de"
+                + f" {projection['epoch_s'] / 60:.1f} min)"
+            )
+
+        except Exception:
+            raise
+
     def _runTraining(self, context: dict[str, object], model_name: str) -> None:
         try:
             from core.trainer import Trainer
+            from core.telemetry import Telemetry
 
             self._ui.section("🚀 INICIANDO ENGINE DE ENTRENAMIENTO... ")
 
-            trainer = Trainer(str(context.get("base_model_path", "N/A")))
-            success, best_model_path = trainer.run(
-                data_yaml=context.get("yaml_path", "N/A"),
-                epochs=context.get("epochs", 0),
-                imgsz=context.get("imgsz", 0),
-                batch=context.get("batch", 0),
-                project_dir=self._trained_models_path,
-                run_name=model_name,
-                device=context.get("device", None),
-            )
+            # Guardar el contexto antes de entrenar permite reanudar desde
+            # 'last.pt' si el proceso se interrumpe.
+            context["trained_model_path"] = self._trained_models_path / model_name
+            Session.save(context, context["trained_model_path"], status="training")
+
+            telemetry = Telemetry(self._ui.updateTelemetry)
+            with self._ui.stage("Entrenamiento"), self._ui.liveTelemetry(), telemetry:
+                trainer = Trainer(str(context.get("base_model_path", "N/A")))
+                telemetry.register(trainer)
+
+                success, best_model_path = trainer.run(
+                    data_yaml=context.get("yaml_path", "N/A"),
+                    epochs=context.get("epochs", 0),
+                    imgsz=context.get("imgsz", 0),
+                    batch=context.get("batch", 0),
+                    project_dir=self._trained_models_path,
+                    run_name=model_name,
+                    device=context.get("device", None),
+                    workers=context.get("workers", 8),
+                    cache=context.get("cache", False),
+                    amp=context.get("amp", True),
+                    threads=context.get("threads", None),
+                    decoded_cache=context.get("decoded_cache_path", None),
+                )
+
+            context["telemetry"] = telemetry.summary
 
             if success and best_model_path:
                 context["best_model_path"] = best_model_path
-                context["trained_model_path"] = self._trained_models_path / model_name
+                Session.save(context, context["trained_model_path"], status="completed")
                 self._ui.stepSuccess("Entrenamiento completado correctamente.")
             else:
                 raise Exception("No se pudo entrenar el modelo.")
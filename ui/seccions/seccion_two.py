@@ -1,8 +1,18 @@
-import re
 from pathlib import Path
 
-from core.constants import SECTION_TWO_TITLE
+from core.constants import (
+    APPEND_FINGERPRINT,
+    DEDUP_DIRNAME,
+    LABEL_MIN_BOX_PERMILLE,
+    RESIZE_FORMATS,
+    SECTION_TWO_TITLE,
+    TILE_SIZE,
+    TRAIN_SPLIT_PERCENT,
+)
 from core import Dataset, Validator
+from core.journal import Journal
+from core.labels import sanitizeClassName
+from core.profiler import timed
 from ui import BashUI
 
 
@@ -17,6 +27,7 @@ class SectionTwo:
         self._validator: Validator = validator
         self._dataset: Dataset = dataset
 
+    @timed(SECTION_TWO_TITLE)
     def run(self, context: dict[str, object]) -> None:
         self._dataset_path: Path = context["dataset_path"]
         self._images_dir: Path = self._dataset_path / "images"
@@ -26,20 +37,29 @@ class SectionTwo:
         self._ui.section(SECTION_TWO_TITLE, subtitle=f"Destino: {rel_path}")
 
         try:
-            self._images_dir.mkdir(exist_ok=True)
-            self._labels_dir.mkdir(exist_ok=True)
+            journal = Journal(self._dataset_path)
+            done = [stage for stage in journal.stages() if stage != "ingest"]
+            if done:
+                self._ui.stepInfo(f"Reanudando: etapas completadas ({', '.join(done)})")
+                self._ui.console.print()
 
-            normalized, to_move = self._dataset.normalize(
+            normalized, moved, renamed = self._dataset.normalize(
                 self._dataset_path,
                 self._images_dir,
                 self._labels_dir,
             )
             if not normalized:
                 raise Exception("No se pudo normalizar el dataset.")
-            elif normalized and len(to_move) > 0:
+            elif normalized and moved > 0:
                 self._ui.stepSuccess(
                     "Estructura del dataset normalizada correctamente.\n"
-                    f"  {len(to_move)} archivos movidos."
+                    f"  {moved} archivos movidos."
+                    + (
+                        f"\n  {renamed} renombrados con el prefijo de su carpeta"
+                        + " por nombres repetidos."
+                        if renamed
+                        else ""
+                    )
                 )
             else:
                 self._ui.stepSuccess("La estructura del dataset ya está normalizada")
@@ -49,6 +69,7 @@ class SectionTwo:
                 self._dataset_path,
                 self._images_dir,
                 self._labels_dir,
+                fingerprint=APPEND_FINGERPRINT,
             )
             if len(pairs) == 0:
                 raise Exception("No hay pares válidos para procesar.")
@@ -65,14 +86,53 @@ class SectionTwo:
                         f"  Se han movido a la carpeta '{self._dataset_path.name}/orphans'."
                     )
 
+            self._runRelabel(context, journal, pairs)
+
             self._ui.console.print()
+            remove_exact = journal.isDone("dedup") or self._ui.askConfirm(
+                "Descartar duplicados exactos",
+                default=True,
+                key="dedup_exact",
+            )
+            pairs, duplicates = self._dataset.dedup(
+                self._dataset_path,
+                pairs,
+                self._images_dir,
+                self._labels_dir,
+                remove_exact=remove_exact,
+            )
+            context["amount_pairs"] = len(pairs)
+            if duplicates["exact"] == 0 and duplicates["clusters"] == 0:
+                self._ui.stepSuccess("No se encontraron imágenes duplicadas.")
+            else:
+                context["amount_duplicates"] = duplicates["exact"]
+                message = f"Se encontraron {duplicates['exact']} duplicados exactos."
+                if duplicates["removed"]:
+                    message += (
+                        f"\n  {duplicates['removed']} se han movido a la carpeta"
+                        + f" '{self._dataset_path.name}/{DEDUP_DIRNAME}'."
+                    )
+                if duplicates["clusters"]:
+                    message += (
+                        f"\n  {duplicates['clustered']} pares en {duplicates['clusters']}"
+                        + " grupos de duplicados quedarán en el mismo lado del split."
+                    )
+                self._ui.stepWarning(message)
+
+            pairs = self._runTile(context, journal, pairs)
+
+            self._ui.console.print()
+            split_percent = (
+                TRAIN_SPLIT_PERCENT if journal.isDone("split") else self._askForSplit()
+            )
             train_stems, val_stems = self._dataset.split(
                 pairs,
                 self._dataset_path,
                 self._images_dir,
                 self._labels_dir,
+                train_ratio=split_percent / 100,
             )
-            if len(train_stems) == 0 or len(val_stems) == 0 or len(orphans) > 0:
+            if len(train_stems) == 0 or len(val_stems) == 0:
                 raise Exception("No se pudo dividir el dataset.")
             else:
                 context["amount_train"] = len(train_stems)
@@ -82,11 +142,21 @@ class SectionTwo:
                 )
 
             self._ui.console.print()
-            classes = self._askForClasses()
+            if journal.isDone("yaml"):
+                classes = list(journal.result("yaml")["classes"])
+                success, yaml_path = True, self._dataset_path / "data.yaml"
+            else:
+                # Las clases ya quedaron definidas al combinar fuentes o al
+                # transformar las etiquetas.
+                classes = self._dataset.classes(self._dataset_path)
+                if not classes:
+                    classes = self._askForClasses()
+                self._ui.console.print()
+                success, yaml_path = self._dataset.generateYAML(
+                    self._dataset_path, classes
+                )
             context["classes"] = classes
 
-            self._ui.console.print()
-            success, yaml_path = self._dataset.generateYAML(self._dataset_path, classes)
             if not success or not yaml_path:
                 raise Exception("No se pudo generar el archivo data.yaml.")
             else:
@@ -100,11 +170,218 @@ class SectionTwo:
                     + f"  Nombres:               {', '.join(classes)}"
                 )
 
+            self._ui.console.print()
+            self._runResize(context, journal)
+            self._runPack(context, journal)
+
         except Exception:
             raise
 
+    def _runRelabel(
+        self,
+        context: dict[str, object],
+        journal: Journal,
+        pairs,
+    ) -> None:
+        if journal.isDone("relabel"):
+            result = journal.result("relabel")
+        elif journal.isDone("dedup"):
+            return
+        else:
+            self._ui.console.print()
+            relabel = self._ui.askConfirm(
+                "Transformar etiquetas (fusionar, renombrar o descartar clases)",
+                default=False,
+                key="relabel",
+            )
+            if not relabel:
+                return
+
+            classes = self._dataset.classes(self._dataset_path)
+            if not classes:
+                classes = self._askForClasses()
+
+            self._ui.console.print()
+            merge: dict[str, str] = {}
+            raw_merge = self._ui.ask(
+                "Fusionar o renombrar clases (origen=destino, separadas por coma)",
+                default="no",
+                key="relabel_merge",
+            )
+            for rule in raw_merge.split(",") if raw_merge != "no" else []:
+                if rule.count("=") != 1:
+                    self._ui.stepWarning(f"Advertencia: Regla '{rule}' ignorada.")
+                    continue
+                old_name, new_name = map(self._sanitizeClassName, rule.split("="))
+                if old_name not in classes or not new_name:
+                    self._ui.stepWarning(
+                        f"Advertencia: La clase '{old_name}' no existe; regla ignorada."
+                    )
+                    continue
+                merge[old_name] = new_name
+
+            raw_drop = self._ui.ask(
+                "Descartar clases (separadas por coma)",
+                default="no",
+                key="relabel_drop",
+            )
+            drop = [
+                self._sanitizeClassName(name)
+                for name in (raw_drop.split(",") if raw_drop != "no" else [])
+                if self._sanitizeClassName(name)
+            ]
+
+            min_size = self._ui.askInt(
+                "Tamaño mínimo de caja (milésimas del lado de la imagen)",
+                default=LABEL_MIN_BOX_PERMILLE,
+                key="relabel_min_size",
+            )
+
+            result = self._dataset.relabel(
+                self._dataset_path,
+                pairs,
+                self._labels_dir,
+                classes,
+                merge=merge,
+                drop=drop,
+                min_size=min_size / 1000,
+            )
+
+        context["classes"] = result["classes"]
+        self._ui.stepSuccess(
+            f"Etiquetas transformadas: {result['kept']} de {result['boxes']} cajas"
+            + f" conservadas en {result['files_changed']} archivos modificados.\n"
+            + f"  Clases descartadas:    {result['dropped_class']} cajas\n"
+            + f"  Menores del mínimo:    {result['dropped_small']} cajas\n"
+            + f"  Repetidas:             {result['duplicates']} cajas\n"
+            + f"  Recortadas al borde:   {result['clipped']} cajas\n"
+            + f"  Clases resultantes:    {', '.join(result['classes'])}"
+        )
+        if result["invalid"]:
+            self._ui.stepWarning(
+                f"{result['invalid']} cajas con ids fuera de la lista de clases"
+                + " se han descartado."
+            )
+
+    def _runTile(
+        self,
+        context: dict[str, object],
+        journal: Journal,
+        pairs,
+    ):
+        # Tras el split ya no hay imágenes que teselar.
+        if journal.isDone("split") and not journal.isDone("tile"):
+            return pairs
+
+        if journal.isDone("tile"):
+            tile_size = journal.result("tile").get("tile_size", TILE_SIZE)
+        else:
+            self._ui.console.print()
+            tile = self._ui.askConfirm(
+                "Dividir imágenes grandes en teselas",
+                default=False,
+                key="tile",
+            )
+            if not tile:
+                return pairs
+
+            tile_size = self._ui.askInt(
+                "Tamaño de tesela (px)", default=TILE_SIZE, key="tile_size"
+            )
+
+        pairs, stats = self._dataset.tile(
+            self._dataset_path,
+            pairs,
+            self._images_dir,
+            self._labels_dir,
+            tile_size,
+        )
+        context["amount_pairs"] = len(pairs)
+        self._ui.stepSuccess(
+            f"{stats['images']} imágenes divididas en {stats['tiles']} teselas"
+            + f" de {tile_size} px ({stats['pairs']} pares en total).\n"
+            + f"  Teselas vacías descartadas: {stats['empty_dropped']}\n"
+            + f"  Cajas sin área visible suficiente: {stats['boxes_dropped']}"
+        )
+        return pairs
+
+    def _runResize(self, context: dict[str, object], journal: Journal) -> None:
+        if journal.isDone("resize"):
+            result = journal.result("resize")
+        else:
+            optimize = self._ui.askConfirm(
+                "Redimensionar y recodificar imágenes para el entrenamiento",
+                default=False,
+                key="resize",
+            )
+            if not optimize:
+                return
+
+            # El tamaño de imagen se elige aquí y la Sección 3 lo reutiliza:
+            # las imágenes quedan preparadas para ese 'imgsz'.
+            imgsz = self._ui.askInt("Tamaño de Imagen", default=640, key="imgsz")
+            fmt = self._ui.ask(
+                "Formato de imagen",
+                choices=list(RESIZE_FORMATS),
+                default="jpeg",
+                key="resize_format",
+            )
+            result = self._dataset.resize(self._dataset_path, imgsz, fmt)
+
+        context["imgsz"] = result["imgsz"]
+        megabytes = 1024 * 1024
+        self._ui.stepSuccess(
+            f"{result['transcoded']} de {result['images']} imágenes redimensionadas"
+            + f" a {result['long_side']} px ({result['format']}),"
+            + f" {result['cached']} desde la caché.\n"
+            + f"  Tamaño: {result['bytes_before'] / megabytes:.1f} MB"
+            + f" -> {result['bytes_after'] / megabytes:.1f} MB\n"
+            + "  Decodificación por época (estimada, 1 proceso):"
+            + f" {result['epoch_decode_before_s']} s -> {result['epoch_decode_after_s']} s"
+        )
+
+    def _runPack(self, context: dict[str, object], journal: Journal) -> None:
+        if journal.isDone("shards"):
+            result = journal.result("shards")
+        else:
+            pack = self._ui.askConfirm(
+                "Empaquetar train en shards (lectura secuencial)",
+                default=False,
+                key="shards",
+            )
+            if not pack:
+                return
+
+            result = self._dataset.pack(self._dataset_path)
+
+        context["shards"] = True
+        self._ui.stepSuccess(
+            f"{result['images']} imágenes de train en {result['shards']} shards"
+            + f" de hasta {result['target_mb']} MB"
+            + f" ({result['bytes'] / (1024 * 1024):.1f} MB en total)."
+        )
+
+    def _askForSplit(self) -> int:
+        split_percent = self._ui.askInt(
+            "Porcentaje de entrenamiento (%)",
+            default=TRAIN_SPLIT_PERCENT,
+            key="split",
+        )
+
+        if split_percent < 1 or split_percent > 99:
+            self._ui.stepWarning(
+                f"Advertencia: El porcentaje '{split_percent}' no es válido.\n"
+                "  Por favor ingrese un valor entre 1 y 99."
+            )
+            return self._askForSplit()
+
+        return split_percent
+
     def _askForClasses(self, classes: list[str] = []) -> list[str]:
-        class_names = self._ui.ask("Nombres de clases (separados por coma)")
+        class_names = self._ui.ask(
+            "Nombres de clases (separados por coma)",
+            key="classes",
+        )
 
         chunks = [
             self._parseClassName(class_name)
@@ -144,6 +421,7 @@ class SectionTwo:
             confirm = self._ui.askConfirm(
                 "Modificar o agregar más clases",
                 default=True,
+                key="classes_more",
             )
             if confirm:
                 return self._askForClasses(classes)
@@ -171,10 +449,4 @@ class SectionTwo:
         return f"{old}={new}"
 
     def _sanitizeClassName(self, raw_name: str) -> str:
-        text = raw_name.strip().lower()
-        text = re.sub(r"\s+", "_", text)
-        text = re.sub(r"[^\w]", "", text)
-        text = re.sub(r"_+", "_", text)
-        text = text.strip("_")
-
-        return text
+        return sanitizeClassName(raw_name)